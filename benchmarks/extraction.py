@@ -0,0 +1,91 @@
+"""
+Benchmarks paragraph extraction over a corpus of saved HTML pages.
+
+    python -m benchmarks.extraction [corpus_dir] [--repeat N]
+
+`corpus_dir` should contain `.html` files, e.g. pages saved while running a survey. Without it,
+a synthetic corpus resembling news articles is generated.
+"""
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from surv_ai.lib.tools import extraction
+
+
+def generate_corpus(n_pages: int = 50, n_paragraphs: int = 60) -> list[str]:
+    paragraph = " ".join(["Lorem ipsum <a href='#'>dolor</a> sit amet, <b>consectetur</b> adipiscing."] * 8)
+    navigation = "".join(f"<li><a href='/section/{index}'>Section {index}</a></li>" for index in range(80))
+    body = "".join(f"<div class='story'><p>{paragraph}</p><p>{index}</p></div>" for index in range(n_paragraphs))
+
+    return [
+        f"<html><head><script>var page = {page};</script></head>"
+        f"<body><nav><ul>{navigation}</ul></nav><article>{body}</article></body></html>"
+        for page in range(n_pages)
+    ]
+
+
+def load_corpus(corpus_dir: Path) -> list[str]:
+    return [path.read_text(errors="replace") for path in sorted(corpus_dir.glob("**/*.html"))]
+
+
+def extract_with_beautiful_soup(html: str) -> list[str]:
+    from bs4 import BeautifulSoup
+
+    return [paragraph.text for paragraph in BeautifulSoup(html, "html.parser").find_all("p")]
+
+
+def time_backend(extract: Callable[[str], list[str]], corpus: list[str], repeat: int) -> float:
+    started_at = time.perf_counter()
+
+    for _ in range(repeat):
+        for page in corpus:
+            extract(page)
+
+    return (time.perf_counter() - started_at) / repeat
+
+
+def time_process_pool(corpus: list[str], repeat: int) -> float:
+    with ProcessPoolExecutor() as executor:
+        list(executor.map(extraction.extract_paragraphs, corpus[:1]))
+        started_at = time.perf_counter()
+
+        for _ in range(repeat):
+            list(executor.map(extraction.extract_paragraphs, corpus, chunksize=4))
+
+        return (time.perf_counter() - started_at) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus_dir", nargs="?", type=Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus_dir) if args.corpus_dir else generate_corpus()
+    megabytes = sum(len(page.encode()) for page in corpus) / 2**20
+    print(f"{len(corpus)} pages, {megabytes:.1f} MiB")
+
+    backends = {"stdlib streaming parser": extraction._extract_with_html_parser}
+    if extraction.lxml is not None:
+        backends["lxml"] = extraction._extract_with_lxml
+
+    try:
+        import bs4  # noqa
+
+        backends = {"BeautifulSoup html.parser (baseline)": extract_with_beautiful_soup, **backends}
+    except ImportError:
+        pass
+
+    for name, extract in backends.items():
+        seconds = time_backend(extract, corpus, args.repeat)
+        print(f"{name:<40} {seconds * 1000:>9.1f} ms {megabytes / seconds:>8.1f} MiB/s")
+
+    seconds = time_process_pool(corpus, args.repeat)
+    print(f"{'extract_paragraphs in process pool':<40} {seconds * 1000:>9.1f} ms {megabytes / seconds:>8.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
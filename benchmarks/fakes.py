@@ -0,0 +1,162 @@
+"""
+Deterministic stand-ins for large language model APIs and tools, for benchmarking without
+network access or API spend.
+"""
+import asyncio
+import random
+from typing import Optional
+
+from surv_ai import (
+    LargeLanguageModelClientInterface,
+    Prompt,
+    RetryAction,
+    RetryPolicy,
+    ToolInterface,
+    ToolResult,
+)
+from surv_ai.lib.llm.batching import prompt_context
+from surv_ai.lib.llm.tokens import APPROXIMATE_CHARACTERS_PER_TOKEN
+from surv_ai.lib.llm.usage import record_usage
+
+
+class LatencyDistribution:
+    """
+    Log-normal latency, the usual shape of API response times, clipped to `max_seconds`.
+    """
+
+    def __init__(self, median_seconds: float = 0.05, sigma: float = 0.5, max_seconds: Optional[float] = None):
+        self.median_seconds = median_seconds
+        self.sigma = sigma
+        self.max_seconds = max_seconds
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median_seconds <= 0:
+            return 0.0
+
+        latency = self.median_seconds * rng.lognormvariate(0, self.sigma)
+
+        return min(latency, self.max_seconds) if self.max_seconds is not None else latency
+
+
+class FakeLLMClient(LargeLanguageModelClientInterface):
+    """
+    Scripted client answering each kind of prompt the library sends.
+
+    Tool belt prompts get `tool_command`, binary decisions get "True" with probability
+    `p_true`, and everything else gets `response_size` characters of filler. Each attempt fails
+    with probability `failure_rate` and is retried under `retry_policy`, as the real clients do.
+    All randomness comes from `seed`.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[LatencyDistribution] = None,
+        failure_rate: float = 0.0,
+        response_size: int = 800,
+        p_true: float = 0.7,
+        tool_command: str = "FAKE(benchmark query)",
+        retry_policy: Optional[RetryPolicy] = None,
+        seed: int = 0,
+    ):
+        self.latency = latency or LatencyDistribution()
+        self.retry_policy = retry_policy or RetryPolicy(base_delay=self.latency.median_seconds)
+        self.failure_rate = failure_rate
+        self.response_size = response_size
+        self.p_true = p_true
+        self.tool_command = tool_command
+
+        self.n_calls = 0
+        self.n_failures = 0
+
+        self._rng = random.Random(seed)
+
+    def _get_response(self, prompt: Prompt) -> str:
+        system_prompt = prompt.messages[0].content
+
+        if "You MUST respond with a command" in system_prompt:
+            return self.tool_command
+        elif 'Your only options are "True," or "False"' in system_prompt:
+            return "True" if self._rng.random() < self.p_true else "False"
+
+        filler = "The evidence on balance suggests a considered conclusion. "
+
+        return (filler * (self.response_size // len(filler) + 1))[: self.response_size]
+
+    async def _get_completion(self, prompt: Prompt) -> str:
+        with prompt_context(prompt):
+            attempt = 1
+
+            while True:
+                self.n_calls += 1
+                self.retry_policy.record_request()
+
+                latency = self.latency.sample(self._rng)
+                fails = self._rng.random() < self.failure_rate
+
+                await asyncio.sleep(latency)
+
+                if not fails:
+                    response = self._get_response(prompt)
+                    record_usage(
+                        sum(len(message.content) for message in prompt.messages) // APPROXIMATE_CHARACTERS_PER_TOKEN,
+                        len(response) // APPROXIMATE_CHARACTERS_PER_TOKEN,
+                    )
+
+                    return response
+
+                self.n_failures += 1
+                if self.retry_policy.get_action(attempt, 503) == RetryAction.FAIL:
+                    raise Exception("Fake API failure")
+
+                await asyncio.sleep(self.retry_policy.get_delay(attempt))
+                attempt += 1
+
+    async def get_completions(self, prompts: list[Prompt], **_hyperparameters) -> list[str]:
+        return await asyncio.gather(*[self._get_completion(prompt) for prompt in prompts])
+
+
+class FakeTool(ToolInterface):
+    """
+    Tool returning `n_results` pages of `body_size` characters after a sampled latency.
+    """
+
+    instruction = """
+        `FAKE(keywords)` - use keywords to search a fake corpus.
+    """
+    command = r"FAKE\((.+)\)"
+
+    def __init__(
+        self,
+        latency: Optional[LatencyDistribution] = None,
+        failure_rate: float = 0.0,
+        n_results: int = 10,
+        body_size: int = 4000,
+        seed: int = 0,
+    ):
+        self.latency = latency or LatencyDistribution(median_seconds=0.2)
+        self.failure_rate = failure_rate
+        self.n_results = n_results
+        self.body_size = body_size
+
+        self.n_calls = 0
+
+        self._rng = random.Random(seed)
+
+    async def use(self, query: str) -> list[ToolResult]:
+        self.n_calls += 1
+        await asyncio.sleep(self.latency.sample(self._rng))
+
+        if self._rng.random() < self.failure_rate:
+            return []
+
+        paragraph = f"A paragraph about {query} with some supporting detail. " * 8
+
+        return [
+            ToolResult(
+                url=f"https://example.com/{self.n_calls}/{index}",
+                site_name="Example",
+                title=f"Page {index} about {query}",
+                body="\n\n".join([paragraph] * (self.body_size // len(paragraph) + 1))[: self.body_size],
+            )
+            for index in range(self.n_results)
+        ]
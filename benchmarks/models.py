@@ -0,0 +1,72 @@
+"""
+Compares building the library's pydantic models with and without validation.
+
+    python -m benchmarks.models [--number N]
+
+Internal hot paths build prompts, knowledge and responses with `construct()`, which skips
+validation. Each case below builds the same objects both ways.
+"""
+import argparse
+import timeit
+
+from surv_ai import Knowledge, Prompt, PromptMessage, SurveyResponse
+
+PARAGRAPHS = [f"Paragraph {index} of a news article about the hypothesis. " * 5 for index in range(60)]
+
+
+def build_page_prompt(construct: bool) -> Prompt:
+    prompt_class = Prompt.construct if construct else Prompt
+    message_class = PromptMessage.construct if construct else PromptMessage
+
+    return prompt_class(
+        messages=[
+            message_class(role="system", content="Extract useful information from the page."),
+            *[message_class(role="user", content=paragraph, name="Article") for paragraph in PARAGRAPHS],
+            message_class(role="assistant", content="Some useful information is:"),
+        ]
+    )
+
+
+def build_knowledge(construct: bool) -> list[Knowledge]:
+    knowledge_class = Knowledge.construct if construct else Knowledge
+
+    return [knowledge_class(text=paragraph, source="Article") for paragraph in PARAGRAPHS]
+
+
+def build_survey_responses(construct: bool) -> list[SurveyResponse]:
+    response_class = SurveyResponse.construct if construct else SurveyResponse
+
+    return [
+        response_class(
+            in_favor=index,
+            against=100 - index,
+            undecided=0,
+            error=0,
+            percent_in_favor=index / 100,
+            uncertainty=0.0,
+        )
+        for index in range(100)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    for name, build in [
+        ("web page prompt (62 messages)", build_page_prompt),
+        ("knowledge items (60)", build_knowledge),
+        ("running survey responses (100)", build_survey_responses),
+    ]:
+        validated = min(timeit.repeat(lambda: build(False), number=args.number, repeat=3)) / args.number
+        constructed = min(timeit.repeat(lambda: build(True), number=args.number, repeat=3)) / args.number
+
+        print(
+            f"{name:<34} validated {validated * 1e6:>8.1f} us"
+            f"   construct {constructed * 1e6:>8.1f} us   {validated / constructed:>5.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
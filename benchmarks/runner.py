@@ -0,0 +1,68 @@
+import asyncio
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    wall_seconds: float
+    n_calls: int
+    peak_memory_bytes: int
+    max_loop_lag_seconds: float
+    mean_loop_lag_seconds: float
+
+    @property
+    def calls_per_second(self) -> float:
+        return self.n_calls / self.wall_seconds if self.wall_seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.name:<42} {self.wall_seconds:>8.2f}s {self.n_calls:>8} calls {self.calls_per_second:>10.1f}/s"
+            f" {self.peak_memory_bytes / 2**20:>8.1f} MiB"
+            f"   loop lag mean {self.mean_loop_lag_seconds * 1000:>6.1f}ms max {self.max_loop_lag_seconds * 1000:>6.1f}ms"
+        )
+
+
+async def _monitor_loop_lag(lags: list[float], interval: float):
+    while True:
+        started_at = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, time.perf_counter() - started_at - interval))
+
+
+async def run_benchmark(
+    name: str,
+    benchmark: Callable[[], Awaitable[int]],
+    lag_interval: float = 0.005,
+) -> BenchmarkResult:
+    """
+    Runs `benchmark`, which returns the number of calls it made, while tracking peak memory
+    with `tracemalloc` and how late the event loop wakes up a periodic timer.
+    """
+    lags: list[float] = []
+    monitor = asyncio.create_task(_monitor_loop_lag(lags, lag_interval))
+
+    tracemalloc.start()
+    started_at = time.perf_counter()
+
+    try:
+        n_calls = await benchmark()
+    finally:
+        wall_seconds = time.perf_counter() - started_at
+        _, peak_memory_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        monitor.cancel()
+        await asyncio.gather(monitor, return_exceptions=True)
+
+    return BenchmarkResult(
+        name=name,
+        wall_seconds=wall_seconds,
+        n_calls=n_calls,
+        peak_memory_bytes=peak_memory_bytes,
+        max_loop_lag_seconds=max(lags, default=0.0),
+        mean_loop_lag_seconds=sum(lags) / len(lags) if lags else 0.0,
+    )
@@ -0,0 +1,161 @@
+"""
+Benchmarks surveys, models, the tool belt and the knowledge stores against fake backends.
+
+    python -m benchmarks.suite [--quick] [--latency SECONDS] [--failure-rate RATE] [--seed SEED]
+
+Each benchmark reports wall time, calls per second, peak traced memory and event-loop lag.
+LLM and tool latencies are simulated, so wall times reflect scheduling and library overhead
+rather than any real API.
+"""
+import argparse
+import asyncio
+import logging
+import random
+import tempfile
+from functools import partial
+from pathlib import Path
+
+from surv_ai import (
+    Knowledge,
+    LayeredKnowledgeStore,
+    LocalKnowledgeStore,
+    Model,
+    SQLiteKnowledgeStore,
+    Survey,
+    SurveyParameter,
+    ToolBelt,
+)
+
+from .fakes import FakeLLMClient, FakeTool, LatencyDistribution
+from .runner import run_benchmark
+
+WORDS = "budget senate house vote bill election court ruling market rates inflation policy climate energy".split()
+
+
+def get_backends(args) -> tuple[FakeLLMClient, ToolBelt]:
+    client = FakeLLMClient(
+        latency=LatencyDistribution(median_seconds=args.latency),
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    tool = FakeTool(latency=LatencyDistribution(median_seconds=args.latency * 4), seed=args.seed)
+
+    return client, ToolBelt(tools=[tool])
+
+
+async def benchmark_survey(args, **survey_kwargs) -> int:
+    client, tool_belt = get_backends(args)
+    survey = Survey(client=client, tool_belt=tool_belt, **survey_kwargs)
+
+    await survey.conduct("The budget bill will pass the senate.")
+
+    return client.n_calls
+
+
+async def benchmark_model(args, n_surveys: int, n_agents: int) -> int:
+    client, tool_belt = get_backends(args)
+    model = Model(
+        Survey,
+        parameters=[
+            SurveyParameter(
+                independent_variable=index,
+                kwargs={"client": client, "tool_belt": tool_belt, "n_agents": n_agents, "max_concurrency": 20},
+            )
+            for index in range(n_surveys)
+        ],
+        max_concurrency=n_surveys,
+    )
+
+    await model.build("The budget bill will pass the senate.")
+
+    return client.n_calls
+
+
+async def benchmark_tool_belt(args, n_inspections: int) -> int:
+    client, tool_belt = get_backends(args)
+
+    await asyncio.gather(
+        *[tool_belt.inspect(client, "The budget bill will pass the senate.", []) for _ in range(n_inspections)]
+    )
+
+    return client.n_calls + tool_belt.tools[0].n_calls
+
+
+def get_knowledge(n_items: int, seed: int) -> list[Knowledge]:
+    rng = random.Random(seed)
+
+    return [
+        Knowledge(text=" ".join(rng.choices(WORDS, k=40)), source=rng.choice(["Article", "Base", "User"]))
+        for _ in range(n_items)
+    ]
+
+
+async def benchmark_knowledge_store(knowledge_store, knowledge: list[Knowledge], n_recalls: int) -> int:
+    if isinstance(knowledge_store, SQLiteKnowledgeStore):
+        knowledge_store.add_many(knowledge)
+    else:
+        for knowledge_item in knowledge:
+            knowledge_store.add_knowledge(knowledge_item)
+
+    for index in range(n_recalls):
+        knowledge_store.recall_recent(5, include_sources=["Article"])
+        knowledge_store.recall_relevant(f"{WORDS[index % len(WORDS)]} {WORDS[(index * 7) % len(WORDS)]}", 5)
+
+        if index % 10 == 0:
+            await asyncio.sleep(0)
+
+    return 2 * n_recalls
+
+
+async def main(args):
+    scale = 1 if args.quick else 5
+    knowledge = get_knowledge(2000 * scale, args.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        base = LocalKnowledgeStore()
+        for knowledge_item in knowledge:
+            base.add_knowledge(knowledge_item)
+
+        benchmarks = [
+            ("Survey.conduct", partial(benchmark_survey, args, n_agents=20 * scale, max_concurrency=20)),
+            (
+                "Survey.conduct (batch_stages)",
+                partial(benchmark_survey, args, n_agents=20 * scale, max_concurrency=20, batch_stages=True),
+            ),
+            ("Model.build", partial(benchmark_model, args, n_surveys=4 * scale, n_agents=10)),
+            ("ToolBelt.inspect", partial(benchmark_tool_belt, args, n_inspections=20 * scale)),
+            (
+                "LocalKnowledgeStore recall",
+                partial(benchmark_knowledge_store, LocalKnowledgeStore(), knowledge, 500 * scale),
+            ),
+            (
+                "SQLiteKnowledgeStore recall",
+                partial(
+                    benchmark_knowledge_store,
+                    SQLiteKnowledgeStore(str(Path(directory) / "knowledge.sqlite3")),
+                    knowledge,
+                    500 * scale,
+                ),
+            ),
+            (
+                "LayeredKnowledgeStore recall",
+                partial(benchmark_knowledge_store, LayeredKnowledgeStore(base), knowledge[:3], 500 * scale),
+            ),
+        ]
+
+        for name, benchmark in benchmarks:
+            try:
+                print(await run_benchmark(name, benchmark))
+            except Exception as e:
+                print(f"{name:<42} failed: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="run smaller workloads")
+    parser.add_argument("--latency", type=float, default=0.02, help="median simulated LLM latency in seconds")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="probability of a simulated LLM failure")
+    parser.add_argument("--seed", type=int, default=0)
+
+    logging.getLogger("surv_ai").addHandler(logging.NullHandler())
+    asyncio.run(main(parser.parse_args()))
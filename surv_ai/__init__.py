@@ -16,15 +16,24 @@ from .lib.conversation.conversation import Conversation  # noqa
 from .lib.conversation.conversation import ConversationInterface  # noqa
 from .lib.knowledge_store.interfaces import Knowledge  # noqa
 from .lib.knowledge_store.interfaces import KnowledgeStoreInterface  # noqa
+from .lib.knowledge_store.layered import LayeredKnowledgeStore  # noqa
 from .lib.knowledge_store.local import LocalKnowledgeStore  # noqa
+from .lib.knowledge_store.sqlite import SQLiteKnowledgeStore  # noqa
 from .lib.llm.anthropic import AnthropicClient  # noqa
+from .lib.llm.cache import CachedClient  # noqa
+from .lib.llm.concurrency import ConcurrencyGovernor  # noqa
 from .lib.llm.gpt import GPTClient  # noqa
 from .lib.llm.interfaces import LargeLanguageModelClientInterface  # noqa
 from .lib.llm.interfaces import Prompt, PromptMessage  # noqa
+from .lib.llm.retry import RetryAction, RetryBudget, RetryPolicy  # noqa
+from .lib.llm.usage import Usage, UsageTracker  # noqa
 from .lib.log import AgentLogLevel, logger  # noqa
 from .lib.tools.interfaces import ToolInterface, ToolResult  # noqa
 from .lib.tools.query.dataframe import DataframeTool  # noqa
+from .lib.tools.query.dataset import DatasetTool  # noqa
 from .lib.tools.query.google_custom_search import GoogleCustomSearchTool  # noqa
 from .lib.tools.query.twitter import TwitterTool  # noqa
 from .lib.tools.query.wikipedia import WikipediaTool  # noqa
 from .lib.tools.tool_belt import ToolBelt  # noqa
+from .lib.tracing import JSONLSpanExporter, Tracer, trace_context, tracer  # noqa
+from .lib.transport import HTTPTransport  # noqa
@@ -1,12 +1,19 @@
+import asyncio
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import partial
 from random import choice
-from typing import Optional
+from typing import Iterator, Optional, Sequence, Union
 
 from colorama import Fore
 
 from surv_ai.lib.knowledge_store.interfaces import Knowledge, KnowledgeStoreInterface
 from surv_ai.lib.knowledge_store.local import LocalKnowledgeStore
-from surv_ai.lib.llm.interfaces import LargeLanguageModelClientInterface
+from surv_ai.lib.llm.batching import bind_prompt_contexts
+from surv_ai.lib.llm.interfaces import LargeLanguageModelClientInterface, Prompt
+from surv_ai.lib.llm.usage import Usage, UsageTracker, get_usage_tracker
+from surv_ai.lib.log import logger
+from surv_ai.lib.tracing import trace_context
 
 
 class BaseAgent(ABC):
@@ -16,6 +23,7 @@ class BaseAgent(ABC):
         knowledge_store: Optional[KnowledgeStoreInterface] = None,
         n_knowledge_items_per_prompt: int = 5,
         name: Optional[str] = None,
+        recall_relevant_knowledge: bool = False,
         _hyperparameters: Optional[dict] = None,
     ):
         if knowledge_store is None:
@@ -28,10 +36,13 @@ class BaseAgent(ABC):
         self.knowledge_store = knowledge_store
 
         self.n_knowledge_items_per_prompt = n_knowledge_items_per_prompt
+        self.recall_relevant_knowledge = recall_relevant_knowledge
 
         self._hyperparameters = _hyperparameters or {}
         self.name = name
 
+        self.usage_tracker = UsageTracker(parent=get_usage_tracker())
+
         self.color = choice(
             [
                 Fore.BLUE,
@@ -48,6 +59,60 @@ class BaseAgent(ABC):
     async def prompt(self, statement: str, *args, **kwargs) -> str:
         ...
 
+    @contextmanager
+    def _completion_context(self, stage: str) -> Iterator[None]:
+        with trace_context(agent=self.name, stage=stage), self.usage_tracker.activate():
+            yield
+
+    async def _get_completions(self, prompts: list[Prompt], stage: str, **hyperparameters) -> list[str]:
+        with self._completion_context(stage):
+            return await self.client.get_completions(prompts, **hyperparameters)
+
+    @staticmethod
+    async def _get_batch_completions(
+        agents: Sequence["BaseAgent"], prompts: list[Prompt], stage: str, **hyperparameters
+    ) -> list[Union[str, BaseException]]:
+        """
+        Completes one prompt per agent, submitting the prompts of agents sharing a client in a
+        single `get_completions` call. Each completion is labelled with and charged to its agent.
+
+        If a batched call fails, the prompts in it are retried one agent at a time, and a failed
+        retry is returned in place of its response, so it only fails the agent that made it.
+        """
+        batches: dict[int, list[int]] = {}
+        for index, agent in enumerate(agents):
+            batches.setdefault(id(agent.client), []).append(index)
+
+        async def complete_batch(indices: list[int]) -> list[Union[str, BaseException]]:
+            batch_prompts = [prompts[index] for index in indices]
+            contexts = [partial(agents[index]._completion_context, stage) for index in indices]
+
+            try:
+                with trace_context(stage=stage), bind_prompt_contexts(zip(batch_prompts, contexts)):
+                    return await agents[indices[0]].client.get_completions(batch_prompts, **hyperparameters)
+            except Exception as e:
+                logger.log_warning("Batched %s completions failed, retrying each agent: %r", stage, e)
+
+            responses = await asyncio.gather(
+                *[agents[index]._get_completions([prompts[index]], stage, **hyperparameters) for index in indices],
+                return_exceptions=True,
+            )
+
+            return [response if isinstance(response, BaseException) else response[0] for response in responses]
+
+        responses: list[Union[str, BaseException]] = [""] * len(agents)
+        for indices, batch_responses in zip(
+            batches.values(), await asyncio.gather(*[complete_batch(indices) for indices in batches.values()])
+        ):
+            for index, response in zip(indices, batch_responses):
+                responses[index] = response
+
+        return responses
+
+    @property
+    def usage(self) -> Usage:
+        return self.usage_tracker.usage
+
     def teach_text(self, input: str, source: Optional[str] = "User"):
         self.knowledge_store.add_text(f"{source}: {input}", source=source)
 
@@ -1,3 +1,5 @@
+from typing import Union
+
 from surv_ai.lib.conversation.interfaces import ConversationInterface
 from surv_ai.lib.llm.interfaces import Prompt, PromptMessage
 
@@ -27,22 +29,39 @@ class BinaryAgent(BaseAgent):
         )[0]
 
         self.messages = [
-            PromptMessage(
+            PromptMessage.construct(
                 role="system",
                 content=self._get_initial_prompt_text(assertion),
             ),
-            PromptMessage(role="user", content=conversation.as_string(), name="User thinks"),
-            PromptMessage(
+            PromptMessage.construct(role="user", content=conversation.as_string(), name="User thinks"),
+            PromptMessage.construct(
                 role="assistant",
                 content="I believe the user thinks this hypothesis is: ",
             ),
         ]
 
-        return Prompt(messages=self.messages)
+        return Prompt.construct(messages=self.messages)
 
     async def prompt(self, statement: str, *args, **kwargs) -> str:
         prompt = await self._build_completion_prompt(statement, *args, **kwargs)
 
-        response = (await self.client.get_completions([prompt], **self._hyperparameters))[0]
+        response = (await self._get_completions([prompt], "binary", **self._hyperparameters))[0]
 
         return response
+
+    @staticmethod
+    async def prompt_batch(
+        agents: list["BinaryAgent"], conversations: list[ConversationInterface]
+    ) -> list[Union[str, BaseException]]:
+        """
+        Prompts several agents sharing hyperparameters together. An agent whose completion fails
+        gets the exception in place of its response.
+        """
+        if not agents:
+            return []
+
+        prompts = [
+            await agent._build_completion_prompt(conversation) for agent, conversation in zip(agents, conversations)
+        ]
+
+        return await BinaryAgent._get_batch_completions(agents, prompts, "binary", **agents[0]._hyperparameters)
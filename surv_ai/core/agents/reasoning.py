@@ -1,3 +1,6 @@
+import asyncio
+from typing import Union
+
 from surv_ai.lib.knowledge_store.interfaces import Knowledge
 from surv_ai.lib.llm.interfaces import Prompt, PromptMessage
 from surv_ai.lib.log import logger
@@ -50,23 +53,23 @@ class ReasoningAgent(BaseAgent, AgentInterface):
         You may only use the information the user has provided.
         """
 
-    async def _get_plan(self, prompt: str, relevant_knowledge: list[Knowledge]):
+    def _get_plan_prompt(self, prompt: str, relevant_knowledge: list[Knowledge]):
         messages = [
-            PromptMessage(
+            PromptMessage.construct(
                 role="system",
                 content=self._get_plan_prompt_text(
                     prompt,
                 ),
             ),
             *[
-                PromptMessage(
+                PromptMessage.construct(
                     content=knowledge.text,
                     role="user",
                     name=knowledge.source,
                 )
                 for knowledge in relevant_knowledge
             ],
-            PromptMessage(
+            PromptMessage.construct(
                 role="assistant",
                 content="""In order to determine whether the provided statement is more likely to be true or false,
                 This is an outline of how I will think about the problem:
@@ -74,29 +77,29 @@ class ReasoningAgent(BaseAgent, AgentInterface):
             ),
         ]
 
-        return (await self.client.get_completions([Prompt(messages=messages)]))[0]
+        return Prompt.construct(messages=messages)
 
-    async def _get_argument_in_favor(
+    def _get_argument_in_favor_prompt(
         self,
         prompt: str,
         relevant_knowledge: list[Knowledge],
     ):
         messages = [
-            PromptMessage(
+            PromptMessage.construct(
                 role="system",
                 content=self._get_argument_prompt_text(
                     prompt,
                 ),
             ),
             *[
-                PromptMessage(
+                PromptMessage.construct(
                     content=knowledge.text,
                     role="user",
                     name=knowledge.source,
                 )
                 for knowledge in relevant_knowledge
             ],
-            PromptMessage(
+            PromptMessage.construct(
                 role="assistant",
                 content=f"""
                 Thus after looking at the relevant sources, I have come to the conclusion that the assertion
@@ -105,29 +108,29 @@ class ReasoningAgent(BaseAgent, AgentInterface):
             ),
         ]
 
-        return (await self.client.get_completions([Prompt(messages=messages)]))[0]
+        return Prompt.construct(messages=messages)
 
-    async def _get_argument_against(
+    def _get_argument_against_prompt(
         self,
         prompt: str,
         relevant_knowledge: list[Knowledge],
     ):
         messages = [
-            PromptMessage(
+            PromptMessage.construct(
                 role="system",
                 content=self._get_argument_prompt_text(
                     prompt,
                 ),
             ),
             *[
-                PromptMessage(
+                PromptMessage.construct(
                     content=knowledge.text,
                     role="user",
                     name=knowledge.source,
                 )
                 for knowledge in relevant_knowledge
             ],
-            PromptMessage(
+            PromptMessage.construct(
                 role="assistant",
                 content=f"""
                 Thus after looking at the relevant sources, I have come to the conclusion that the assertion
@@ -136,43 +139,27 @@ class ReasoningAgent(BaseAgent, AgentInterface):
             ),
         ]
 
-        return (await self.client.get_completions([Prompt(messages=messages)]))[0]
-
-    async def _build_completion_prompt(
-        self,
-        prompt: str,
-    ) -> Prompt:
-        relevant_knowledge = self.knowledge_store.recall_recent(
-            n_knowledge_items=self.n_knowledge_items_per_prompt,
-        )
-
-        plan = await self._get_plan(prompt, relevant_knowledge)
-        logger.log_internal(f"{self.name} plans: {plan}")
-
-        argument_in_favor = await self._get_argument_in_favor(prompt, relevant_knowledge)
-        logger.log_internal(f"{self.name} argues in favor: {argument_in_favor}")
-
-        argument_against = await self._get_argument_against(prompt, relevant_knowledge)
-        logger.log_internal(f"{self.name} argues against: {argument_against}")
+        return Prompt.construct(messages=messages)
 
+    def _get_judgment_prompt(self, prompt: str, plan: str, argument_in_favor: str, argument_against: str) -> Prompt:
         messages = [
-            PromptMessage(
+            PromptMessage.construct(
                 role="system",
                 content=self._get_completion_prompt_text(
                     prompt,
                 ),
             ),
-            PromptMessage(
+            PromptMessage.construct(
                 role="assistant",
                 content=argument_in_favor,
                 name="Argument In Favor",
             ),
-            PromptMessage(
+            PromptMessage.construct(
                 role="assistant",
                 content=argument_against,
                 name="Argument Against",
             ),
-            PromptMessage(
+            PromptMessage.construct(
                 role="assistant",
                 content=f"""My approach to answering the question will be:
 
@@ -183,11 +170,114 @@ class ReasoningAgent(BaseAgent, AgentInterface):
             ),
         ]
 
-        return Prompt(messages=messages)
+        return Prompt.construct(messages=messages)
+
+    def _recall_knowledge(self, prompt: str) -> list[Knowledge]:
+        if not self.recall_relevant_knowledge:
+            return self.knowledge_store.recall_recent(
+                n_knowledge_items=self.n_knowledge_items_per_prompt,
+            )
+
+        relevant_knowledge = self.knowledge_store.recall_relevant(
+            prompt,
+            n_knowledge_items=self.n_knowledge_items_per_prompt,
+        )
+
+        n_missing_items = self.n_knowledge_items_per_prompt - len(relevant_knowledge)
+        if n_missing_items > 0:
+            recent_knowledge = self.knowledge_store.recall_recent(n_knowledge_items=self.n_knowledge_items_per_prompt)
+            relevant_knowledge += [knowledge for knowledge in recent_knowledge if knowledge not in relevant_knowledge][
+                -n_missing_items:
+            ]
+
+        return relevant_knowledge
+
+    def _log_deliberation(self, plan: str, argument_in_favor: str, argument_against: str):
+        logger.log_internal("%s plans: %s", self.name, plan)
+        logger.log_internal("%s argues in favor: %s", self.name, argument_in_favor)
+        logger.log_internal("%s argues against: %s", self.name, argument_against)
+
+    async def _build_completion_prompt(
+        self,
+        prompt: str,
+    ) -> Prompt:
+        relevant_knowledge = self._recall_knowledge(prompt)
+
+        plan, argument_in_favor, argument_against = await asyncio.gather(
+            *[
+                self._get_completion(get_prompt(prompt, relevant_knowledge), stage)
+                for get_prompt, stage in [
+                    (self._get_plan_prompt, "plan"),
+                    (self._get_argument_in_favor_prompt, "for"),
+                    (self._get_argument_against_prompt, "against"),
+                ]
+            ]
+        )
+        self._log_deliberation(plan, argument_in_favor, argument_against)
+
+        return self._get_judgment_prompt(prompt, plan, argument_in_favor, argument_against)
+
+    async def _get_completion(self, prompt: Prompt, stage: str) -> str:
+        return (await self._get_completions([prompt], stage))[0]
 
     async def prompt(self, statement: str, *args, **kwargs) -> str:
         prompt = await self._build_completion_prompt(statement, *args, **kwargs)
 
-        response = (await self.client.get_completions([prompt], **self._hyperparameters))[0]
+        response = (await self._get_completions([prompt], "judge", **self._hyperparameters))[0]
 
         return response
+
+    @staticmethod
+    async def prompt_batch(agents: list["ReasoningAgent"], statement: str) -> list[Union[str, BaseException]]:
+        """
+        Prompts several agents sharing hyperparameters, running each stage of their reasoning for
+        all agents together. The plan and both arguments are independent, so those stages run
+        concurrently.
+
+        An agent whose completion fails gets the exception in place of its response, and takes no
+        further part; the other agents are unaffected.
+        """
+        if not agents:
+            return []
+
+        relevant_knowledge = [agent._recall_knowledge(statement) for agent in agents]
+
+        plans, arguments_in_favor, arguments_against = await asyncio.gather(
+            *[
+                ReasoningAgent._get_batch_completions(
+                    agents,
+                    [get_prompt(agent, statement, knowledge) for agent, knowledge in zip(agents, relevant_knowledge)],
+                    stage,
+                )
+                for get_prompt, stage in [
+                    (ReasoningAgent._get_plan_prompt, "plan"),
+                    (ReasoningAgent._get_argument_in_favor_prompt, "for"),
+                    (ReasoningAgent._get_argument_against_prompt, "against"),
+                ]
+            ]
+        )
+
+        responses: list[Union[str, BaseException]] = []
+        judged_indices = []
+        judgment_prompts = []
+        for index, deliberation in enumerate(zip(plans, arguments_in_favor, arguments_against)):
+            error = next((response for response in deliberation if isinstance(response, BaseException)), None)
+            responses.append(error)
+
+            if error is None:
+                plan, argument_in_favor, argument_against = deliberation
+                agents[index]._log_deliberation(plan, argument_in_favor, argument_against)
+
+                judged_indices.append(index)
+                judgment_prompts.append(
+                    agents[index]._get_judgment_prompt(statement, plan, argument_in_favor, argument_against)
+                )
+
+        judgments = await ReasoningAgent._get_batch_completions(
+            [agents[index] for index in judged_indices], judgment_prompts, "judge", **agents[0]._hyperparameters
+        )
+
+        for index, judgment in zip(judged_indices, judgments):
+            responses[index] = judgment
+
+        return responses
@@ -11,9 +11,9 @@ class WebPageSummaryAgent(BaseAgent):
         page_title: str,
         page_body: str,
     ):
-        return Prompt(
+        return Prompt.construct(
             messages=[
-                PromptMessage(
+                PromptMessage.construct(
                     content=f"""A user has presented you with a hypothesis:
                     
                     {original_prompt}
@@ -29,10 +29,10 @@ class WebPageSummaryAgent(BaseAgent):
                     role="system",
                 ),
                 *[
-                    PromptMessage(content=paragraph, role="user", name="Article")
+                    PromptMessage.construct(content=paragraph, role="user", name="Article")
                     for paragraph in page_body.split("\n\n")
                 ],
-                PromptMessage(
+                PromptMessage.construct(
                     role="assistant",
                     content=f"I have read the {site_name} page entitled {page_title} and some useful information is:",
                 ),
@@ -42,6 +42,6 @@ class WebPageSummaryAgent(BaseAgent):
     async def prompt(self, original_prompt: str, site_name: str, page_title: str, page_body: str) -> str:
         prompt = await self._get_prompt(original_prompt, site_name, page_title, page_body)
 
-        response = (await self.client.get_completions([prompt], **self._hyperparameters))[0]
+        response = (await self._get_completions([prompt], "summary", **self._hyperparameters))[0]
 
         return response
@@ -1,10 +1,11 @@
-from typing import Any, Optional, Protocol
+from typing import Any, AsyncIterator, Optional, Protocol
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing_extensions import TypedDict, Unpack
 
 from surv_ai.lib.knowledge_store.interfaces import Knowledge, KnowledgeStoreInterface
 from surv_ai.lib.llm.interfaces import LargeLanguageModelClientInterface
+from surv_ai.lib.llm.usage import Usage
 from surv_ai.lib.tools.interfaces import ToolBeltInterface
 
 
@@ -36,6 +37,8 @@ class SurveyResponse(BaseModel):
     percent_in_favor: float
     uncertainty: float
 
+    usage: Usage = Field(default_factory=Usage)
+
 
 class SurveyKwargs(TypedDict):
     client: LargeLanguageModelClientInterface
@@ -44,6 +47,15 @@ class SurveyKwargs(TypedDict):
     max_concurrency: int
     max_knowledge_per_agent: int
     base_knowledge: Optional[list[Knowledge]]
+    max_research_concurrency: Optional[int]
+    max_polling_concurrency: Optional[int]
+    batch_stages: bool
+    stage_batch_size: Optional[int]
+    target_interval_width: Optional[float]
+    confidence: float
+    recall_relevant_knowledge: bool
+    token_budget: Optional[int]
+    call_budget: Optional[int]
 
 
 class SurveyInterface(Protocol):
@@ -53,6 +65,9 @@ class SurveyInterface(Protocol):
     async def conduct(self, hypothesis: str) -> SurveyResponse:
         ...
 
+    def stream(self, hypothesis: str) -> AsyncIterator[SurveyResponse]:
+        ...
+
 
 class SurveyParameter(BaseModel):
     kwargs: dict
@@ -63,6 +78,10 @@ class DataPoint(BaseModel):
     response: SurveyResponse
     parameter: SurveyParameter
 
+    @property
+    def usage(self) -> Usage:
+        return self.response.usage
+
 
 class ModelInterface(Protocol):
     def __init__(
@@ -70,8 +89,13 @@ class ModelInterface(Protocol):
         survey_class: type[SurveyInterface],
         parameters: list[SurveyParameter],
         max_concurrency: int = 1,
+        token_budget: Optional[int] = None,
+        call_budget: Optional[int] = None,
     ):
         ...
 
     async def build(self, hypothesis: str, *parameter_set: Unpack[dict]) -> list[DataPoint]:
         ...
+
+    def build_stream(self, hypothesis: str) -> AsyncIterator[DataPoint]:
+        ...
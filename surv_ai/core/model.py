@@ -1,6 +1,19 @@
 import asyncio
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Hashable, Iterator, Optional
 
-from .interfaces import DataPoint, ModelInterface, SurveyInterface, SurveyParameter
+from surv_ai.lib.llm.usage import Usage, UsageTracker, get_usage_tracker
+from surv_ai.lib.log import logger
+from surv_ai.lib.scheduling import sliding_window
+
+from .interfaces import (
+    DataPoint,
+    ModelInterface,
+    SurveyInterface,
+    SurveyParameter,
+    SurveyResponse,
+)
+from .survey import Survey
 
 
 class Model(ModelInterface):
@@ -9,28 +22,90 @@ class Model(ModelInterface):
         survey_class: type[SurveyInterface],
         parameters: list[SurveyParameter],
         max_concurrency: int = 1,
+        token_budget: Optional[int] = None,
+        call_budget: Optional[int] = None,
     ):
         self.survey_class = survey_class
         self.max_concurrency = max_concurrency
         self.parameters = parameters
+        self.token_budget = token_budget
+        self.call_budget = call_budget
 
-    async def build(self, hypothesis: str) -> list[DataPoint]:
-        survey_index = 0
-        results = []
+        self.usage_tracker = UsageTracker(token_budget, call_budget)
+
+    @property
+    def usage(self) -> Usage:
+        """
+        Usage of the most recent build, including research shared between surveys.
+        """
+        return self.usage_tracker.usage
+
+    def _conduct_survey(self, hypothesis: str, parameter: SurveyParameter, research: dict[Hashable, asyncio.Task]):
+        survey = self.survey_class(**parameter.kwargs)
+
+        if not isinstance(survey, Survey):
+            return self.usage_tracker.track(survey.conduct(hypothesis))
+
+        if survey.research_key not in research:
+            research[survey.research_key] = asyncio.ensure_future(self.usage_tracker.track(survey.research(hypothesis)))
+
+        return self.usage_tracker.track(survey.conduct(hypothesis, research=research[survey.research_key]))
+
+    def _get_survey_factories(
+        self, hypothesis: str, research: dict[Hashable, asyncio.Task]
+    ) -> Iterator[Callable[[], Awaitable[SurveyResponse]]]:
+        for parameter in self.parameters:
+            if self.usage_tracker.exhausted:
+                logger.log_warning("Usage budget exhausted: no further surveys will be conducted.")
+                return
+
+            yield partial(self._conduct_survey, hypothesis, parameter, research)
 
-        while survey_index < len(self.parameters):
-            coroutines = []
+    async def _build(self, hypothesis: str) -> AsyncIterator[tuple[int, DataPoint]]:
+        """
+        Conducts a survey for each parameter, yielding `(index, data point)` pairs as they complete.
 
-            for _ in range(self.max_concurrency):
-                survey = self.survey_class(**self.parameters[survey_index].kwargs)
-                coroutines.append(survey.conduct(hypothesis))
-                survey_index += 1
+        Once the calls of the build have used up `token_budget` or `call_budget`, no further surveys
+        are started and surveys in progress stop polling agents.
+        """
+        self.usage_tracker = UsageTracker(self.token_budget, self.call_budget, parent=get_usage_tracker())
 
-            results += await asyncio.gather(*coroutines)
+        research: dict[Hashable, asyncio.Task] = {}
+        responses = sliding_window(self._get_survey_factories(hypothesis, research), self.max_concurrency)
+
+        try:
+            async for index, response in responses:
+                yield index, DataPoint(parameter=self.parameters[index], response=response)
+        finally:
+            await responses.aclose()
+
+            for task in research.values():
+                task.cancel()
+
+            await asyncio.gather(*research.values(), return_exceptions=True)
+
+    async def build_stream(self, hypothesis: str) -> AsyncIterator[DataPoint]:
+        """
+        Conducts a survey for each parameter, yielding data points in the order the surveys complete.
+
+        Closing the iterator early cancels every survey still in progress.
+        """
+        data_points = self._build(hypothesis)
+
+        try:
+            async for _, data_point in data_points:
+                yield data_point
+        finally:
+            await data_points.aclose()
+
+    async def build(self, hypothesis: str) -> list[DataPoint]:
+        """
+        Conducts a survey for each parameter, returning data points in the order of the parameters.
+        Parameters whose surveys were not started because the usage budget ran out are left out.
+        """
+        data_points = dict([item async for item in self._build(hypothesis)])
 
-        return [
-            DataPoint(parameter=parameter, response=response) for parameter, response in zip(self.parameters, results)
-        ]
+        return [data_points[index] for index in range(len(self.parameters)) if index in data_points]
 
     @staticmethod
     def get_plot_variables(data_points: list[DataPoint]):
@@ -1,16 +1,22 @@
-import asyncio
+from functools import cached_property, partial
 from random import sample
-from typing import Optional
+from typing import AsyncIterator, Awaitable, Callable, Hashable, Iterator, Optional
 
 from surv_ai.lib.conversation.conversation import Conversation
+from surv_ai.lib.intervals import wilson_interval
 from surv_ai.lib.knowledge_store.interfaces import Knowledge
+from surv_ai.lib.knowledge_store.layered import LayeredKnowledgeStore
+from surv_ai.lib.knowledge_store.local import LocalKnowledgeStore
 from surv_ai.lib.llm.interfaces import LargeLanguageModelClientInterface
+from surv_ai.lib.llm.usage import Usage, UsageTracker, get_usage_tracker
 from surv_ai.lib.log import logger
+from surv_ai.lib.scheduling import gather_sliding_window, sliding_window
 from surv_ai.lib.tools.interfaces import (
     NoMemoriesFoundException,
     ToolBeltInterface,
     ToolResult,
 )
+from surv_ai.lib.tracing import tracer
 
 from .agents.binary import BinaryAgent
 from .agents.reasoning import ReasoningAgent
@@ -27,14 +33,84 @@ class Survey(SurveyInterface):
         max_concurrency=10,
         max_knowledge_per_agent=3,
         base_knowledge: Optional[list[Knowledge]] = None,
+        max_research_concurrency: Optional[int] = None,
+        max_polling_concurrency: Optional[int] = None,
+        batch_stages: bool = False,
+        stage_batch_size: Optional[int] = None,
+        target_interval_width: Optional[float] = None,
+        confidence: float = 0.95,
+        recall_relevant_knowledge: bool = False,
+        token_budget: Optional[int] = None,
+        call_budget: Optional[int] = None,
     ):
         self.client = client
         self.tool_belt = tool_belt
 
         self.n_agents = n_agents
         self.max_concurrency = max_concurrency
+        self.max_research_concurrency = max_research_concurrency or max_concurrency
+        self.max_polling_concurrency = max_polling_concurrency or max_concurrency
         self.max_knowledge_per_agent = max_knowledge_per_agent
         self.base_knowledge = base_knowledge
+        self.batch_stages = batch_stages
+        self.stage_batch_size = stage_batch_size or max(1, self.max_polling_concurrency // 2)
+        self.target_interval_width = target_interval_width
+        self.confidence = confidence
+        self.recall_relevant_knowledge = recall_relevant_knowledge
+        self.token_budget = token_budget
+        self.call_budget = call_budget
+
+    @cached_property
+    def base_knowledge_store(self) -> LocalKnowledgeStore:
+        """
+        Store holding `base_knowledge`, shared read-only by every agent of the survey.
+        """
+        base_knowledge_store = LocalKnowledgeStore()
+
+        for knowledge in self.base_knowledge or []:
+            base_knowledge_store.add_knowledge(knowledge)
+
+        return base_knowledge_store
+
+    def _create_reasoning_agent(self, relevant_articles: list[Knowledge], index: int) -> ReasoningAgent:
+        reasoning_agent = ReasoningAgent(
+            self.client,
+            knowledge_store=LayeredKnowledgeStore(self.base_knowledge_store, base_first=False),
+            n_knowledge_items_per_prompt=self.max_knowledge_per_agent,
+            name=f"ReasoningAgent #{index + 1}",
+            recall_relevant_knowledge=self.recall_relevant_knowledge,
+            _hyperparameters={"temperature": 0.6},
+        )
+
+        for article in sample(
+            relevant_articles,
+            min(len(relevant_articles), self.max_knowledge_per_agent),
+        ):
+            reasoning_agent.teach_knowledge(article)
+
+        return reasoning_agent
+
+    def _create_binary_agent(self, statement: str, index: int) -> BinaryAgent:
+        binary_agent = BinaryAgent(
+            self.client,
+            name=f"BinaryAgent #{index + 1}",
+            _hyperparameters={"temperature": 0.2, "max_tokens": 5},
+        )
+        binary_agent.teach_text(statement, "Assertion")
+
+        return binary_agent
+
+    @staticmethod
+    def _parse_decision(decision: str) -> str:
+        true_in_decision = "true" in decision.lower()
+        false_in_decision = "false" in decision.lower()
+
+        if true_in_decision and not false_in_decision:
+            return "true"
+        elif false_in_decision and not true_in_decision:
+            return "false"
+        else:
+            return "undecided"
 
     async def _poll_agent(
         self,
@@ -45,30 +121,11 @@ class Survey(SurveyInterface):
     ):
         try:
             agent_name = f"ReasoningAgent #{index + 1}"
-            reasoning_agent = ReasoningAgent(
-                self.client,
-                n_knowledge_items_per_prompt=self.max_knowledge_per_agent,
-                name=agent_name,
-                _hyperparameters={"temperature": 0.6},
-            )
-
-            for article in sample(
-                relevant_articles,
-                min(len(relevant_articles), self.max_knowledge_per_agent),
-            ):
-                reasoning_agent.teach_knowledge(article)
-
-            if self.base_knowledge:
-                for knowledge in self.base_knowledge:
-                    reasoning_agent.teach_knowledge(knowledge)
+            reasoning_agent = self._create_reasoning_agent(relevant_articles, index)
 
             response = await reasoning_agent.prompt(statement)
 
-            binary_agent = BinaryAgent(
-                self.client,
-                _hyperparameters={"temperature": 0.2, "max_tokens": 5},
-            )
-            binary_agent.teach_text(statement, "Assertion")
+            binary_agent = self._create_binary_agent(statement, index)
 
             response_conversation = Conversation()
             response_conversation.add(response, agent_name, reasoning_agent.color)
@@ -76,68 +133,225 @@ class Survey(SurveyInterface):
             decision = await binary_agent.prompt(response_conversation)
             summaries.add(decision, agent_name, reasoning_agent.color)
 
-            true_in_decision = "true" in decision.lower()
-            false_in_decision = "false" in decision.lower()
+            logger.log_internal("%s used %s tokens...", agent_name, reasoning_agent.usage.total_tokens)
 
-            if true_in_decision and not false_in_decision:
-                return "true"
-            elif false_in_decision and not true_in_decision:
-                return "false"
-            else:
-                return "undecided"
+            return self._parse_decision(decision)
         except NoMemoriesFoundException:
             return "undecided"
         except Exception as e:
             logger.log_exception(e)
             return "error"
 
+    async def _poll_agent_batch(
+        self,
+        statement: str,
+        summaries: Conversation,
+        relevant_articles: list[Knowledge],
+        indices: range,
+    ) -> list[str]:
+        """
+        Polls a cohort of agents with each stage batched. An agent whose completion fails is
+        counted as an error without affecting the rest of the cohort.
+        """
+        try:
+            agent_names = [f"ReasoningAgent #{index + 1}" for index in indices]
+            reasoning_agents = [self._create_reasoning_agent(relevant_articles, index) for index in indices]
+
+            responses = await ReasoningAgent.prompt_batch(reasoning_agents, statement)
+            decisions = list(responses)
+
+            answered_indices = [index for index, response in enumerate(responses) if isinstance(response, str)]
+            response_conversations = []
+            for index in answered_indices:
+                response_conversation = Conversation()
+                response_conversation.add(responses[index], agent_names[index], reasoning_agents[index].color)
+                response_conversations.append(response_conversation)
+
+            binary_decisions = await BinaryAgent.prompt_batch(
+                [self._create_binary_agent(statement, indices[index]) for index in answered_indices],
+                response_conversations,
+            )
+            for index, decision in zip(answered_indices, binary_decisions):
+                decisions[index] = decision
+
+            results = []
+            for decision, agent_name, reasoning_agent in zip(decisions, agent_names, reasoning_agents):
+                if isinstance(decision, BaseException):
+                    logger.log_error("%s failed: %r", agent_name, decision)
+                    results.append("error")
+                else:
+                    summaries.add(decision, agent_name, reasoning_agent.color)
+                    results.append(self._parse_decision(decision))
+
+            return results
+        except NoMemoriesFoundException:
+            return ["undecided" for _ in indices]
+        except Exception as e:
+            logger.log_exception(e)
+            return ["error" for _ in indices]
+
+    def _can_dispatch(self, usage_tracker: UsageTracker) -> bool:
+        if usage_tracker.exhausted:
+            logger.log_warning("Usage budget exhausted: no further agents will be polled.")
+            return False
+
+        return True
+
+    async def _poll_cohort(
+        self,
+        statement: str,
+        summaries: Conversation,
+        relevant_articles: list[Knowledge],
+        indices: range,
+    ) -> list[str]:
+        if self.batch_stages:
+            return await self._poll_agent_batch(statement, summaries, relevant_articles, indices)
+
+        return [await self._poll_agent(statement, summaries, relevant_articles, index) for index in indices]
+
+    def _get_poll_factories(
+        self,
+        statement: str,
+        summaries: Conversation,
+        relevant_articles: list[Knowledge],
+        usage_tracker: UsageTracker,
+        cohort_size: int,
+    ) -> Iterator[Callable[[], Awaitable[list[str]]]]:
+        for start in range(0, self.n_agents, cohort_size):
+            if not self._can_dispatch(usage_tracker):
+                return
+
+            indices = range(start, min(start + cohort_size, self.n_agents))
+
+            yield lambda indices=indices: usage_tracker.track(
+                self._poll_cohort(statement, summaries, relevant_articles, indices)
+            )
+
+    async def _poll_agents(
+        self,
+        statement: str,
+        summaries: Conversation,
+        relevant_articles: list[Knowledge],
+        usage_tracker: UsageTracker,
+    ) -> AsyncIterator[str]:
+        """
+        Polls agents through a sliding window, one at a time or, with `batch_stages`, in cohorts of
+        `stage_batch_size` that go through each stage together, with the prompts of each stage
+        submitted in a single `get_completions` call. Every stage waits for the whole cohort, so
+        batching only pays off with clients that serve a batch faster than its prompts one by one.
+        A new cohort starts as soon as another finishes, so a slow cohort does not hold up the rest.
+
+        Dispatch of new agents stops once `usage_tracker` is out of budget. Agents already being
+        polled run to completion.
+        """
+        cohort_size = self.stage_batch_size if self.batch_stages else 1
+
+        cohorts = sliding_window(
+            self._get_poll_factories(statement, summaries, relevant_articles, usage_tracker, cohort_size),
+            max(1, self.max_polling_concurrency // cohort_size),
+        )
+
+        try:
+            async for _, decisions in cohorts:
+                for decision in decisions:
+                    yield decision
+        finally:
+            await cohorts.aclose()
+
     async def _summarize_webpage(self, hypothesis: str, page: ToolResult):
+        SIZE_TO_SUMMARIZE_ABOVE = 1000
+        if len(page.body) <= SIZE_TO_SUMMARIZE_ABOVE:
+            summary_text = f"{page.title}: {page.body}"
+            logger.log_context(summary_text)
+
+            return Knowledge.construct(
+                text=summary_text,
+                source=page.url,
+            )
+
         summary_agent = WebPageSummaryAgent(self.client, _hyperparameters={"temperature": 0.2})
         page_summary = await summary_agent.prompt(hypothesis, page.site_name, page.title, page.body)
 
         summary_text = f"{page.title}: {page_summary}"
         logger.log_context(summary_text)
 
-        return Knowledge(
+        return Knowledge.construct(
             text=summary_text,
             source=page.url,
         )
 
-    async def conduct(self, hypothesis: str):
+    @property
+    def research_key(self) -> Hashable:
+        """
+        Surveys with equal research keys produce equivalent research, which can be shared between them.
+        """
+        return (
+            id(self.client),
+            tuple(id(tool) for tool in self.tool_belt.tools),
+            tuple((knowledge.text, knowledge.source) for knowledge in self.base_knowledge or []),
+        )
+
+    async def research(self, hypothesis: str) -> list[Knowledge]:
+        relevant_webpages: list[ToolResult] = await self.tool_belt.inspect(
+            self.client, hypothesis, self.base_knowledge or []
+        )
+
+        return await gather_sliding_window(
+            [partial(self._summarize_webpage, hypothesis, page) for page in relevant_webpages],
+            self.max_research_concurrency,
+        )
+
+    def _tally(self, results: dict[str, int], usage: Optional[Usage] = None) -> SurveyResponse:
+        if results["true"] + results["false"] == 0:
+            percent_in_favor = 0
+            uncertainty = 1
+        else:
+            percent_in_favor = results["true"] / (results["true"] + results["false"])
+            uncertainty = results["undecided"] / (results["true"] + results["false"])
+
+        return SurveyResponse.construct(
+            in_favor=results["true"],
+            against=results["false"],
+            undecided=results["undecided"],
+            error=results["error"],
+            percent_in_favor=percent_in_favor,
+            uncertainty=uncertainty,
+            usage=usage or Usage.construct(),
+        )
+
+    def _is_conclusive(self, results: dict[str, int]) -> bool:
+        if self.target_interval_width is None:
+            return False
+
+        lower, upper = wilson_interval(results["true"], results["true"] + results["false"], self.confidence)
+
+        return upper - lower <= self.target_interval_width
+
+    async def stream(
+        self, hypothesis: str, research: Optional[Awaitable[list[Knowledge]]] = None
+    ) -> AsyncIterator[SurveyResponse]:
+        """
+        Polls agents on a hypothesis, yielding the running result after each agent decides.
+
+        Closing the iterator early cancels every agent still being polled. If `target_interval_width`
+        is set, polling stops as soon as the confidence interval on `percent_in_favor` is narrower
+        than the target, with `n_agents` as an upper bound.
+
+        If `token_budget` or `call_budget` is set, no further agents are polled once the calls of
+        this survey, including its own research, have used up the budget, and the partial result
+        is returned. The `usage` of each result counts the same calls.
+        """
         results = {"true": 0, "false": 0, "undecided": 0, "error": 0}
 
-        summaries = Conversation()
-        agents = 0
+        summaries = Conversation(keep_text=False)
+        usage_tracker = UsageTracker(self.token_budget, self.call_budget, parent=get_usage_tracker())
 
         try:
-            relevant_webpages: list[ToolResult] = await self.tool_belt.inspect(
-                self.client, hypothesis, self.base_knowledge or []
+            webpage_summaries = await (
+                research if research is not None else usage_tracker.track(self.research(hypothesis))
             )
-            webpage_summaries = []
-            while len(relevant_webpages):
-                coroutines = []
-                for _ in range(self.max_concurrency):
-                    if not relevant_webpages:
-                        break
-                    page = relevant_webpages.pop(0)
-
-                    SIZE_TO_SUMMARIZE_ABOVE = 1000
-                    if len(page.body) > SIZE_TO_SUMMARIZE_ABOVE:
-                        coroutines.append(self._summarize_webpage(hypothesis, page))
-                    else:
-                        summary_text = f"{page.title}: {page.body}"
-                        logger.log_context(summary_text)
-                        webpage_summaries.append(
-                            Knowledge(
-                                text=summary_text,
-                                source=page.url,
-                            )
-                        )
-
-                webpage_summaries += await asyncio.gather(*coroutines)
-
         except NoMemoriesFoundException:
-            return SurveyResponse(
+            yield SurveyResponse(
                 in_favor=0,
                 against=0,
                 undecided=0,
@@ -145,35 +359,38 @@ class Survey(SurveyInterface):
                 percent_in_favor=0,
                 uncertainty=0,
             )
+            return
 
-        while agents < self.n_agents:
-            coroutines = []
+        decisions = self._poll_agents(hypothesis, summaries, webpage_summaries, usage_tracker)
+        try:
+            async for decision in decisions:
+                results[decision] += 1
 
-            error_rate = results["error"] / self.n_agents
-            if error_rate > 0.25:
-                raise Exception("Agent error rate is unusually high, likely an issue with API access.")
+                error_rate = results["error"] / self.n_agents
+                if error_rate > 0.25:
+                    raise Exception("Agent error rate is unusually high, likely an issue with API access.")
 
-            for index in range(min(self.max_concurrency, self.n_agents - agents)):
-                coroutines.append(self._poll_agent(hypothesis, summaries, webpage_summaries, index))
-                agents += 1
+                yield self._tally(results, usage_tracker.usage)
 
-            decisions = await asyncio.gather(*coroutines)
+                if self._is_conclusive(results):
+                    logger.log_internal("Result is conclusive after polling %s agents...", sum(results.values()))
+                    break
+        finally:
+            await decisions.aclose()
 
-            for decision in decisions:
-                results[decision] += 1
+    async def conduct(self, hypothesis: str, research: Optional[Awaitable[list[Knowledge]]] = None):
+        """
+        Polls agents on a hypothesis. Pass a shared task as `research` to reuse the research phase
+        of an equivalent survey.
+        """
+        response = self._tally({"true": 0, "false": 0, "undecided": 0, "error": 0})
 
-        if results["true"] + results["false"] == 0:
-            percent_in_favor = 0
-            uncertainty = 1
-        else:
-            percent_in_favor = results["true"] / (results["true"] + results["false"])
-            uncertainty = results["undecided"] / (results["true"] + results["false"])
+        with tracer.span("survey.conduct", attributes={"surv_ai.n_agents": self.n_agents}) as span:
+            async for response in self.stream(hypothesis, research=research):
+                pass
 
-        return SurveyResponse(
-            in_favor=results["true"],
-            against=results["false"],
-            undecided=results["undecided"],
-            error=results["error"],
-            percent_in_favor=percent_in_favor,
-            uncertainty=uncertainty,
-        )
+            span.set_attribute(
+                "surv_ai.n_polled", response.in_favor + response.against + response.undecided + response.error
+            )
+
+        return response
@@ -0,0 +1,96 @@
+import math
+import re
+from array import array
+from collections import Counter
+from typing import Iterable
+
+import numpy as np
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were will with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in re.findall(r"[a-z0-9]+", text.lower()) if token not in STOP_WORDS]
+
+
+class BM25Index:
+    """
+    Inverted index ranking documents against keyword queries with Okapi BM25.
+
+    Documents are identified by the order in which they were added, and can be added
+    incrementally. Postings are stored in compact arrays and scored with numpy: only the
+    postings of the query's terms are read, and their scores are added into one dense array
+    holding a score for every document.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+
+        self._postings: dict[str, tuple[array, array]] = {}
+        self._document_lengths = array("I")
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._document_lengths)
+
+    def add(self, documents: Iterable[str]):
+        for text in documents:
+            document_id = len(self._document_lengths)
+            terms = Counter(tokenize(text))
+
+            for term, frequency in terms.items():
+                if term not in self._postings:
+                    self._postings[term] = (array("I"), array("I"))
+
+                document_ids, frequencies = self._postings[term]
+                document_ids.append(document_id)
+                frequencies.append(frequency)
+
+            length = sum(terms.values())
+            self._document_lengths.append(length)
+            self._total_length += length
+
+    def score(self, query: str) -> np.ndarray:
+        """
+        Returns the score of every document against `query`, zero for documents matching no term.
+        The array is dense, so each call allocates one float per indexed document.
+        """
+        scores = np.zeros(len(self), dtype=np.float64)
+        if not len(self):
+            return scores
+
+        document_lengths = np.frombuffer(self._document_lengths, dtype=np.uint32)
+        average_length = max(self._total_length / len(self), 1.0)
+
+        for term in set(tokenize(query)):
+            if term not in self._postings:
+                continue
+
+            document_ids, frequencies = (np.frombuffer(postings, dtype=np.uint32) for postings in self._postings[term])
+            idf = math.log(1 + (len(self) - len(document_ids) + 0.5) / (len(document_ids) + 0.5))
+
+            normalization = self.k1 * (1 - self.b + self.b * document_lengths[document_ids] / average_length)
+            scores[document_ids] += idf * frequencies * (self.k1 + 1) / (frequencies + normalization)
+
+        return scores
+
+    def search(self, query: str, top_k: int = 10) -> list[tuple[int, float]]:
+        """
+        Returns up to `top_k` `(document_id, score)` pairs matching `query`, best first. Matches are
+        found by scanning the dense scores for non-zero entries, and only they are sorted.
+        """
+        if top_k <= 0:
+            return []
+
+        scores = self.score(query)
+
+        matches = np.flatnonzero(scores)
+        if len(matches) > top_k:
+            matches = matches[np.argpartition(-scores[matches], top_k - 1)[:top_k]]
+
+        ranked = matches[np.lexsort((matches, -scores[matches]))]
+
+        return [(int(document_id), float(scores[document_id])) for document_id in ranked]
@@ -1,3 +1,5 @@
+from collections import Counter, deque
+from itertools import islice
 from typing import Optional
 
 from colorama import Fore
@@ -8,12 +10,38 @@ from .interfaces import ChatMessage, ConversationInterface
 
 
 class Conversation(ConversationInterface):
-    def __init__(self):
-        self.history: list[ChatMessage] = []
+    """
+    History of chat messages.
+
+    With `max_messages` set, only the most recent messages are kept, in a ring buffer. With
+    `keep_text=False`, no messages are kept at all and only `n_messages` and `speaker_counts` are
+    updated, so memory stays flat however many messages are added.
+    """
+
+    def __init__(self, max_messages: Optional[int] = None, keep_text: bool = True):
+        self.max_messages = max_messages
+        self.keep_text = keep_text
+
+        maxlen = max_messages if keep_text else 0
+        self.history: deque[ChatMessage] = deque(maxlen=maxlen)
+        self.n_messages = 0
+        self.speaker_counts: Counter[str] = Counter()
+
+        self._rendered_messages: deque[str] = deque(maxlen=maxlen)
+        self._rendered_strings: dict[tuple[int, tuple[str, ...]], str] = {}
 
     def add(self, message: str, speaker: str, color: str = Fore.LIGHTBLACK_EX):
-        logger.log_output(f"{speaker}: {message}", color)
-        self.history.append(ChatMessage(text=message, speaker=speaker, color=color))
+        logger.log_output("%s: %s", speaker, message, color=color)
+
+        self.n_messages += 1
+        self.speaker_counts[speaker] += 1
+
+        if self.keep_text:
+            chat_message = ChatMessage.construct(text=message, speaker=speaker, color=color)
+
+            self.history.append(chat_message)
+            self._rendered_messages.append(str(chat_message))
+            self._rendered_strings.clear()
 
     def __iter__(self):
         return iter(self.history)
@@ -22,16 +50,25 @@ class Conversation(ConversationInterface):
         return len(self.history)
 
     def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self.history)[index]
+
         return self.history[index]
 
     def as_string(self, n_most_recent=5, exclude_speakers: Optional[list[str]] = None):
-        if exclude_speakers is None:
-            exclude_speakers = []
+        """
+        Renders the `n_most_recent` messages, leaving out those of `exclude_speakers`. Each message
+        is rendered once when added, and the result is reused until the next message arrives.
+        """
+        key = (n_most_recent, tuple(exclude_speakers or []))
 
-        return (
-            "```\n"
-            + "\n\n".join(
-                [str(message) for message in self.history[-n_most_recent:] if message.speaker not in exclude_speakers]
+        if key not in self._rendered_strings:
+            recent = list(islice(zip(reversed(self.history), reversed(self._rendered_messages)), max(n_most_recent, 0)))
+
+            self._rendered_strings[key] = (
+                "```\n"
+                + "\n\n".join([rendered for message, rendered in reversed(recent) if message.speaker not in key[1]])
+                + "\n```"
             )
-            + "\n```"
-        )
+
+        return self._rendered_strings[key]
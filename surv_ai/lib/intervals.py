@@ -0,0 +1,20 @@
+import math
+from statistics import NormalDist
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = 0.95) -> tuple[float, float]:
+    """
+    Wilson score interval for a binomial proportion. Unlike the normal approximation it stays
+    inside [0, 1] and is well behaved for small samples and proportions near 0 or 1.
+    """
+    if trials == 0:
+        return 0.0, 1.0
+
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    proportion = successes / trials
+
+    denominator = 1 + z**2 / trials
+    center = (proportion + z**2 / (2 * trials)) / denominator
+    margin = z * math.sqrt(proportion * (1 - proportion) / trials + z**2 / (4 * trials**2)) / denominator
+
+    return max(0.0, center - margin), min(1.0, center + margin)
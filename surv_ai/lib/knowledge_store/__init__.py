@@ -1 +1,3 @@
+from .layered import LayeredKnowledgeStore  # noqa: F401
 from .local import LocalKnowledgeStore  # noqa: F401
+from .sqlite import SQLiteKnowledgeStore  # noqa: F401
@@ -17,6 +17,9 @@ class KnowledgeStoreInterface(Protocol):
     def recall_recent(self, n_knowledge_items=5, **kwargs) -> list[Knowledge]:
         ...
 
+    def recall_relevant(self, query: str, n_knowledge_items=5, **kwargs) -> list[Knowledge]:
+        ...
+
     def add_text(self, input: str, source: Optional[str] = None, **kwargs):
         ...
 
@@ -0,0 +1,106 @@
+from typing import Optional
+
+from surv_ai.lib.bm25 import BM25Index
+
+from .interfaces import Knowledge, KnowledgeStoreInterface
+from .local import LocalKnowledgeStore
+
+
+class LayeredKnowledgeStore(KnowledgeStoreInterface):
+    """
+    Knowledge store layering a small, private overlay over a shared base store.
+
+    The base store is only ever read, so one base can be shared by any number of agents while
+    everything taught to an agent goes into its own overlay. `base_first` decides whether the
+    base is treated as taught before the overlay, or after it, when recalling recent knowledge.
+    """
+
+    def __init__(
+        self,
+        base: KnowledgeStoreInterface,
+        overlay: Optional[KnowledgeStoreInterface] = None,
+        base_first: bool = True,
+    ):
+        self.base = base
+        self.overlay = overlay if overlay is not None else LocalKnowledgeStore()
+        self.base_first = base_first
+
+    @property
+    def _layers(self) -> tuple[KnowledgeStoreInterface, KnowledgeStoreInterface]:
+        """
+        Returns the layers from oldest to newest.
+        """
+        return (self.base, self.overlay) if self.base_first else (self.overlay, self.base)
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.overlay)
+
+    @property
+    def knowledge(self) -> list[Knowledge]:
+        return self.filter_knowledge()
+
+    def add_text(self, input: str, source: Optional[str] = None):
+        self.overlay.add_text(input, source)
+
+    def add_knowledge(self, knowledge: Knowledge):
+        self.overlay.add_knowledge(knowledge)
+
+    def filter_knowledge(
+        self,
+        include_sources: Optional[list[str]] = None,
+        exclude_sources: Optional[list[str]] = None,
+    ) -> list[Knowledge]:
+        older, newer = self._layers
+
+        return older.filter_knowledge(include_sources, exclude_sources) + newer.filter_knowledge(
+            include_sources, exclude_sources
+        )
+
+    def recall_recent(
+        self,
+        n_knowledge_items=5,
+        include_sources: Optional[list[str]] = None,
+        exclude_sources: Optional[list[str]] = None,
+    ) -> list[Knowledge]:
+        if n_knowledge_items <= 0:
+            return []
+
+        older, newer = self._layers
+
+        newer_knowledge = newer.recall_recent(n_knowledge_items, include_sources, exclude_sources)
+        if len(newer_knowledge) == n_knowledge_items:
+            return newer_knowledge
+
+        return (
+            older.recall_recent(n_knowledge_items - len(newer_knowledge), include_sources, exclude_sources)
+            + newer_knowledge
+        )
+
+    def recall_relevant(
+        self,
+        query: str,
+        n_knowledge_items=5,
+        include_sources: Optional[list[str]] = None,
+        exclude_sources: Optional[list[str]] = None,
+    ) -> list[Knowledge]:
+        """
+        Recalls the most relevant items of each layer, then ranks them together, since the scores
+        of separately indexed layers are not comparable.
+        """
+        candidates = [
+            knowledge
+            for layer in self._layers
+            for knowledge in layer.recall_relevant(query, n_knowledge_items, include_sources, exclude_sources)
+        ]
+
+        index = BM25Index()
+        index.add(knowledge.text for knowledge in candidates)
+
+        ranked_ids = [candidate_id for candidate_id, _ in index.search(query, len(candidates))]
+        ranked_ids += [candidate_id for candidate_id in range(len(candidates)) if candidate_id not in ranked_ids]
+
+        return [candidates[candidate_id] for candidate_id in ranked_ids[:n_knowledge_items]]
+
+    @staticmethod
+    def knowledge_as_string(knowledge: list[Knowledge]) -> str:
+        return "\n".join(f"{i + 1}. {m.text}" for i, m in enumerate(knowledge)) if knowledge else ""
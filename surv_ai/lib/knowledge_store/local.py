@@ -1,32 +1,89 @@
-from typing import Optional
+import heapq
+from collections import deque
+from itertools import islice
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from surv_ai.lib.bm25 import BM25Index
 
 from .interfaces import Knowledge, KnowledgeStoreInterface
 
 
+class KnowledgeItem:
+    __slots__ = ("sequence", "text", "source")
+
+    def __init__(self, sequence: int, text: str, source: Optional[str]):
+        self.sequence = sequence
+        self.text = text
+        self.source = source
+
+    def to_knowledge(self) -> Knowledge:
+        return Knowledge.construct(text=self.text, source=self.source)
+
+
 class LocalKnowledgeStore(KnowledgeStoreInterface):
+    """
+    In-memory knowledge store.
+
+    Items are kept in insertion order, and also in a deque per source, so that recalling the
+    most recent items from a few sources never scans the rest of the store. A BM25 index for
+    `recall_relevant` is built on first use and then extended with items added since.
+    """
+
     def __init__(self):
-        self.knowledge: list[Knowledge] = []
+        self._items: list[KnowledgeItem] = []
+        self._items_by_source: dict[Optional[str], deque[KnowledgeItem]] = {}
+        self._index = BM25Index()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def knowledge(self) -> list[Knowledge]:
+        return [item.to_knowledge() for item in self._items]
 
     def add_text(self, input: str, source: Optional[str] = None):
-        self.knowledge.append(Knowledge(text=input, source=source))
+        item = KnowledgeItem(len(self._items), input, source)
+
+        self._items.append(item)
+        self._items_by_source.setdefault(source, deque()).append(item)
 
     def add_knowledge(self, knowledge: Knowledge):
-        self.knowledge.append(knowledge)
+        self.add_text(knowledge.text, knowledge.source)
+
+    def _get_sources(
+        self,
+        include_sources: Optional[Iterable[str]] = None,
+        exclude_sources: Optional[Iterable[str]] = None,
+    ) -> Optional[set[Optional[str]]]:
+        """
+        Returns the set of sources passing the filters, or `None` if every source does.
+        """
+        if not include_sources and not exclude_sources:
+            return None
+
+        sources = set(include_sources) if include_sources else set(self._items_by_source)
+
+        return sources - set(exclude_sources or ())
 
     def filter_knowledge(
         self,
         include_sources: Optional[list[str]] = None,
         exclude_sources: Optional[list[str]] = None,
     ):
-        knowledge = self.knowledge
+        sources = self._get_sources(include_sources, exclude_sources)
 
-        if include_sources:
-            knowledge = [knowledge_item for knowledge_item in knowledge if knowledge_item.source in include_sources]
+        return [item.to_knowledge() for item in self._items if sources is None or item.source in sources]
 
-        if exclude_sources:
-            knowledge = [knowledge_item for knowledge_item in knowledge if knowledge_item.source not in exclude_sources]
+    def _iter_recent(self, sources: Optional[set[Optional[str]]]) -> Iterator[KnowledgeItem]:
+        if sources is None:
+            return reversed(self._items)
 
-        return knowledge
+        return heapq.merge(
+            *[reversed(self._items_by_source[source]) for source in sources if source in self._items_by_source],
+            key=lambda item: -item.sequence,
+        )
 
     def recall_recent(
         self,
@@ -34,9 +91,44 @@ class LocalKnowledgeStore(KnowledgeStoreInterface):
         include_sources: Optional[list[str]] = None,
         exclude_sources: Optional[list[str]] = None,
     ) -> list[Knowledge]:
-        return [knowledge_item for knowledge_item in self.filter_knowledge(include_sources, exclude_sources)][
-            -n_knowledge_items:
-        ]
+        if n_knowledge_items <= 0:
+            return []
+
+        sources = self._get_sources(include_sources, exclude_sources)
+        recent_items = list(islice(self._iter_recent(sources), n_knowledge_items))
+
+        return [item.to_knowledge() for item in reversed(recent_items)]
+
+    def recall_relevant(
+        self,
+        query: str,
+        n_knowledge_items=5,
+        include_sources: Optional[list[str]] = None,
+        exclude_sources: Optional[list[str]] = None,
+    ) -> list[Knowledge]:
+        """
+        Returns up to `n_knowledge_items` items sharing terms with `query`, most relevant first.
+        """
+        if n_knowledge_items <= 0:
+            return []
+
+        self._index.add(item.text for item in self._items[len(self._index) :])
+
+        sources = self._get_sources(include_sources, exclude_sources)
+        scores = self._index.score(query)
+
+        matches = np.flatnonzero(scores)
+        relevant_items = []
+        for sequence in matches[np.lexsort((matches, -scores[matches]))]:
+            item = self._items[sequence]
+
+            if sources is None or item.source in sources:
+                relevant_items.append(item)
+
+                if len(relevant_items) == n_knowledge_items:
+                    break
+
+        return [item.to_knowledge() for item in relevant_items]
 
     @staticmethod
     def knowledge_as_string(knowledge: list[Knowledge]) -> str:
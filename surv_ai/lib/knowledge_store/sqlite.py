@@ -0,0 +1,163 @@
+import sqlite3
+from typing import Iterable, Optional
+
+from surv_ai.lib.bm25 import tokenize
+
+from .interfaces import Knowledge, KnowledgeStoreInterface
+
+
+class SQLiteKnowledgeStore(KnowledgeStoreInterface):
+    """
+    Persistent knowledge store backed by a SQLite database with an FTS5 full-text index.
+
+    The database is written in WAL mode, so any number of processes can open it with
+    `read_only=True` and recall from it while another process adds knowledge.
+    """
+
+    def __init__(self, path: str = ".surv_ai_knowledge.sqlite3", read_only: bool = False):
+        self.path = path
+        self.read_only = read_only
+
+        if read_only:
+            self._connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        else:
+            self._connection = sqlite3.connect(path)
+            self._create_schema()
+
+    def _create_schema(self):
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS knowledge (
+                id INTEGER PRIMARY KEY,
+                text TEXT NOT NULL,
+                source TEXT
+            );
+
+            CREATE INDEX IF NOT EXISTS knowledge_source ON knowledge (source, id);
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts USING fts5(
+                text,
+                content='knowledge',
+                content_rowid='id',
+                tokenize='porter unicode61'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS knowledge_insert AFTER INSERT ON knowledge BEGIN
+                INSERT INTO knowledge_fts (rowid, text) VALUES (new.id, new.text);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS knowledge_delete AFTER DELETE ON knowledge BEGIN
+                INSERT INTO knowledge_fts (knowledge_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            END;
+            """
+        )
+        self._connection.commit()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM knowledge").fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+    def add_text(self, input: str, source: Optional[str] = None):
+        with self._connection:
+            self._connection.execute("INSERT INTO knowledge (text, source) VALUES (?, ?)", (input, source))
+
+    def add_knowledge(self, knowledge: Knowledge):
+        self.add_many([knowledge])
+
+    def add_many(self, knowledge: Iterable[Knowledge]):
+        """
+        Inserts many items in a single transaction.
+        """
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO knowledge (text, source) VALUES (?, ?)",
+                ((knowledge_item.text, knowledge_item.source) for knowledge_item in knowledge),
+            )
+
+    @staticmethod
+    def _get_source_filter(
+        include_sources: Optional[list[str]] = None,
+        exclude_sources: Optional[list[str]] = None,
+    ) -> tuple[str, list[str]]:
+        conditions = []
+        parameters: list[str] = []
+
+        if include_sources:
+            conditions.append(f"knowledge.source IN ({', '.join('?' * len(include_sources))})")
+            parameters += include_sources
+
+        if exclude_sources:
+            conditions.append(
+                f"(knowledge.source IS NULL OR knowledge.source NOT IN ({', '.join('?' * len(exclude_sources))}))"
+            )
+            parameters += exclude_sources
+
+        return " AND ".join(conditions) or "1", parameters
+
+    def filter_knowledge(
+        self,
+        include_sources: Optional[list[str]] = None,
+        exclude_sources: Optional[list[str]] = None,
+    ) -> list[Knowledge]:
+        source_filter, parameters = self._get_source_filter(include_sources, exclude_sources)
+
+        rows = self._connection.execute(
+            f"SELECT text, source FROM knowledge WHERE {source_filter} ORDER BY id",
+            parameters,
+        )
+
+        return [Knowledge.construct(text=text, source=source) for text, source in rows]
+
+    def recall_recent(
+        self,
+        n_knowledge_items=5,
+        include_sources: Optional[list[str]] = None,
+        exclude_sources: Optional[list[str]] = None,
+    ) -> list[Knowledge]:
+        if n_knowledge_items <= 0:
+            return []
+
+        source_filter, parameters = self._get_source_filter(include_sources, exclude_sources)
+
+        rows = self._connection.execute(
+            f"SELECT text, source FROM knowledge WHERE {source_filter} ORDER BY id DESC LIMIT ?",
+            [*parameters, n_knowledge_items],
+        ).fetchall()
+
+        return [Knowledge.construct(text=text, source=source) for text, source in reversed(rows)]
+
+    def recall_relevant(
+        self,
+        query: str,
+        n_knowledge_items=5,
+        include_sources: Optional[list[str]] = None,
+        exclude_sources: Optional[list[str]] = None,
+    ) -> list[Knowledge]:
+        """
+        Returns up to `n_knowledge_items` items matching any term of `query`, ranked by FTS5's BM25.
+        """
+        terms = tokenize(query)
+        if n_knowledge_items <= 0 or not terms:
+            return []
+
+        source_filter, parameters = self._get_source_filter(include_sources, exclude_sources)
+
+        rows = self._connection.execute(
+            f"""
+            SELECT knowledge.text, knowledge.source FROM knowledge_fts
+            JOIN knowledge ON knowledge.id = knowledge_fts.rowid
+            WHERE knowledge_fts MATCH ? AND {source_filter}
+            ORDER BY bm25(knowledge_fts), knowledge.id
+            LIMIT ?
+            """,
+            [" OR ".join(f'"{term}"' for term in dict.fromkeys(terms)), *parameters, n_knowledge_items],
+        )
+
+        return [Knowledge.construct(text=text, source=source) for text, source in rows]
+
+    @staticmethod
+    def knowledge_as_string(knowledge: list[Knowledge]) -> str:
+        return "\n".join(f"{i + 1}. {m.text}" for i, m in enumerate(knowledge)) if knowledge else ""
@@ -1,11 +1,18 @@
 import asyncio
+import time
 from enum import Enum
-
-import requests
+from typing import Optional
 
 from surv_ai.lib.log import logger
+from surv_ai.lib.tracing import SpanKind, tracer
+from surv_ai.lib.transport import HTTPTransport, default_transport
 
+from .batching import prompt_context
+from .concurrency import ConcurrencyGovernor, get_governor
 from .interfaces import LargeLanguageModelClientInterface, Prompt
+from .retry import RetryAction, RetryPolicy
+from .tokens import estimate_tokens
+from .usage import record_usage
 
 
 class AnthropicModel(str, Enum):
@@ -19,21 +26,27 @@ class AnthropicClient(LargeLanguageModelClientInterface):
     def __init__(
         self,
         api_key: str,
+        transport: Optional[HTTPTransport] = None,
+        governor: Optional[ConcurrencyGovernor] = None,
+        retry_policy: Optional[RetryPolicy] = None,
     ):
         self.api_key = api_key
+        self.transport = transport or default_transport
+        self.governor = governor or get_governor("anthropic", api_key)
+        self.retry_policy = retry_policy or RetryPolicy(status_actions={400: RetryAction.FAIL})
 
     async def _get_completion(
         self,
         prompt: Prompt,
-        attempt=1,
         presence_penalty=0,
         frequency_penalty=0,
         temperature=1,
         top_p=1,
         max_tokens: int = 800,
         model=AnthropicModel.CLAUDE_V1,
-        token_multiplier=1.6,
     ) -> str:
+        self.retry_policy.record_request()
+
         for message in prompt.messages:
             if message.role in ["user", "system"]:
                 message.role = "Human"
@@ -47,61 +60,93 @@ class AnthropicClient(LargeLanguageModelClientInterface):
             + "\n\nAssistant: "
         )
 
-        response = None
-        try:
-            request = {
-                "model": model,
-                "prompt": messages,
-                "temperature": temperature,
-                "top_p": top_p,
-                "max_tokens_to_sample": max_tokens,
-                "stop_sequences": ["\n\nUser:"],
-            }
-
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: requests.post(
-                    "https://api.anthropic.com/v1/complete",
-                    json=request,
-                    headers={
-                        "Content-Type": "application/json",
-                        "x-api-key": f"{self.api_key}",
-                    },
-                ),
-            )
-
+        with prompt_context(prompt), tracer.span(
+            "llm.completion",
+            SpanKind.CLIENT,
+            {"gen_ai.system": "anthropic", "gen_ai.request.model": model, "gen_ai.request.max_tokens": max_tokens},
+        ) as span:
+            attempt = 1
+            queue_seconds = 0.0
+            latency_seconds = None
+            response = None
             try:
-                response_body = response.json()
-            except Exception:
-                response_body = response.text
-
-            response.raise_for_status()
-        except Exception as e:
-            if not response or response.status_code == 429 or response.status_code == 502:
-                seconds_to_wait = 0.5 * attempt
-                logger.log_internal("Exceeded model rate limit: attempting backoff...")
-                await asyncio.sleep(seconds_to_wait)
-
-                if attempt < 5:
-                    return await self._get_completion(prompt, attempt + 1)
-            elif response.status_code == 400:
-                if attempt < 5:
-                    logger.log_internal("Exceeded model context length limit: attempting to reduce prompt size...")
-
-                    return await self._get_completion(
-                        prompt,
-                        attempt + 1,
-                        token_multiplier=token_multiplier - 0.2,
-                    )
-
-            logger.log_exception(e)
-            raise Exception(
-                f"Call to Anthropic API failed with status {response.status_code}.",
-                response_body,
-            )
-
-        return response_body["completion"]
+                while True:
+                    response = None
+                    response_body = None
+                    try:
+                        request = {
+                            "model": model,
+                            "prompt": messages,
+                            "temperature": temperature,
+                            "top_p": top_p,
+                            "max_tokens_to_sample": max_tokens,
+                            "stop_sequences": ["\n\nUser:"],
+                        }
+
+                        async with self.governor.request(max_tokens) as governed_request:
+                            queue_seconds += governed_request.queue_seconds
+                            sent_at = time.monotonic()
+                            response = await self.transport.post(
+                                "https://api.anthropic.com/v1/complete",
+                                json=request,
+                                headers={
+                                    "Content-Type": "application/json",
+                                    "x-api-key": f"{self.api_key}",
+                                },
+                            )
+                            governed_request.status_code = response.status_code
+                            latency_seconds = time.monotonic() - sent_at
+
+                        try:
+                            response_body = response.json()
+                        except Exception:
+                            response_body = response.text
+
+                        response.raise_for_status()
+
+                        completion = response_body["completion"]
+
+                        # The completions API does not report usage, and Claude has its own tokenizer,
+                        # so token counts are estimated from the length of the text.
+                        prompt_tokens = estimate_tokens(messages)
+                        completion_tokens = estimate_tokens(completion)
+
+                        record_usage(prompt_tokens, completion_tokens)
+                        span.set_attributes(
+                            {
+                                "gen_ai.usage.input_tokens": prompt_tokens,
+                                "gen_ai.usage.output_tokens": completion_tokens,
+                                "surv_ai.usage.estimated": True,
+                            }
+                        )
+
+                        return completion
+                    except Exception as e:
+                        status_code = response.status_code if response is not None else None
+                        action = self.retry_policy.get_action(attempt, status_code)
+
+                        if action == RetryAction.BACKOFF:
+                            logger.log_internal("Exceeded model rate limit: attempting backoff...")
+                            await asyncio.sleep(
+                                self.retry_policy.get_delay(attempt, response.headers if response is not None else None)
+                            )
+                        else:
+                            logger.log_exception(e)
+                            raise Exception(
+                                f"Call to Anthropic API failed with status {status_code}.",
+                                response_body,
+                            )
+
+                        attempt += 1
+            finally:
+                span.set_attributes(
+                    {
+                        "surv_ai.retries": attempt - 1,
+                        "surv_ai.queue_seconds": queue_seconds,
+                        "surv_ai.latency_seconds": latency_seconds,
+                        "http.response.status_code": response.status_code if response is not None else None,
+                    }
+                )
 
     async def get_completions(
         self,
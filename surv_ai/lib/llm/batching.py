@@ -0,0 +1,39 @@
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, ContextManager, Iterable, Iterator
+
+from .interfaces import Prompt
+
+_prompt_contexts: contextvars.ContextVar[dict[int, Callable[[], ContextManager]]] = contextvars.ContextVar(
+    "surv_ai_prompt_contexts", default={}
+)
+
+
+@contextmanager
+def bind_prompt_contexts(contexts: Iterable[tuple[Prompt, Callable[[], ContextManager]]]) -> Iterator[None]:
+    """
+    Binds a context to each prompt for the duration of the block, so that prompts submitted
+    together in one `get_completions` call can each be completed in a context of their own,
+    such as the usage tracker and tracing labels of the agent that wrote them.
+    """
+    token = _prompt_contexts.set({**_prompt_contexts.get(), **{id(prompt): context for prompt, context in contexts}})
+
+    try:
+        yield
+    finally:
+        _prompt_contexts.reset(token)
+
+
+@contextmanager
+def prompt_context(prompt: Prompt) -> Iterator[None]:
+    """
+    Enters the context bound to `prompt`, if any. Clients complete each prompt within it.
+    """
+    context = _prompt_contexts.get().get(id(prompt))
+
+    if context is None:
+        yield
+        return
+
+    with context():
+        yield
@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from surv_ai.lib.log import logger
+
+from .interfaces import LargeLanguageModelClientInterface, Prompt
+
+
+class CachedClient(LargeLanguageModelClientInterface):
+    """
+    Wraps any large language model client with a persistent, content-addressed completion cache.
+
+    Completions are keyed on the canonicalized prompt messages and the hyperparameters of the call,
+    and stored in a local SQLite file. Identical requests that are already in flight are coalesced
+    into a single upstream call. Reads and writes run on a worker thread, so the event loop is
+    never blocked on disk.
+
+    Cached completions are replayed verbatim, so only calls with a temperature of at most
+    `max_temperature` are cached, and calls sampled to produce varied responses always reach the
+    wrapped client. Calls without a temperature are treated as sampled at 1. Pass
+    `max_temperature=None` to cache every call.
+    """
+
+    def __init__(
+        self,
+        client: LargeLanguageModelClientInterface,
+        path: str = ".surv_ai_cache.sqlite3",
+        max_size_bytes: Optional[int] = 512 * 1024 * 1024,
+        max_age_seconds: Optional[float] = None,
+        max_temperature: Optional[float] = 0.3,
+    ):
+        self.client = client
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.max_age_seconds = max_age_seconds
+        self.max_temperature = max_temperature
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                completion TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+        self._in_flight: dict[str, asyncio.Future] = {}
+
+    def _is_cacheable(self, hyperparameters: dict) -> bool:
+        if self.max_temperature is None:
+            return True
+
+        return hyperparameters.get("temperature", 1) <= self.max_temperature
+
+    def _get_key(self, prompt: Prompt, hyperparameters: dict) -> str:
+        canonical_prompt = json.dumps(
+            {
+                "client": self.client.__class__.__name__,
+                "messages": [
+                    {
+                        "role": message.role,
+                        "name": message.name,
+                        "content": " ".join(message.content.split()),
+                    }
+                    for message in prompt.messages
+                ],
+                "hyperparameters": hyperparameters,
+            },
+            sort_keys=True,
+            default=str,
+        )
+
+        return hashlib.sha256(canonical_prompt.encode()).hexdigest()
+
+    def _read(self, keys: list[str]) -> dict[str, str]:
+        if not keys:
+            return {}
+
+        now = time.time()
+        oldest_allowed = now - self.max_age_seconds if self.max_age_seconds is not None else 0
+
+        with self._lock:
+            rows = self._connection.execute(
+                f"""
+                SELECT key, completion FROM completions
+                WHERE key IN ({", ".join("?" * len(keys))}) AND created_at >= ?
+                """,
+                [*keys, oldest_allowed],
+            ).fetchall()
+
+            if rows:
+                self._connection.executemany(
+                    "UPDATE completions SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key, _ in rows],
+                )
+                self._connection.commit()
+
+        return dict(rows)
+
+    def _write(self, completions: dict[str, str]):
+        now = time.time()
+
+        with self._lock:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?)",
+                [(key, completion, len(completion.encode()), now, now) for key, completion in completions.items()],
+            )
+            self._evict(now)
+            self._connection.commit()
+
+    def _evict(self, now: float):
+        if self.max_age_seconds is not None:
+            self._connection.execute(
+                "DELETE FROM completions WHERE created_at < ?",
+                (now - self.max_age_seconds,),
+            )
+
+        if self.max_size_bytes is not None:
+            self._connection.execute(
+                """
+                DELETE FROM completions WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS running_size
+                        FROM completions
+                    )
+                    WHERE running_size > ?
+                )
+                """,
+                (self.max_size_bytes,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM completions")
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    async def _fetch(self, prompts: dict[str, Prompt], hyperparameters: dict) -> dict[str, str]:
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in prompts}
+        self._in_flight.update(futures)
+
+        try:
+            try:
+                results = await self.client.get_completions(list(prompts.values()), **hyperparameters)
+            except BaseException as e:
+                for future in futures.values():
+                    future.set_exception(e)
+                    future.exception()
+
+                raise
+
+            completions = dict(zip(prompts, results))
+            for key, completion in completions.items():
+                futures[key].set_result(completion)
+
+            # Completions stay in flight until written, so requests made meanwhile don't miss the cache.
+            await asyncio.to_thread(self._write, completions)
+        finally:
+            for key in futures:
+                self._in_flight.pop(key, None)
+
+        return completions
+
+    async def get_completions(self, prompts: list[Prompt], **hyperparameters) -> list[str]:
+        if not self._is_cacheable(hyperparameters):
+            return await self.client.get_completions(prompts, **hyperparameters)
+
+        keys = [self._get_key(prompt, hyperparameters) for prompt in prompts]
+        completions = await asyncio.to_thread(self._read, list(set(keys)))
+
+        to_fetch: dict[str, Prompt] = {}
+        to_await: dict[str, asyncio.Future] = {}
+        for key, prompt in zip(keys, prompts):
+            if key in completions or key in to_fetch or key in to_await:
+                continue
+            elif key in self._in_flight:
+                to_await[key] = self._in_flight[key]
+            else:
+                to_fetch[key] = prompt
+
+        logger.log_internal(
+            "Completion cache: %s hits, %s coalesced, %s misses.", len(completions), len(to_await), len(to_fetch)
+        )
+
+        if to_fetch:
+            completions.update(await self._fetch(to_fetch, hyperparameters))
+
+        for key, future in to_await.items():
+            completions[key] = await asyncio.shield(future)
+
+        return [completions[key] for key in keys]
@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+import time
+from collections import deque
+from typing import Optional
+
+from surv_ai.lib.log import logger
+
+
+class ConcurrencyGovernor:
+    """
+    Adaptive (AIMD) limit on the number of in-flight requests to a large language model API.
+
+    The limit grows additively, by roughly `additive_increase` per round trip, while calls succeed,
+    and is cut by `multiplicative_decrease` when the API throttles us or latency spikes. Latency
+    is averaged separately for each `max_tokens` requested, so a long completion is only compared
+    with completions of the same size rather than with short calls that happened to precede it. Each
+    congestion event only cuts the limit once: failures of requests started before the last cut
+    are ignored.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        additive_increase: float = 1.0,
+        multiplicative_decrease: float = 0.5,
+        latency_spike_factor: float = 3.0,
+        throttle_statuses: tuple[int, ...] = (429, 502, 503, 529),
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.additive_increase = additive_increase
+        self.multiplicative_decrease = multiplicative_decrease
+        self.latency_spike_factor = latency_spike_factor
+        self.throttle_statuses = throttle_statuses
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._average_latencies: dict[Optional[int], float] = {}
+        self._last_decrease_at = 0.0
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter.done())
+
+    def _wake_waiters(self):
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+
+            if not waiter.done():
+                self._in_flight += 1
+                waiter.set_result(None)
+
+    async def acquire(self) -> float:
+        """
+        Waits for a free slot and returns the time the request started, to be passed to `release`.
+        """
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return time.monotonic()
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self._in_flight -= 1
+                self._wake_waiters()
+
+            raise
+
+        return time.monotonic()
+
+    def release(
+        self,
+        started_at: float,
+        status_code: Optional[int] = None,
+        cancelled: bool = False,
+        max_tokens: Optional[int] = None,
+    ):
+        """
+        Frees a slot and adapts the limit to the outcome of the request, whose latency is compared
+        with that of earlier requests for the same `max_tokens`.
+
+        A `status_code` of `None` means the request failed without a response. Cancelled requests
+        leave the limit unchanged.
+        """
+        self._in_flight -= 1
+
+        if not cancelled:
+            self._adapt(started_at, status_code, max_tokens)
+
+        self._wake_waiters()
+
+    def _adapt(self, started_at: float, status_code: Optional[int], max_tokens: Optional[int]):
+        latency = time.monotonic() - started_at
+        average_latency = self._average_latencies.get(max_tokens)
+
+        if status_code is None or status_code in self.throttle_statuses:
+            self._decrease(started_at, f"status {status_code}")
+        elif status_code < 400:
+            if average_latency and latency > self.latency_spike_factor * average_latency:
+                self._decrease(started_at, f"latency of {latency:.1f}s")
+            else:
+                self._limit = min(self.max_limit, self._limit + self.additive_increase / self._limit)
+
+            self._average_latencies[max_tokens] = (
+                latency if average_latency is None else 0.9 * average_latency + 0.1 * latency
+            )
+
+    def request(self, max_tokens: Optional[int] = None) -> "GovernedRequest":
+        """
+        Returns an async context manager holding a slot for the duration of one request for up
+        to `max_tokens` tokens.
+
+        Set `status_code` on the yielded object once a response arrives.
+        """
+        return GovernedRequest(self, max_tokens)
+
+    def _decrease(self, started_at: float, reason: str):
+        if started_at < self._last_decrease_at:
+            return
+
+        self._limit = max(self.min_limit, self._limit * self.multiplicative_decrease)
+        self._last_decrease_at = time.monotonic()
+
+        logger.log_internal("Reducing request concurrency to %s after %s...", self.limit, reason)
+
+
+class GovernedRequest:
+    def __init__(self, governor: ConcurrencyGovernor, max_tokens: Optional[int] = None):
+        self.governor = governor
+        self.max_tokens = max_tokens
+        self.status_code: Optional[int] = None
+        self.queue_seconds = 0.0
+
+    async def __aenter__(self) -> "GovernedRequest":
+        requested_at = time.monotonic()
+        self._started_at = await self.governor.acquire()
+        self.queue_seconds = self._started_at - requested_at
+
+        return self
+
+    async def __aexit__(self, exc_type, *_):
+        self.governor.release(
+            self._started_at,
+            self.status_code,
+            cancelled=exc_type is not None and issubclass(exc_type, asyncio.CancelledError),
+            max_tokens=self.max_tokens,
+        )
+
+
+_governors: dict[str, ConcurrencyGovernor] = {}
+
+
+def get_governor(service: str, api_key: str) -> ConcurrencyGovernor:
+    """
+    Returns the process-wide governor shared by all clients of a service using the same API key.
+    """
+    key = f"{service}:{hashlib.sha256(api_key.encode()).hexdigest()}"
+
+    if key not in _governors:
+        _governors[key] = ConcurrencyGovernor()
+
+    return _governors[key]
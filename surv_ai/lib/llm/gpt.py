@@ -1,11 +1,18 @@
 import asyncio
+import time
 from enum import Enum
-
-import requests
+from typing import Optional
 
 from surv_ai.lib.log import logger
+from surv_ai.lib.tracing import SpanKind, tracer
+from surv_ai.lib.transport import HTTPTransport, default_transport
 
+from .batching import prompt_context
+from .concurrency import ConcurrencyGovernor, get_governor
 from .interfaces import LargeLanguageModelClientInterface, Prompt
+from .retry import RetryAction, RetryPolicy
+from .tokens import fit_messages
+from .usage import record_usage
 
 
 class GPTModel(str, Enum):
@@ -20,104 +27,133 @@ class GPTClient(LargeLanguageModelClientInterface):
     def __init__(
         self,
         api_key: str,
+        transport: Optional[HTTPTransport] = None,
+        governor: Optional[ConcurrencyGovernor] = None,
+        retry_policy: Optional[RetryPolicy] = None,
     ):
         self.api_key = api_key
+        self.transport = transport or default_transport
+        self.governor = governor or get_governor("openai", api_key)
+        self.retry_policy = retry_policy or RetryPolicy()
+
+    def _get_messages(self, prompt: Prompt, model: GPTModel, max_tokens: int, token_multiplier: float) -> list[dict]:
+        messages = [
+            {
+                "role": message.role,
+                "content": " ".join(message.content.split()),
+            }
+            for message in prompt.messages
+        ]
+
+        token_limit = MODEL_TOKEN_LIMITS.get(model)
+        max_prompt_tokens = (token_limit - max_tokens) / token_multiplier if token_limit else None
+
+        return fit_messages(messages, model, max_prompt_tokens)
 
     async def _get_completion(
         self,
         prompt: Prompt,
-        attempt=1,
         presence_penalty=0,
         frequency_penalty=0,
         temperature=1,
         top_p=1,
         max_tokens: int = 800,
         model=GPTModel.TURBO,
-        token_multiplier=1.6,
+        token_multiplier=1.0,
     ) -> str:
-        MAX_PROMPT_TOKENS = MODEL_TOKEN_LIMITS.get(model) - max_tokens
-        messages = [
-            {
-                "role": message.role,
-                "content": " ".join(message.content.split()),
-            }
-            for message in prompt.messages
-        ]
-        approximate_tokens = len(str(messages).split(" ")) * token_multiplier
-
-        while approximate_tokens > MAX_PROMPT_TOKENS:
-            if len(messages) == 1:
-                raise Exception("Initial prompt is too long.")
-
-            index_to_remove = None
-            for index, _ in enumerate(messages):
-                if index == 0:
-                    continue
-
-                index_to_remove = index
-                break
-
-            if index_to_remove:
-                messages.pop(index_to_remove)
-
-            approximate_tokens = len(str(messages).split(" ")) * 1.7
-
-        response = None
-        try:
-            request = {
-                "model": model,
-                "messages": messages,
-                "temperature": temperature,
-                "top_p": top_p,
-                "presence_penalty": presence_penalty,
-                "frequency_penalty": frequency_penalty,
-                "max_tokens": max_tokens,
-            }
-
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(
-                None,
-                lambda: requests.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    json=request,
-                    headers={
-                        "Content-Type": "application/json",
-                        "Authorization": f"Bearer {self.api_key}",
-                    },
-                ),
-            )
-
+        self.retry_policy.record_request()
+
+        with prompt_context(prompt), tracer.span(
+            "llm.completion",
+            SpanKind.CLIENT,
+            {"gen_ai.system": "openai", "gen_ai.request.model": model, "gen_ai.request.max_tokens": max_tokens},
+        ) as span:
+            attempt = 1
+            queue_seconds = 0.0
+            latency_seconds = None
+            response = None
             try:
-                response_body = response.json()
-            except Exception:
-                response_body = response.text
-
-            response.raise_for_status()
-        except Exception as e:
-            if not response or response.status_code == 429 or response.status_code == 502:
-                seconds_to_wait = 0.5 * attempt
-                logger.log_internal("Exceeded model rate limit: attempting backoff...")
-                await asyncio.sleep(seconds_to_wait)
-
-                if attempt < 5:
-                    return await self._get_completion(prompt, attempt + 1)
-            elif response.status_code == 400:
-                if attempt < 5:
-                    logger.log_internal("Exceeded model context length limit: attempting to reduce prompt size...")
-
-                    return await self._get_completion(
-                        prompt,
-                        attempt + 1,
-                        token_multiplier=token_multiplier - 0.2,
-                    )
-
-            logger.log_exception(e)
-            raise Exception(
-                f"Call to GPT API failed with status {response.status_code}.",
-                response_body,
-            )
-
-        return response_body["choices"][0]["message"]["content"]
+                while True:
+                    messages = self._get_messages(prompt, model, max_tokens, token_multiplier)
+
+                    response = None
+                    response_body = None
+                    try:
+                        request = {
+                            "model": model,
+                            "messages": messages,
+                            "temperature": temperature,
+                            "top_p": top_p,
+                            "presence_penalty": presence_penalty,
+                            "frequency_penalty": frequency_penalty,
+                            "max_tokens": max_tokens,
+                        }
+
+                        async with self.governor.request(max_tokens) as governed_request:
+                            queue_seconds += governed_request.queue_seconds
+                            sent_at = time.monotonic()
+                            response = await self.transport.post(
+                                "https://api.openai.com/v1/chat/completions",
+                                json=request,
+                                headers={
+                                    "Content-Type": "application/json",
+                                    "Authorization": f"Bearer {self.api_key}",
+                                },
+                            )
+                            governed_request.status_code = response.status_code
+                            latency_seconds = time.monotonic() - sent_at
+
+                        try:
+                            response_body = response.json()
+                        except Exception:
+                            response_body = response.text
+
+                        response.raise_for_status()
+
+                        usage = response_body.get("usage") or {}
+                        prompt_tokens = usage.get("prompt_tokens", 0)
+                        completion_tokens = usage.get("completion_tokens", 0)
+
+                        record_usage(prompt_tokens, completion_tokens)
+                        span.set_attributes(
+                            {
+                                "gen_ai.usage.input_tokens": prompt_tokens,
+                                "gen_ai.usage.output_tokens": completion_tokens,
+                            }
+                        )
+
+                        return response_body["choices"][0]["message"]["content"]
+                    except Exception as e:
+                        status_code = response.status_code if response is not None else None
+                        action = self.retry_policy.get_action(attempt, status_code)
+
+                        if action == RetryAction.BACKOFF:
+                            logger.log_internal("Exceeded model rate limit: attempting backoff...")
+                            await asyncio.sleep(
+                                self.retry_policy.get_delay(attempt, response.headers if response is not None else None)
+                            )
+                        elif action == RetryAction.SHRINK_PROMPT:
+                            logger.log_internal(
+                                "Exceeded model context length limit: attempting to reduce prompt size..."
+                            )
+                            token_multiplier += 0.2
+                        else:
+                            logger.log_exception(e)
+                            raise Exception(
+                                f"Call to GPT API failed with status {status_code}.",
+                                response_body,
+                            )
+
+                        attempt += 1
+            finally:
+                span.set_attributes(
+                    {
+                        "surv_ai.retries": attempt - 1,
+                        "surv_ai.queue_seconds": queue_seconds,
+                        "surv_ai.latency_seconds": latency_seconds,
+                        "http.response.status_code": response.status_code if response is not None else None,
+                    }
+                )
 
     async def get_completions(
         self,
@@ -10,6 +10,11 @@ class PromptMessage(BaseModel):
 
 
 class Prompt(BaseModel):
+    """
+    Prompts built inside the library use `construct()`, skipping validation of inputs that are
+    already known to be well formed.
+    """
+
     messages: list[PromptMessage]
 
 
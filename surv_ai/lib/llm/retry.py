@@ -0,0 +1,116 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Mapping, Optional
+
+
+class RetryAction(str, Enum):
+    BACKOFF = "backoff"
+    SHRINK_PROMPT = "shrink_prompt"
+    FAIL = "fail"
+
+
+DEFAULT_STATUS_ACTIONS = {
+    400: RetryAction.SHRINK_PROMPT,
+    408: RetryAction.BACKOFF,
+    429: RetryAction.BACKOFF,
+    500: RetryAction.BACKOFF,
+    502: RetryAction.BACKOFF,
+    503: RetryAction.BACKOFF,
+    504: RetryAction.BACKOFF,
+    529: RetryAction.BACKOFF,
+}
+
+
+class RetryBudget:
+    """
+    Token bucket capping retries at a fraction of requests made, so that retries cannot
+    multiply load on an API that is already failing.
+    """
+
+    def __init__(self, ratio: float = 0.2, capacity: float = 20):
+        self.ratio = ratio
+        self.capacity = capacity
+
+        self._balance = capacity
+
+    def deposit(self):
+        self._balance = min(self.capacity, self._balance + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self._balance < 1:
+            return False
+
+        self._balance -= 1
+        return True
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed call to a large language model API is retried.
+
+    Backoff is exponential with full jitter unless the API sends a `Retry-After` header.
+    Responses without a status code, e.g. connection errors, are always backed off.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        jitter: bool = True,
+        status_actions: Optional[Mapping[int, RetryAction]] = None,
+        budget: Optional[RetryBudget] = None,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.status_actions = {**DEFAULT_STATUS_ACTIONS, **(status_actions or {})}
+        self.budget = budget or RetryBudget()
+
+    def record_request(self):
+        self.budget.deposit()
+
+    def get_action(self, attempt: int, status_code: Optional[int]) -> RetryAction:
+        if status_code is None:
+            action = RetryAction.BACKOFF
+        else:
+            action = self.status_actions.get(status_code, RetryAction.FAIL)
+
+        if action == RetryAction.FAIL or attempt >= self.max_attempts or not self.budget.withdraw():
+            return RetryAction.FAIL
+
+        return action
+
+    @staticmethod
+    def _parse_retry_after(headers: Mapping[str, str]) -> Optional[float]:
+        if headers.get("retry-after-ms"):
+            try:
+                return float(headers["retry-after-ms"]) / 1000
+            except ValueError:
+                pass
+
+        retry_after = headers.get("retry-after")
+        if not retry_after:
+            return None
+
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+        try:
+            return parsedate_to_datetime(retry_after).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+
+    def get_delay(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> float:
+        retry_after = self._parse_retry_after(headers or {})
+        if retry_after is not None:
+            return min(self.max_delay, max(0.0, retry_after))
+
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+        return random.uniform(0, delay) if self.jitter else delay
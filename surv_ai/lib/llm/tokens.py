@@ -0,0 +1,101 @@
+import hashlib
+import math
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+from surv_ai.lib.log import logger
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover
+    tiktoken = None
+
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_NAME = 1
+TOKENS_PER_REPLY = 3
+
+APPROXIMATE_CHARACTERS_PER_TOKEN = 4
+
+MAX_CACHED_TOKEN_COUNTS = 2**16
+
+_token_counts: OrderedDict[tuple[bytes, str], int] = OrderedDict()
+
+
+@lru_cache(maxsize=None)
+def get_encoding(model: str):
+    """
+    Returns the `tiktoken` encoding for a model, or `None` if `tiktoken` is unavailable.
+    """
+    if tiktoken is None:
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.log_warning("Could not load tokenizer for %s, falling back to approximate token counts: %s", model, e)
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / APPROXIMATE_CHARACTERS_PER_TOKEN)
+
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Counts the tokens of `text`. Counts are cached by a digest of the text rather than the text
+    itself, so the cache stays small however long the texts are; messages repeated across
+    prompts, such as system prompts and shared knowledge, are only encoded once.
+    """
+    encoding = get_encoding(model)
+
+    if encoding is None:
+        return estimate_tokens(text)
+
+    key = (hashlib.blake2b(text.encode(), digest_size=16).digest(), model)
+    if key in _token_counts:
+        _token_counts.move_to_end(key)
+        return _token_counts[key]
+
+    n_tokens = _token_counts[key] = len(encoding.encode(text, disallowed_special=()))
+    if len(_token_counts) > MAX_CACHED_TOKEN_COUNTS:
+        _token_counts.popitem(last=False)
+
+    return n_tokens
+
+
+def clear_token_counts():
+    _token_counts.clear()
+
+
+def count_message_tokens(message: dict, model: str) -> int:
+    tokens = TOKENS_PER_MESSAGE + count_tokens(message["role"], model) + count_tokens(message["content"], model)
+
+    if message.get("name"):
+        tokens += TOKENS_PER_NAME + count_tokens(message["name"], model)
+
+    return tokens
+
+
+def fit_messages(messages: list[dict], model: str, max_prompt_tokens: Optional[float]) -> list[dict]:
+    """
+    Drops the oldest messages after the first (system) message until the prompt fits in
+    `max_prompt_tokens`, counting the tokens of each message once.
+    """
+    if max_prompt_tokens is None or not messages:
+        return messages
+
+    message_tokens = [count_message_tokens(message, model) for message in messages]
+    total_tokens = sum(message_tokens) + TOKENS_PER_REPLY
+
+    first_kept_index = 1
+    while total_tokens > max_prompt_tokens and first_kept_index < len(messages):
+        total_tokens -= message_tokens[first_kept_index]
+        first_kept_index += 1
+
+    if total_tokens > max_prompt_tokens:
+        raise Exception("Initial prompt is too long.")
+
+    return [messages[0], *messages[first_kept_index:]]
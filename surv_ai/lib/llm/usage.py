@@ -0,0 +1,111 @@
+import contextvars
+from contextlib import contextmanager
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+_current_tracker: contextvars.ContextVar[Optional["UsageTracker"]] = contextvars.ContextVar(
+    "surv_ai_usage_tracker", default=None
+)
+
+
+class Usage(BaseModel):
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    n_calls: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+class UsageTracker:
+    """
+    Sums the token usage of large language model calls, with optional token and call budgets.
+
+    Trackers form a tree: usage recorded by a tracker is also recorded by its parents, and a
+    tracker is exhausted once it or any of its parents has run out of budget. Calls made while a
+    tracker is active, including in tasks created meanwhile, are recorded by it.
+    """
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        call_budget: Optional[int] = None,
+        parent: Optional["UsageTracker"] = None,
+    ):
+        self.token_budget = token_budget
+        self.call_budget = call_budget
+        self.parent = parent
+
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.n_calls = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def usage(self) -> Usage:
+        return Usage.construct(
+            prompt_tokens=self.prompt_tokens,
+            completion_tokens=self.completion_tokens,
+            n_calls=self.n_calls,
+        )
+
+    @property
+    def exhausted(self) -> bool:
+        tracker: Optional[UsageTracker] = self
+
+        while tracker is not None:
+            if tracker.token_budget is not None and tracker.total_tokens >= tracker.token_budget:
+                return True
+            if tracker.call_budget is not None and tracker.n_calls >= tracker.call_budget:
+                return True
+
+            tracker = tracker.parent
+
+        return False
+
+    def record(self, prompt_tokens: int, completion_tokens: int):
+        tracker: Optional[UsageTracker] = self
+
+        while tracker is not None:
+            tracker.prompt_tokens += prompt_tokens
+            tracker.completion_tokens += completion_tokens
+            tracker.n_calls += 1
+
+            tracker = tracker.parent
+
+    @contextmanager
+    def activate(self) -> Iterator["UsageTracker"]:
+        token = _current_tracker.set(self)
+
+        try:
+            yield self
+        finally:
+            _current_tracker.reset(token)
+
+    async def track(self, awaitable: Awaitable[T]) -> T:
+        """
+        Awaits `awaitable` with this tracker active.
+        """
+        with self.activate():
+            return await awaitable
+
+
+def get_usage_tracker() -> Optional[UsageTracker]:
+    return _current_tracker.get()
+
+
+def record_usage(prompt_tokens: int, completion_tokens: int):
+    """
+    Records one call with the active tracker, if any. Called by clients after each completion.
+    """
+    tracker = _current_tracker.get()
+
+    if tracker is not None:
+        tracker.record(prompt_tokens, completion_tokens)
@@ -1,8 +1,16 @@
+import atexit
 import logging
+import queue
+import re
+import warnings
 from enum import IntEnum
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
 
 from colorama import Fore, Style
 
+ANSI_STYLE_PATTERN = re.compile(r"\x1b\[[0-9;]*m")
+
 
 class AgentLogLevel(IntEnum):
     EXCEPTION = 0
@@ -14,8 +22,50 @@ class AgentLogLevel(IntEnum):
     INTERNAL = 5
 
 
+class ColorFormatter(logging.Formatter):
+    """
+    Console formatter applying the color and style a record was logged with.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = super().format(record)
+        color = getattr(record, "color", None)
+
+        if color is None:
+            return message
+
+        return f"{getattr(record, 'style', '')}{color}{message}{Style.RESET_ALL}"
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves records untouched, so their messages are only formatted by the
+    listener's handlers on the background thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
 class Logger:
+    """
+    Logs through the standard `logging` module.
+
+    Messages take %-style arguments, which are only merged into the message if a handler emits the
+    record, and nothing is formatted when the log level discards a message. Records carry their
+    `agent_log_level`, `color` and `style` as attributes; colors are only applied by
+    `ColorFormatter`.
+
+    `color` used to be the second positional argument of `log_context`, `log_output` and
+    `log_internal`. A colorama code passed as the only argument is still used as the color, with
+    a deprecation warning.
+    """
+
     def __init__(self, name="surv_ai", log_level=AgentLogLevel.ERROR):
+        self._listener: Optional[QueueListener] = None
+        self._queue_handler: Optional[QueueHandler] = None
+        self._propagate = True
+
         self.set_logger(name)
         self.set_log_level(log_level)
 
@@ -39,29 +89,84 @@ class Logger:
         elif log_level == AgentLogLevel.EXCEPTION:
             self._logger.setLevel(logging.ERROR)
 
-    def log_context(self, message: str, color: str = Fore.WHITE):
+    def start_background_logging(self, handlers: Optional[list[logging.Handler]] = None) -> QueueListener:
+        """
+        Moves formatting and output of records to a background thread: records are put on a queue
+        and emitted by `handlers`, which default to a colored console handler.
+        """
+        self.stop_background_logging()
+
+        if handlers is None:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(ColorFormatter())
+            handlers = [console_handler]
+
+        record_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._queue_handler = DeferredQueueHandler(record_queue)
+        self._listener = QueueListener(record_queue, *handlers, respect_handler_level=True)
+
+        self._propagate = self._logger.propagate
+        self._logger.addHandler(self._queue_handler)
+        self._logger.propagate = False
+        self._listener.start()
+
+        return self._listener
+
+    def stop_background_logging(self):
+        """
+        Emits every queued record and restores synchronous logging.
+        """
+        if self._listener is None:
+            return
+
+        self._logger.removeHandler(self._queue_handler)
+        self._logger.propagate = self._propagate
+        self._listener.stop()
+
+        self._listener = None
+        self._queue_handler = None
+
+    def _log(self, level: int, agent_log_level: AgentLogLevel, message: str, args: tuple, color: str, style: str):
+        if len(args) == 1 and isinstance(args[0], str) and ANSI_STYLE_PATTERN.fullmatch(args[0]):
+            warnings.warn(
+                "Passing the color positionally is deprecated, pass it as `color=` instead.",
+                DeprecationWarning,
+                stacklevel=3,
+            )
+            args, color = (), args[0]
+
+        self._logger.log(
+            level,
+            message,
+            *args,
+            extra={"agent_log_level": agent_log_level.name.lower(), "color": color, "style": style},
+        )
+
+    def log_context(self, message: str, *args, color: str = Fore.WHITE):
         if self.log_level >= AgentLogLevel.CONTEXT:
-            self._logger.info(f"{Style.BRIGHT}{color}{message}{Style.RESET_ALL}")
+            self._log(logging.INFO, AgentLogLevel.CONTEXT, message, args, color, Style.BRIGHT)
 
-    def log_output(self, message: str, color: str = Fore.WHITE):
+    def log_output(self, message: str, *args, color: str = Fore.WHITE):
         if self.log_level >= AgentLogLevel.OUTPUT:
-            self._logger.info(f"{Style.BRIGHT}{color}{message}{Style.RESET_ALL}")
+            self._log(logging.INFO, AgentLogLevel.OUTPUT, message, args, color, Style.BRIGHT)
 
-    def log_internal(self, message: str, color: str = Fore.LIGHTBLACK_EX):
+    def log_internal(self, message: str, *args, color: str = Fore.LIGHTBLACK_EX):
         if self.log_level >= AgentLogLevel.INTERNAL:
-            self._logger.info(f"{color}{Style.DIM}{message}{Style.RESET_ALL}")
+            self._log(logging.INFO, AgentLogLevel.INTERNAL, message, args, color, Style.DIM)
 
     def log_exception(self, error):
         if self.log_level >= AgentLogLevel.EXCEPTION:
-            self._logger.exception(error)
+            self._logger.exception(error, extra={"agent_log_level": "exception"})
 
-    def log_error(self, message: str):
+    def log_error(self, message: str, *args):
         if self.log_level >= AgentLogLevel.ERROR:
-            self._logger.error(f"{message}")
+            self._logger.error(message, *args, extra={"agent_log_level": "error"})
 
-    def log_warning(self, message: str):
+    def log_warning(self, message: str, *args):
         if self.log_level >= AgentLogLevel.WARNING:
-            self._logger.warning(f"{message}")
+            self._logger.warning(message, *args, extra={"agent_log_level": "warning"})
 
 
 logger = Logger()
+
+atexit.register(logger.stop_background_logging)
@@ -0,0 +1,62 @@
+import asyncio
+from typing import AsyncIterator, Awaitable, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+async def sliding_window(
+    coroutine_factories: Iterable[Callable[[], Awaitable[T]]],
+    max_concurrency: int,
+) -> AsyncIterator[tuple[int, T]]:
+    """
+    Keeps `max_concurrency` coroutines in flight, starting the next one as soon as any finishes
+    rather than waiting for the whole batch.
+
+    Yields `(index, result)` pairs in completion order. Factories are drawn lazily, so a generator of
+    factories can stop dispatching at any time. Closing the iterator early, or an exception raised by any
+    coroutine, cancels everything still in flight.
+    """
+    factories = enumerate(coroutine_factories)
+    in_flight: dict[asyncio.Future, int] = {}
+
+    def dispatch():
+        while len(in_flight) < max(1, max_concurrency):
+            try:
+                index, factory = next(factories)
+            except StopIteration:
+                return
+
+            in_flight[asyncio.ensure_future(factory())] = index
+
+    try:
+        dispatch()
+
+        while in_flight:
+            done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                index = in_flight.pop(task)
+                yield index, task.result()
+
+            dispatch()
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+
+async def gather_sliding_window(
+    coroutine_factories: Iterable[Callable[[], Awaitable[T]]],
+    max_concurrency: int,
+) -> list[T]:
+    """
+    Runs coroutines through a `sliding_window` and returns their results in dispatch order.
+    """
+    results: dict[int, T] = {}
+
+    async for index, result in sliding_window(coroutine_factories, max_concurrency):
+        results[index] = result
+
+    return [results[index] for index in range(len(results))]
@@ -0,0 +1,139 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import Optional
+
+try:
+    import lxml.html
+except ImportError:  # pragma: no cover
+    lxml = None
+
+
+class ParagraphParser(HTMLParser):
+    """
+    Streaming parser collecting the text of `<p>` elements, used when `lxml` is unavailable.
+
+    Paragraphs left open are closed by the next block-level element or by the end of an
+    enclosing block, as browsers do.
+    """
+
+    _closes_paragraph = {
+        "address",
+        "article",
+        "aside",
+        "blockquote",
+        "body",
+        "div",
+        "footer",
+        "form",
+        "h1",
+        "h2",
+        "h3",
+        "h4",
+        "h5",
+        "h6",
+        "header",
+        "hr",
+        "li",
+        "main",
+        "nav",
+        "ol",
+        "pre",
+        "section",
+        "table",
+        "td",
+        "th",
+        "ul",
+    }
+    _skipped = {"script", "style", "template"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+
+        self.paragraphs: list[str] = []
+
+        self._paragraph: Optional[list[str]] = None
+        self._skip_depth = 0
+
+    def _close_paragraph(self):
+        if self._paragraph is not None:
+            self.paragraphs.append("".join(self._paragraph))
+            self._paragraph = None
+
+    def handle_starttag(self, tag: str, _):
+        if tag in self._skipped:
+            self._skip_depth += 1
+        elif tag == "p":
+            self._close_paragraph()
+            self._paragraph = []
+        elif tag in self._closes_paragraph:
+            self._close_paragraph()
+        elif tag == "br" and self._paragraph is not None:
+            self._paragraph.append("\n")
+
+    def handle_endtag(self, tag: str):
+        if tag in self._skipped:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "p" or tag in self._closes_paragraph:
+            self._close_paragraph()
+
+    def handle_data(self, data: str):
+        if self._paragraph is not None and not self._skip_depth:
+            self._paragraph.append(data)
+
+    def close(self):
+        super().close()
+        self._close_paragraph()
+
+
+def _extract_with_html_parser(html: str) -> list[str]:
+    parser = ParagraphParser()
+    parser.feed(html)
+    parser.close()
+
+    return parser.paragraphs
+
+
+def _extract_with_lxml(html: str) -> list[str]:
+    document = lxml.html.document_fromstring(html.encode("utf-8"), parser=_get_lxml_parser())
+
+    for element in list(document.iter(*ParagraphParser._skipped)):
+        element.drop_tree()
+
+    return [paragraph.text_content() for paragraph in document.iter("p")]
+
+
+@lru_cache(maxsize=None)
+def _get_lxml_parser():
+    return lxml.html.HTMLParser(encoding="utf-8", remove_comments=True)
+
+
+def extract_paragraphs(html: str) -> list[str]:
+    """
+    Returns the stripped, non-empty text of every paragraph in an HTML document.
+
+    Uses `lxml` when it is installed, and the standard library's streaming parser otherwise.
+    """
+    if not html.strip():
+        return []
+
+    paragraphs = _extract_with_lxml(html) if lxml is not None else _extract_with_html_parser(html)
+
+    return [text for text in (paragraph.strip() for paragraph in paragraphs) if text]
+
+
+@lru_cache(maxsize=None)
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Returns a process pool shared by all tools, for extracting text from pages in parallel.
+    """
+    return ProcessPoolExecutor()
+
+
+async def extract_paragraphs_async(html: str, executor: Optional[Executor] = None) -> list[str]:
+    """
+    Runs `extract_paragraphs` off the event loop, in `executor` if given (e.g. `get_process_pool()`)
+    and in the loop's default thread pool otherwise.
+    """
+    return await asyncio.get_running_loop().run_in_executor(executor, extract_paragraphs, html)
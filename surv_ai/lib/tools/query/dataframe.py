@@ -1,3 +1,4 @@
+from surv_ai.lib.bm25 import BM25Index
 from surv_ai.lib.tools.interfaces import ToolResult
 
 from ..interfaces import ToolInterface
@@ -5,9 +6,9 @@ from ..interfaces import ToolInterface
 
 class DataframeTool(ToolInterface):
     instruction = """
-        `DATAFRAME()` - Load relevant information from a Pandas dataframe.
+        `DATAFRAME(keywords)` - use keywords to load relevant records from a Pandas dataframe.
     """
-    command = r"DATAFRAME\((.+)\)"
+    command = r"DATAFRAME\((.*)\)"
 
     def __init__(
         self,
@@ -16,23 +17,43 @@ class DataframeTool(ToolInterface):
         id_column_name: str,
         title_column_column: str,
         content_column_name: str,
+        top_k: int = 10,
     ):
         self.dataframe = dataframe
         self.source_of_data = source_of_data
         self.id_column_name = id_column_name
         self.title_column_column = title_column_column
         self.content_column_name = content_column_name
+        self.top_k = top_k
 
-    async def use(
-        self,
-        _,
-    ) -> list[ToolResult]:
+        self.index = BM25Index()
+        self.index.add(self.dataframe[self.content_column_name].fillna("").astype(str).tolist())
+
+    def _get_results(self, rows) -> list[ToolResult]:
         return [
             ToolResult(
-                url=row[self.id_column_name],
+                url=url,
                 site_name=self.source_of_data,
-                title=row[self.title_column_column],
-                body=row[self.content_column_name],
+                title=title,
+                body=body,
+            )
+            for url, title, body in zip(
+                rows[self.id_column_name].tolist(),
+                rows[self.title_column_column].tolist(),
+                rows[self.content_column_name].tolist(),
             )
-            for _, row in self.dataframe.iterrows()
         ]
+
+    async def use(
+        self,
+        query: str,
+    ) -> list[ToolResult]:
+        """
+        Returns the `top_k` rows most relevant to `query`, or the first `top_k` rows if the query is empty.
+        """
+        if not query.strip():
+            return self._get_results(self.dataframe.head(self.top_k))
+
+        matches = self.index.search(query, self.top_k)
+
+        return self._get_results(self.dataframe.iloc[[document_id for document_id, _ in matches]])
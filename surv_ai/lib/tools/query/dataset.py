@@ -0,0 +1,245 @@
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+from surv_ai.lib.bm25 import tokenize
+from surv_ai.lib.log import logger
+from surv_ai.lib.tools.interfaces import ToolResult
+
+from ..interfaces import ToolInterface
+
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+ARROW_SUFFIXES = {".arrow", ".feather", ".ipc"}
+
+MAX_PARQUET_ROW_GROUP_SIZE = 65536
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("DatasetTool requires pyarrow, install it with `pip install surv-ai[dataset]`") from e
+
+    return pyarrow
+
+
+class DatasetTool(ToolInterface):
+    """
+    Searches a Parquet or Arrow/Feather file without loading it into memory.
+
+    The file is memory mapped, so worker processes reading the same file share the operating
+    system's page cache instead of each holding a copy, and only the rows that are returned are
+    converted to results. Arrow IPC files are best suited to this: their record batches are read
+    without decoding. Parquet row groups are decompressed whole to read any row in them, so
+    Parquet files should be written with small row groups (`row_group_size` of at most
+    `MAX_PARQUET_ROW_GROUP_SIZE` rows), or converted to Arrow IPC.
+
+    Rows are searched through an FTS5 index kept in a SQLite file next to the dataset, or at
+    `index_path`. The index is built once, scanning only the content column one row group or
+    record batch at a time, and rebuilt if the dataset changes. Worker processes should open it
+    with `read_only=True`, which requires the index to exist and never rebuilds it.
+    """
+
+    instruction = """
+        `DATASET(keywords)` - use keywords to load relevant records from a dataset.
+    """
+    command = r"DATASET\((.*)\)"
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        source_of_data: str,
+        id_column_name: str,
+        title_column_name: str,
+        content_column_name: str,
+        top_k: int = 10,
+        format: Optional[str] = None,
+        index_path: Optional[Union[str, Path]] = None,
+        read_only: bool = False,
+    ):
+        self.pyarrow = _import_pyarrow()
+
+        self.path = Path(path)
+        self.source_of_data = source_of_data
+        self.id_column_name = id_column_name
+        self.title_column_name = title_column_name
+        self.content_column_name = content_column_name
+        self.top_k = top_k
+        self.format = format or self._get_format(self.path)
+        self.index_path = Path(index_path) if index_path else self.path.with_name(f"{self.path.name}.fts.sqlite3")
+        self.read_only = read_only
+
+        if self.format == "parquet":
+            self._parquet_file = self.pyarrow.parquet.ParquetFile(str(self.path), memory_map=True)
+            chunk_sizes = [
+                self._parquet_file.metadata.row_group(index).num_rows
+                for index in range(self._parquet_file.num_row_groups)
+            ]
+
+            if max(chunk_sizes, default=0) > MAX_PARQUET_ROW_GROUP_SIZE:
+                logger.log_warning(
+                    "%s has row groups of up to %s rows, each read decompresses a whole row group: "
+                    "rewrite it with a smaller row_group_size or convert it to Arrow IPC.",
+                    self.path,
+                    max(chunk_sizes),
+                )
+        else:
+            self._arrow_file = self.pyarrow.ipc.open_file(self.pyarrow.memory_map(str(self.path), "r"))
+            chunk_sizes = [
+                self._arrow_file.get_batch(index).num_rows for index in range(self._arrow_file.num_record_batches)
+            ]
+
+        self._chunk_offsets = np.cumsum([0, *chunk_sizes])
+
+        if read_only:
+            self._connection = sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True)
+        else:
+            if not self._index_is_current():
+                self._build_index()
+
+            self._connection = sqlite3.connect(str(self.index_path))
+
+    def close(self):
+        self._connection.close()
+
+    def _get_signature(self) -> str:
+        stat = self.path.stat()
+        return f"{stat.st_size}:{stat.st_mtime_ns}:{self.content_column_name}"
+
+    def _index_is_current(self) -> bool:
+        if not self.index_path.exists():
+            return False
+
+        try:
+            with closing(sqlite3.connect(f"file:{self.index_path}?mode=ro", uri=True)) as connection:
+                row = connection.execute("SELECT value FROM dataset_meta WHERE key = 'signature'").fetchone()
+        except sqlite3.Error:
+            return False
+
+        return row is not None and row[0] == self._get_signature()
+
+    def _build_index(self):
+        """
+        Writes the index to a temporary file and moves it into place, so other processes never
+        open a partially built index.
+        """
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.index_path.parent, suffix=".tmp")
+        os.close(descriptor)
+
+        try:
+            with closing(sqlite3.connect(temporary_path)) as connection:
+                connection.executescript(
+                    """
+                    CREATE TABLE dataset_meta (key TEXT PRIMARY KEY, value TEXT);
+
+                    CREATE VIRTUAL TABLE dataset_fts USING fts5(
+                        content,
+                        content='',
+                        tokenize='porter unicode61'
+                    );
+                    """
+                )
+
+                with connection:
+                    for index in range(len(self._chunk_offsets) - 1):
+                        offset = int(self._chunk_offsets[index])
+                        contents = self._read_chunk(index, [self.content_column_name]).column(0)
+
+                        connection.executemany(
+                            "INSERT INTO dataset_fts (rowid, content) VALUES (?, ?)",
+                            ((offset + row, content or "") for row, content in enumerate(contents.to_pylist())),
+                        )
+
+                    connection.execute(
+                        "INSERT INTO dataset_meta (key, value) VALUES ('signature', ?)", (self._get_signature(),)
+                    )
+
+            os.replace(temporary_path, self.index_path)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+
+    def _search(self, query: str) -> list[int]:
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        rows = self._connection.execute(
+            """
+            SELECT rowid FROM dataset_fts
+            WHERE dataset_fts MATCH ?
+            ORDER BY bm25(dataset_fts), rowid
+            LIMIT ?
+            """,
+            [" OR ".join(f'"{term}"' for term in dict.fromkeys(terms)), self.top_k],
+        )
+
+        return [row for row, in rows]
+
+    @staticmethod
+    def _get_format(path: Path) -> str:
+        if path.suffix.lower() in PARQUET_SUFFIXES:
+            return "parquet"
+        elif path.suffix.lower() in ARROW_SUFFIXES:
+            return "arrow"
+
+        raise ValueError(f"Cannot infer the format of {path}, pass format='parquet' or format='arrow'")
+
+    @property
+    def n_rows(self) -> int:
+        return int(self._chunk_offsets[-1])
+
+    def _read_chunk(self, index: int, columns: list[str]):
+        if self.format == "parquet":
+            return self._parquet_file.read_row_group(index, columns=columns)
+
+        return self._arrow_file.get_batch(index).select(columns)
+
+    def _read_rows(self, rows: list[int], columns: list[str]) -> dict[int, dict]:
+        chunk_indices = np.searchsorted(self._chunk_offsets, rows, side="right") - 1
+
+        records: dict[int, dict] = {}
+        for chunk_index in dict.fromkeys(chunk_indices.tolist()):
+            chunk_rows = [row for row, index in zip(rows, chunk_indices) if index == chunk_index]
+            offset = int(self._chunk_offsets[chunk_index])
+
+            chunk = self._read_chunk(chunk_index, columns).take([row - offset for row in chunk_rows])
+            records.update(zip(chunk_rows, chunk.to_pylist()))
+
+        return records
+
+    def _take(self, rows: list[int]) -> list[ToolResult]:
+        """
+        Reads the ids and titles of `rows`, then their content. Each column is read separately,
+        so at most one decoded row group of the content column is held at a time.
+        """
+        records = self._read_rows(rows, [self.id_column_name, self.title_column_name])
+        contents = self._read_rows(rows, [self.content_column_name])
+
+        return [
+            ToolResult(
+                url=str(records[row][self.id_column_name]),
+                site_name=self.source_of_data,
+                title=records[row][self.title_column_name] or "",
+                body=contents[row][self.content_column_name] or "",
+            )
+            for row in rows
+        ]
+
+    async def use(
+        self,
+        query: str,
+    ) -> list[ToolResult]:
+        """
+        Returns the `top_k` rows most relevant to `query`, or the first `top_k` rows if the query is empty.
+        """
+        if not query.strip():
+            return self._take(list(range(min(self.top_k, self.n_rows))))
+
+        return self._take(self._search(query))
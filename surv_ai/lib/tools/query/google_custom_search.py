@@ -1,11 +1,13 @@
 import asyncio
+import math
 import re
-
-import requests
-from bs4 import BeautifulSoup
+from concurrent.futures import Executor
+from typing import Optional
 
 from surv_ai.lib.log import logger
+from surv_ai.lib.tools.extraction import extract_paragraphs_async
 from surv_ai.lib.tools.interfaces import ToolResult
+from surv_ai.lib.transport import HTTPTransport, page_transport
 
 from ..interfaces import ToolInterface
 
@@ -17,6 +19,7 @@ class GoogleCustomSearchTool(ToolInterface):
     command = r"SEARCH\((.+)\)"
 
     _base_url = "https://www.googleapis.com/customsearch/v1/siterestrict"
+    _results_per_page = 10
 
     def __init__(
         self,
@@ -26,6 +29,8 @@ class GoogleCustomSearchTool(ToolInterface):
         end_date=None,
         n_pages=10,
         only_include_websites=None,
+        transport: Optional[HTTPTransport] = None,
+        executor: Optional[Executor] = None,
     ):
         if not google_api_key:
             raise ValueError("google_api_key is required for GoogleCustomSearchTool")
@@ -38,59 +43,58 @@ class GoogleCustomSearchTool(ToolInterface):
         self.start_date = start_date
         self.end_date = end_date
         self.only_include_websites = only_include_websites
+        self.transport = transport or page_transport
+        self.executor = executor
 
-    async def _search(self, query: str) -> list[str]:
-        start = 1
-        results = []
+    async def _search_page(self, query: str, start: int) -> Optional[list[dict]]:
+        params = {
+            "key": self.google_api_key,
+            "cx": self.google_search_engine_id,
+            "q": re.sub(r"[^A-Za-z0-9 ]+", "", query),
+            "start": start,
+            "num": self._results_per_page,
+        }
 
-        while len(results) < self.n_pages:
-            params = {
-                "key": self.google_api_key,
-                "cx": self.google_search_engine_id,
-                "q": re.sub(r"[^A-Za-z0-9 ]+", "", query),
-                "start": start,
-                "num": 10,
-            }
+        if self.start_date:
+            params["q"] += f" after:{self.start_date}"
 
-            if self.start_date:
-                params["q"] += f" after:{self.start_date}"
+        if self.end_date:
+            params["q"] += f" before:{self.end_date}"
 
-            if self.end_date:
-                params["q"] += f" before:{self.end_date}"
+        try:
+            response = await self.transport.get(self._base_url, params=params)
+            return response.json()["items"]
+        except Exception:
+            return None
 
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, lambda: requests.get(self._base_url, params=params))
-            data = response.json()
+    async def _search(self, query: str) -> list[dict]:
+        n_result_pages = math.ceil(self.n_pages / self._results_per_page)
 
-            try:
-                new_records = data["items"]
-            except Exception:
-                logger.log_exception("Could not retrieve all pages.")
+        result_pages = await asyncio.gather(
+            *[self._search_page(query, 1 + index * self._results_per_page) for index in range(n_result_pages)]
+        )
 
-                return results
+        results = []
+        for new_records in result_pages:
+            if new_records is None:
+                logger.log_exception("Could not retrieve all pages.")
+                break
 
             if not new_records:
                 break
 
             results += new_records
-            start += 10
 
         return results
 
-    def _get_page_text(self, web_url: str) -> str:
-        response = requests.get(web_url, headers={"User-Agent": "Mozilla/5.0"})
-
-        data = response.text
+    async def _get_page_text(self, web_url: str) -> str:
+        response = await self.transport.get(web_url, headers={"User-Agent": "Mozilla/5.0"})
 
-        soup = BeautifulSoup(data, "html.parser")
-
-        results = []
-        for paragraph in soup.find_all("p"):
-            results.append(paragraph.text)
+        paragraphs = await extract_paragraphs_async(response.text, self.executor)
 
-        return "\n\n".join(results)
+        return "\n\n".join(paragraphs)
 
-    def _ingest_page(
+    async def _ingest_page(
         self,
         result: dict,
     ):
@@ -100,10 +104,10 @@ class GoogleCustomSearchTool(ToolInterface):
             site_name = metatags.get("og:site_name", result["displayLink"])
             title = metatags.get("og:title", result["title"])
 
-            logger.log_context(f"......Retrieving {site_name} page with title {title}......")
-            page_text = self._get_page_text(result["link"])
+            logger.log_context("......Retrieving %s page with title %s......", site_name, title)
+            page_text = await self._get_page_text(result["link"])
 
-            return ToolResult(
+            return ToolResult.construct(
                 url=result["link"],
                 title=f'{site_name} page titled "{title}"',
                 body=page_text,
@@ -122,6 +126,6 @@ class GoogleCustomSearchTool(ToolInterface):
         if len(search_results) == 0:
             return []
 
-        response = [self._ingest_page(result) for result in search_results[0 : self.n_pages]]
+        response = await asyncio.gather(*[self._ingest_page(result) for result in search_results[0 : self.n_pages]])
 
         return [r for r in response if r]
@@ -1,16 +1,102 @@
 import asyncio
 import re
-from typing import Optional
-
-import requests
-from bs4 import BeautifulSoup
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
 
 from surv_ai.lib.llm.interfaces import LargeLanguageModelClientInterface
 from surv_ai.lib.log import logger
+from surv_ai.lib.transport import HTTPTransport, page_transport
 
 from ..interfaces import ToolInterface, ToolResult
 
 
+class PageCache:
+    """
+    Size-bounded LRU cache of page paragraphs, keyed by title.
+
+    Concurrent requests for a page that is already being fetched wait for that fetch instead of
+    starting another one.
+    """
+
+    def __init__(self, max_pages: int = 512):
+        self.max_pages = max_pages
+
+        self._pages: OrderedDict[str, list[str]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def get(self, title: str) -> Optional[list[str]]:
+        if title not in self._pages:
+            return None
+
+        self._pages.move_to_end(title)
+        return self._pages[title]
+
+    def put(self, title: str, paragraphs: list[str]):
+        self._pages[title] = paragraphs
+        self._pages.move_to_end(title)
+
+        while len(self._pages) > self.max_pages:
+            self._pages.popitem(last=False)
+
+    def clear(self):
+        self._pages.clear()
+
+    async def _fetch(
+        self, titles: list[str], fetch: Callable[[list[str]], Awaitable[dict[str, list[str]]]]
+    ) -> dict[str, list[str]]:
+        try:
+            pages = await fetch(titles)
+        except Exception as e:
+            logger.log_exception(e)
+            return {}
+        finally:
+            for title in titles:
+                self._in_flight.pop(title, None)
+
+        for title, paragraphs in pages.items():
+            self.put(title, paragraphs)
+
+        return pages
+
+    async def get_many(
+        self, titles: list[str], fetch: Callable[[list[str]], Awaitable[dict[str, list[str]]]]
+    ) -> dict[str, list[str]]:
+        """
+        Returns the paragraphs of each title, calling `fetch` once for all titles that are
+        neither cached nor already being fetched. Titles that could not be fetched map to `[]`.
+        """
+        pages: dict[str, list[str]] = {}
+        fetches: dict[str, asyncio.Task] = {}
+        missing = []
+
+        for title in dict.fromkeys(titles):
+            paragraphs = self.get(title)
+
+            if paragraphs is not None:
+                pages[title] = paragraphs
+            elif title in self._in_flight:
+                fetches[title] = self._in_flight[title]
+            else:
+                missing.append(title)
+
+        if missing:
+            task = asyncio.ensure_future(self._fetch(missing, fetch))
+            for title in missing:
+                self._in_flight[title] = task
+                fetches[title] = task
+
+        for title, task in fetches.items():
+            pages[title] = (await asyncio.shield(task)).get(title, [])
+
+        return pages
+
+
+page_cache = PageCache()
+
+
 class WikipediaTool(ToolInterface):
     instruction = """
         `WIKIPEDIA(searchTerms)` - use a no more than three keywords to search Wikipedia for additional information.
@@ -18,11 +104,19 @@ class WikipediaTool(ToolInterface):
     command = r"WIKIPEDIA\((.+)\)"
 
     _base_url = "https://en.wikipedia.org/w/api.php"
+    _extract_params = {
+        "prop": "extracts",
+        "explaintext": 1,
+        "exsectionformat": "wiki",
+        "exlimit": "max",
+    }
 
     def __init__(
         self,
         llm_client: Optional[LargeLanguageModelClientInterface] = None,
         n_articles=1,
+        transport: Optional[HTTPTransport] = None,
+        cache: Optional[PageCache] = None,
     ):
         if llm_client:
             logger.log_warning(
@@ -30,64 +124,82 @@ class WikipediaTool(ToolInterface):
             )
 
         self.n_articles = n_articles
+        self.transport = transport or page_transport
+        self.cache = cache or page_cache
+
+    async def _query(self, params: dict) -> dict:
+        response = await self.transport.get(
+            self._base_url,
+            params={"action": "query", "format": "json", "formatversion": 2, **params},
+        )
+
+        return response.json()
+
+    @staticmethod
+    def _get_paragraphs(extract: str) -> list[str]:
+        paragraphs = []
 
-        self._already_searched = dict()
+        for line in extract.split("\n"):
+            line = line.strip()
+
+            if line and not (line.startswith("=") and line.endswith("=")):
+                paragraphs.append(line)
+
+        return paragraphs
 
     async def _search(self, query: str) -> list[str]:
-        params = {
-            "action": "query",
-            "format": "json",
-            "list": "search",
-            "srsearch": re.sub(r"[^A-Za-z0-9 ]+", "", query),
-        }
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: requests.get(self._base_url, params=params))
-        data = response.json()
-        return [result["title"] for result in data["query"]["search"]]
-
-    async def _get_page_text(self, page_title: str) -> list[str]:
-        if page_title in self._already_searched:
-            return self._already_searched[page_title]
-
-        params = {
-            "action": "parse",
-            "format": "json",
-            "page": page_title,
-            "prop": "text",
-        }
-
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(None, lambda: requests.get(self._base_url, params=params))
-        data = response.json()
+        """
+        Searches Wikipedia and returns matching titles by relevance. The search also returns the
+        text of the best match, which is cached, so the most common case needs a single request.
+        """
+        data = await self._query(
+            {
+                "generator": "search",
+                "gsrsearch": re.sub(r"[^A-Za-z0-9 ]+", "", query),
+                "gsrlimit": self.n_articles,
+                **self._extract_params,
+            }
+        )
 
-        try:
-            html_content = data["parse"]["text"]["*"]
+        pages = sorted(data.get("query", {}).get("pages", []), key=lambda page: page["index"])
+
+        for page in pages:
+            if page.get("extract"):
+                self.cache.put(page["title"], self._get_paragraphs(page["extract"]))
 
-            soup = BeautifulSoup(html_content, "html.parser")
+        return [page["title"] for page in pages]
 
-            results = []
-            for paragraph in soup.find_all("p"):
-                paragraph_text = paragraph.text.strip()
+    async def _fetch_page(self, title: str) -> Optional[list[str]]:
+        data = await self._query({"titles": title, "redirects": 1, **self._extract_params})
 
-                if paragraph_text:
-                    results.append(paragraph_text)
+        for page in data.get("query", {}).get("pages", []):
+            if page.get("extract") is not None:
+                return self._get_paragraphs(page["extract"])
 
-            self._already_searched[page_title] = results
-        except Exception:
-            return ""
+        return None
 
-        return results
+    async def _fetch_pages(self, titles: list[str]) -> dict[str, list[str]]:
+        """
+        Fetches the text of several pages. The API only returns one full page extract per
+        response, so each page is requested separately and the requests are sent concurrently.
+        """
+        results = await asyncio.gather(*[self._fetch_page(title) for title in titles])
 
-    async def _ingest_page(
+        return {title: paragraphs for title, paragraphs in zip(titles, results) if paragraphs is not None}
+
+    async def _get_page_text(self, page_titles: list[str]) -> dict[str, list[str]]:
+        return await self.cache.get_many(page_titles, self._fetch_pages)
+
+    def _ingest_page(
         self,
         page_title: str,
+        paragraphs: list[str],
     ):
-        logger.log_context(f"......Fetching Wikipedia page with title {page_title}......")
-        paragraphs = await self._get_page_text(page_title)
+        logger.log_context("......Fetching Wikipedia page with title %s......", page_title)
         page_body = "\n\n".join(paragraphs)
         source = f"https://en.wikipedia.org/wiki/{page_title.replace(' ', '_')}"
 
-        return ToolResult(
+        return ToolResult.construct(
             title=f'Wikipedia page titled "{page_title}"',
             url=source,
             site_name="Wikipedia",
@@ -103,6 +215,7 @@ class WikipediaTool(ToolInterface):
         if len(search_results) == 0:
             return []
 
-        return await asyncio.gather(
-            *[self._ingest_page(page_title) for page_title in search_results[: self.n_articles]]
-        )
+        page_titles = search_results[: self.n_articles]
+        pages = await self._get_page_text(page_titles)
+
+        return [self._ingest_page(page_title, pages[page_title]) for page_title in page_titles]
@@ -8,6 +8,7 @@ from surv_ai.lib.llm.interfaces import (
     PromptMessage,
 )
 from surv_ai.lib.log import logger
+from surv_ai.lib.tracing import trace_context, tracer
 
 from .interfaces import (
     NoMemoriesFoundException,
@@ -29,9 +30,9 @@ class ToolBelt(ToolBeltInterface):
         return "\n".join(f"{i + 1}. {t.instruction}" for i, t in enumerate(tools)) if tools else ""
 
     def _get_tool_belt_prompt(self, original_prompt: str, base_knowledge: list[Knowledge]) -> str:
-        return Prompt(
+        return Prompt.construct(
             messages=[
-                PromptMessage(
+                PromptMessage.construct(
                     role="system",
                     content=f"""A user will prompt you with a statement.
 
@@ -45,17 +46,17 @@ class ToolBelt(ToolBeltInterface):
                     """,
                 ),
                 *[
-                    PromptMessage(
+                    PromptMessage.construct(
                         role="system",
                         content=f"This information may be relevant to your query: {knowledge.text}",
                     )
                     for knowledge in base_knowledge
                 ],
-                PromptMessage(
+                PromptMessage.construct(
                     role="user",
                     content=f"""{original_prompt}""",
                 ),
-                PromptMessage(
+                PromptMessage.construct(
                     role="assistant",
                     content="""
                     In order to research the user's prompt, I will execute the following command:
@@ -73,7 +74,8 @@ class ToolBelt(ToolBeltInterface):
     ) -> list[ToolResult]:
         prompt = self._get_tool_belt_prompt(original_prompt, base_knowledge)
 
-        response = (await client.get_completions([prompt], **{"temperature": 0.7}))[0].strip()
+        with trace_context(stage="research"):
+            response = (await client.get_completions([prompt], **{"temperature": 0.7}))[0].strip()
 
         results: list[ToolResult] = []
         for tool in self.tools:
@@ -81,9 +83,15 @@ class ToolBelt(ToolBeltInterface):
 
             if match:
                 for args in match.groups():
-                    logger.log_context(f"...Using tool: {response}...")
+                    logger.log_context("...Using tool: %s...", response)
 
-                    results += await tool.use(args)
+                    with tracer.span(
+                        "tool.use", attributes={"surv_ai.tool": tool.__class__.__name__, "surv_ai.tool.query": args}
+                    ) as span:
+                        tool_results = await tool.use(args)
+                        span.set_attribute("surv_ai.tool.n_results", len(tool_results))
+
+                    results += tool_results
 
                     if not results and attempt < 3:
                         results = await self.inspect(client, original_prompt, base_knowledge, attempt=attempt + 1)
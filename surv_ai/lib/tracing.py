@@ -0,0 +1,266 @@
+"""
+Structured spans for large language model calls and tool use, exported in the OpenTelemetry
+(OTLP JSON) shape.
+
+Tracing is disabled until an exporter is configured:
+
+    from surv_ai import JSONLSpanExporter, tracer
+
+    tracer.configure(JSONLSpanExporter("spans.jsonl"))
+
+Each line of the file is an OTLP `ExportTraceServiceRequest`, which the OpenTelemetry
+collector's `otlpjsonfile` receiver and most trace viewers can ingest.
+"""
+import atexit
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from enum import Enum, IntEnum
+from typing import Any, Iterator, Optional, Protocol
+
+_agent: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("surv_ai_agent", default=None)
+_stage: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("surv_ai_stage", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("surv_ai_span", default=None)
+
+
+class SpanKind(IntEnum):
+    INTERNAL = 1
+    SERVER = 2
+    CLIENT = 3
+
+
+class StatusCode(IntEnum):
+    UNSET = 0
+    OK = 1
+    ERROR = 2
+
+
+@contextmanager
+def trace_context(agent: Optional[str] = None, stage: Optional[str] = None) -> Iterator[None]:
+    """
+    Labels spans started within the block, including in tasks it creates, with an agent name
+    and a stage. Arguments left as `None` keep the enclosing label.
+    """
+    tokens = []
+    if agent is not None:
+        tokens.append((_agent, _agent.set(agent)))
+    if stage is not None:
+        tokens.append((_stage, _stage.set(stage)))
+
+    try:
+        yield
+    finally:
+        for variable, token in reversed(tokens):
+            variable.reset(token)
+
+
+def _encode_value(value: Any) -> dict:
+    if isinstance(value, Enum):
+        value = value.value
+
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    elif isinstance(value, int):
+        return {"intValue": str(value)}
+    elif isinstance(value, float):
+        return {"doubleValue": value}
+
+    return {"stringValue": str(value)}
+
+
+def _encode_attributes(attributes: dict[str, Any]) -> list[dict]:
+    return [{"key": key, "value": _encode_value(value)} for key, value in attributes.items() if value is not None]
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "kind",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "attributes",
+        "start_time_ns",
+        "end_time_ns",
+        "status_code",
+        "status_message",
+    )
+
+    recording = True
+
+    def __init__(self, name: str, kind: SpanKind = SpanKind.INTERNAL, parent: Optional["Span"] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes: dict[str, Any] = {}
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns: Optional[int] = None
+        self.status_code = StatusCode.UNSET
+        self.status_message: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict[str, Any]):
+        self.attributes.update(attributes)
+
+    def set_status(self, status_code: StatusCode, message: Optional[str] = None):
+        self.status_code = status_code
+        self.status_message = message
+
+    def end(self):
+        self.end_time_ns = time.time_ns()
+
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        return (self.end_time_ns - self.start_time_ns) / 1e9 if self.end_time_ns is not None else None
+
+    def to_dict(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": int(self.kind),
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns),
+            "attributes": _encode_attributes(self.attributes),
+            "status": {"code": int(self.status_code)},
+        }
+
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+
+        return span
+
+
+class NonRecordingSpan:
+    """
+    Span handed out while tracing is disabled, so instrumented code needs no checks of its own.
+    """
+
+    recording = False
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: dict[str, Any]):
+        pass
+
+    def set_status(self, status_code: StatusCode, message: Optional[str] = None):
+        pass
+
+
+_non_recording_span = NonRecordingSpan()
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span):
+        ...
+
+    def flush(self):
+        ...
+
+
+class JSONLSpanExporter(SpanExporter):
+    """
+    Appends finished spans to a JSON Lines file, writing one OTLP request per batch of
+    `max_batch_size` spans. Remaining spans are written on `flush` and at interpreter exit.
+    """
+
+    def __init__(self, path: str = "surv_ai_spans.jsonl", service_name: str = "surv_ai", max_batch_size: int = 64):
+        self.path = path
+        self.service_name = service_name
+        self.max_batch_size = max_batch_size
+
+        self._spans: list[Span] = []
+        self._lock = threading.Lock()
+
+        atexit.register(self.flush)
+
+    def export(self, span: Span):
+        with self._lock:
+            self._spans.append(span)
+            if len(self._spans) < self.max_batch_size:
+                return
+
+            spans, self._spans = self._spans, []
+
+        self._write(spans)
+
+    def flush(self):
+        with self._lock:
+            spans, self._spans = self._spans, []
+
+        if spans:
+            self._write(spans)
+
+    def _write(self, spans: list[Span]):
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _encode_attributes({"service.name": self.service_name})},
+                    "scopeSpans": [{"scope": {"name": "surv_ai"}, "spans": [span.to_dict() for span in spans]}],
+                }
+            ]
+        }
+
+        with open(self.path, "a") as file:
+            file.write(json.dumps(request) + "\n")
+
+
+class Tracer:
+    def __init__(self, exporter: Optional[SpanExporter] = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, exporter: Optional[SpanExporter]):
+        """
+        Sends spans to `exporter` from now on, or disables tracing if it is `None`.
+        """
+        if self.exporter is not None:
+            self.exporter.flush()
+
+        self.exporter = exporter
+
+    @contextmanager
+    def span(
+        self, name: str, kind: SpanKind = SpanKind.INTERNAL, attributes: Optional[dict[str, Any]] = None
+    ) -> Iterator[Span]:
+        """
+        Records the block as a span, child of the span enclosing it, labelled with the current
+        agent and stage. The span is marked as failed if the block raises.
+        """
+        exporter = self.exporter
+        if exporter is None:
+            yield _non_recording_span  # type: ignore
+            return
+
+        span = Span(name, kind, parent=_current_span.get())
+        span.set_attributes({"surv_ai.agent": _agent.get(), "surv_ai.stage": _stage.get(), **(attributes or {})})
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_status(StatusCode.ERROR, repr(e))
+            raise
+        else:
+            if span.status_code == StatusCode.UNSET:
+                span.set_status(StatusCode.OK)
+        finally:
+            _current_span.reset(token)
+            span.end()
+            exporter.export(span)
+
+
+tracer = Tracer()
@@ -0,0 +1,110 @@
+import asyncio
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Union
+
+import httpx
+
+
+class HTTPTransport:
+    """
+    Asynchronous HTTP transport backed by a bounded, keep-alive connection pool.
+
+    A separate `httpx.AsyncClient` is kept for each running event loop, since pooled
+    connections cannot be shared between loops. `max_connections_per_host` additionally caps
+    concurrent requests to any one host, so that a single slow site cannot take over the pool.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        timeout: Union[float, httpx.Timeout] = httpx.Timeout(600.0, connect=10.0),
+        max_connections_per_host: Optional[int] = None,
+        follow_redirects: bool = False,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.timeout = timeout
+        self.max_connections_per_host = max_connections_per_host
+        self.follow_redirects = follow_redirects
+
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncClient
+        ] = weakref.WeakKeyDictionary()
+        self._host_semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]
+        ] = weakref.WeakKeyDictionary()
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=self.limits,
+                http2=self.http2,
+                timeout=self.timeout,
+                follow_redirects=self.follow_redirects,
+            )
+            self._clients[loop] = client
+
+        return client
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str) -> AsyncIterator[None]:
+        if self.max_connections_per_host is None:
+            yield
+            return
+
+        semaphores = self._host_semaphores.setdefault(asyncio.get_running_loop(), {})
+        host = httpx.URL(url).host
+
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.max_connections_per_host)
+
+        async with semaphores[host]:
+            yield
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        async with self._host_slot(url):
+            return await self._get_client().get(url, params=params, headers=headers, **kwargs)
+
+    async def post(
+        self,
+        url: str,
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        **kwargs,
+    ) -> httpx.Response:
+        async with self._host_slot(url):
+            return await self._get_client().post(url, json=json, headers=headers, **kwargs)
+
+    async def aclose(self):
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+
+        if client is not None:
+            await client.aclose()
+
+
+default_transport = HTTPTransport()
+
+page_transport = HTTPTransport(
+    max_connections=50,
+    max_keepalive_connections=20,
+    timeout=httpx.Timeout(15.0, connect=5.0),
+    max_connections_per_host=4,
+    follow_redirects=True,
+)
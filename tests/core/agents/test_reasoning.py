@@ -1,4 +1,7 @@
-from surv_ai import ReasoningAgent
+from surv_ai import Knowledge, ReasoningAgent
+from surv_ai.lib.llm.batching import prompt_context
+from surv_ai.lib.llm.usage import UsageTracker, record_usage
+from surv_ai.lib.tracing import _agent, _stage
 from tests.utils import AsyncMock
 
 
@@ -15,3 +18,111 @@ async def test_prompt():
     response = await agent.prompt("test prompt")
 
     assert response == "I think it's true"
+
+
+async def test_prompt_batch():
+    mock_client = AsyncMock()
+    agents = [ReasoningAgent(mock_client, name=f"Agent {index}") for index in range(3)]
+
+    mock_client.get_completions = AsyncMock(side_effect=lambda prompts, **_: ["I think it's true"] * len(prompts))
+
+    responses = await ReasoningAgent.prompt_batch(agents, "test prompt")
+
+    assert responses == ["I think it's true"] * 3
+    assert mock_client.get_completions.call_count == 4
+    assert all(len(call[0][0]) == 3 for call in mock_client.get_completions.call_args_list)
+
+
+async def test_prompt_batch_only_fails_agents_whose_completions_fail():
+    mock_client = AsyncMock()
+
+    def get_completions(prompts, **_):
+        if any("Unreachable" in message.content for prompt in prompts for message in prompt.messages):
+            raise Exception("Call to GPT API failed")
+
+        return ["I think it's true"] * len(prompts)
+
+    mock_client.get_completions = AsyncMock(side_effect=get_completions)
+    agents = [ReasoningAgent(mock_client, name=f"Agent {index}") for index in range(2)]
+    agents[1].teach_text("Unreachable source", "News")
+
+    responses = await ReasoningAgent.prompt_batch(agents, "test prompt")
+
+    assert responses[0] == "I think it's true"
+    assert isinstance(responses[1], Exception)
+    assert [len(call[0][0]) for call in mock_client.get_completions.call_args_list] == [2, 2, 2, 1, 1, 1, 1, 1, 1, 1]
+
+
+async def test_recalls_relevant_knowledge():
+    mock_client = AsyncMock()
+    agent = ReasoningAgent(mock_client, n_knowledge_items_per_prompt=2, recall_relevant_knowledge=True)
+    agent.teach_knowledge(Knowledge(text="The budget bill passed the senate", source="News"))
+    agent.teach_knowledge(Knowledge(text="Rain is expected this weekend", source="Weather"))
+    agent.teach_knowledge(Knowledge(text="A volcano erupted overnight", source="News"))
+
+    assert [knowledge.text for knowledge in agent._recall_knowledge("Will the budget bill pass?")] == [
+        "The budget bill passed the senate",
+        "A volcano erupted overnight",
+    ]
+
+
+async def test_labels_completions_with_agent_and_stage():
+    mock_client = AsyncMock()
+    agent = ReasoningAgent(mock_client, name="Agent 1")
+    labels = []
+
+    async def get_completions(prompts, **_):
+        labels.append((_agent.get(), _stage.get()))
+        return ["I think it's true"] * len(prompts)
+
+    mock_client.get_completions = get_completions
+
+    await agent.prompt("test prompt")
+
+    assert sorted(labels) == sorted(
+        [("Agent 1", "plan"), ("Agent 1", "for"), ("Agent 1", "against"), ("Agent 1", "judge")]
+    )
+
+
+async def test_prompt_batch_charges_usage_to_each_agent():
+    mock_client = AsyncMock()
+
+    async def get_completions(prompts, **_):
+        for prompt in prompts:
+            with prompt_context(prompt):
+                record_usage(10, 2)
+
+        return ["I think it's true"] * len(prompts)
+
+    mock_client.get_completions = get_completions
+    survey_tracker = UsageTracker()
+
+    with survey_tracker.activate():
+        agents = [ReasoningAgent(mock_client, name=f"Agent {index}") for index in range(3)]
+
+    await ReasoningAgent.prompt_batch(agents, "test prompt")
+
+    assert [agent.usage.n_calls for agent in agents] == [4, 4, 4]
+    assert [agent.usage.total_tokens for agent in agents] == [48, 48, 48]
+    assert survey_tracker.usage.n_calls == 12
+
+
+async def test_prompt_batch_labels_completions_with_each_agent():
+    mock_client = AsyncMock()
+    labels = []
+
+    async def get_completions(prompts, **_):
+        for prompt in prompts:
+            with prompt_context(prompt):
+                labels.append((_agent.get(), _stage.get()))
+
+        return ["I think it's true"] * len(prompts)
+
+    mock_client.get_completions = get_completions
+    agents = [ReasoningAgent(mock_client, name=f"Agent {index}") for index in range(2)]
+
+    await ReasoningAgent.prompt_batch(agents, "test prompt")
+
+    assert sorted(labels) == sorted(
+        (f"Agent {index}", stage) for index in range(2) for stage in ["plan", "for", "against", "judge"]
+    )
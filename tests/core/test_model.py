@@ -1,6 +1,9 @@
-from mock import Mock
+import asyncio
 
-from surv_ai import Model, SurveyParameter, SurveyResponse
+from mock import Mock, patch
+
+from surv_ai import Model, Survey, SurveyParameter, SurveyResponse, ToolBelt, ToolResult
+from surv_ai.lib.llm.usage import record_usage
 from tests.utils import AsyncMock
 
 
@@ -37,3 +40,105 @@ async def test_build():
     assert data_points[1].parameter.independent_variable == "test 2"
     assert mock_survey.call_args_list[1][1]["test"] == "test 2"
     assert data_points[0].response.percent_in_favor == 0.5
+
+
+async def test_build_shares_research_between_equivalent_surveys():
+    with patch("surv_ai.core.survey.ReasoningAgent") as mock_reasoning_agent, patch(
+        "surv_ai.core.survey.BinaryAgent"
+    ) as mock_binary_agent:
+        mock_reasoning_agent.return_value.color = "red"
+        mock_reasoning_agent.return_value.prompt = AsyncMock(return_value="I think it's true")
+        mock_binary_agent.return_value.prompt = AsyncMock(return_value="True")
+
+        mock_client = AsyncMock()
+        tool_belt = ToolBelt(tools=[AsyncMock()])
+        tool_belt.inspect = AsyncMock(
+            return_value=[ToolResult(url="test", body="test", title="test", site_name="test")]
+        )
+        other_tool_belt = ToolBelt(tools=[AsyncMock()])
+        other_tool_belt.inspect = AsyncMock(return_value=[])
+
+        model = Model(
+            survey_class=Survey,
+            parameters=[
+                SurveyParameter(
+                    independent_variable=n_agents,
+                    kwargs={"client": mock_client, "tool_belt": tool_belt, "n_agents": n_agents},
+                )
+                for n_agents in [1, 2, 3]
+            ]
+            + [
+                SurveyParameter(
+                    independent_variable=4,
+                    kwargs={"client": mock_client, "tool_belt": other_tool_belt, "n_agents": 4},
+                )
+            ],
+            max_concurrency=3,
+        )
+        data_points = await model.build("test")
+
+        assert tool_belt.inspect.call_count == 1
+        assert other_tool_belt.inspect.call_count == 1
+        assert [data_point.response.in_favor for data_point in data_points] == [1, 2, 3, 4]
+
+
+async def test_build_stream_yields_data_points_as_surveys_complete():
+    def conduct(n_agents):
+        async def conduct(_):
+            await asyncio.sleep(0.01 * n_agents)
+            return SurveyResponse(
+                percent_in_favor=1.0, in_favor=n_agents, against=0, undecided=0, uncertainty=0, error=0
+            )
+
+        return conduct
+
+    mock_survey = Mock(side_effect=lambda n_agents: Mock(conduct=conduct(n_agents)))
+    model = Model(
+        survey_class=mock_survey,
+        parameters=[
+            SurveyParameter(independent_variable=n_agents, kwargs={"n_agents": n_agents}) for n_agents in [3, 1, 2]
+        ],
+        max_concurrency=3,
+    )
+
+    streamed = [data_point.parameter.independent_variable async for data_point in model.build_stream("test")]
+    built = [data_point.parameter.independent_variable for data_point in await model.build("test")]
+
+    assert streamed == [1, 2, 3]
+    assert built == [3, 1, 2]
+
+
+async def test_build_stops_starting_surveys_when_budget_is_exhausted():
+    with patch("surv_ai.core.survey.ReasoningAgent") as mock_reasoning_agent, patch(
+        "surv_ai.core.survey.BinaryAgent"
+    ) as mock_binary_agent:
+
+        async def prompt(*_):
+            record_usage(100, 10)
+            return "True"
+
+        mock_reasoning_agent.return_value.color = "red"
+        mock_reasoning_agent.return_value.prompt = prompt
+        mock_binary_agent.return_value.prompt = prompt
+
+        tool_belt = ToolBelt(tools=[])
+        tool_belt.inspect = AsyncMock(return_value=[])
+
+        model = Model(
+            Survey,
+            parameters=[
+                SurveyParameter(
+                    independent_variable=index,
+                    kwargs={"client": AsyncMock(), "tool_belt": tool_belt, "n_agents": 2, "max_concurrency": 1},
+                )
+                for index in range(4)
+            ],
+            call_budget=4,
+        )
+
+        data_points = await model.build("test")
+
+        assert len(data_points) == 1
+        assert data_points[0].usage.n_calls == 4
+        assert model.usage.n_calls == 4
+        assert model.usage.total_tokens == 440
@@ -1,6 +1,9 @@
+import asyncio
+
 from mock import patch
 
-from surv_ai import Survey, ToolResult
+from surv_ai import Knowledge, Survey, ToolResult
+from surv_ai.lib.llm.usage import record_usage
 from tests.utils import AsyncMock
 
 
@@ -40,8 +43,276 @@ async def test_conduct():
 
         assert mock_reasoning_agent.call_count == 10
         assert mock_binary_agent.call_count == 10
+        assert sorted(call[1]["name"] for call in mock_binary_agent.call_args_list) == sorted(
+            f"BinaryAgent #{index + 1}" for index in range(10)
+        )
 
         assert mock_reasoning_agent.return_value.prompt.call_count == 10
         assert mock_binary_agent.return_value.prompt.call_count == 10
 
         assert response.percent_in_favor == 1.0
+
+
+async def test_conduct_with_separate_concurrency_limits():
+    with patch("surv_ai.core.survey.ReasoningAgent") as mock_reasoning_agent, patch(
+        "surv_ai.core.survey.BinaryAgent"
+    ) as mock_binary_agent, patch("surv_ai.core.survey.WebPageSummaryAgent") as mock_summary_agent:
+        mock_reasoning_agent.return_value.color = "red"
+        mock_binary_agent.return_value.color = "blue"
+
+        mock_reasoning_agent.return_value.prompt = AsyncMock(return_value="I think it's false")
+        mock_binary_agent.return_value.prompt = AsyncMock(return_value="False")
+        mock_summary_agent.return_value.prompt = AsyncMock(return_value="Test page summary: its a test")
+
+        mock_tool_belt = AsyncMock()
+        mock_tool_belt.inspect = AsyncMock(
+            return_value=[
+                ToolResult(
+                    url=f"test {index}",
+                    body="test" * 1000,
+                    title="test",
+                    site_name="test",
+                )
+                for index in range(3)
+            ]
+        )
+        survey = Survey(
+            client=AsyncMock(),
+            tool_belt=mock_tool_belt,
+            n_agents=7,
+            max_research_concurrency=2,
+            max_polling_concurrency=3,
+        )
+
+        response = await survey.conduct("test prompt")
+
+        assert mock_summary_agent.return_value.prompt.call_count == 3
+        assert mock_reasoning_agent.call_count == 7
+        assert response.against == 7
+        assert response.percent_in_favor == 0.0
+
+
+async def test_conduct_with_batched_stages():
+    with patch("surv_ai.core.survey.ReasoningAgent") as mock_reasoning_agent, patch(
+        "surv_ai.core.survey.BinaryAgent"
+    ) as mock_binary_agent, patch("surv_ai.core.survey.WebPageSummaryAgent") as mock_summary_agent:
+        mock_reasoning_agent.return_value.color = "red"
+        mock_binary_agent.return_value.color = "blue"
+
+        mock_reasoning_agent.prompt_batch = AsyncMock(side_effect=lambda agents, _: ["I think it's true"] * len(agents))
+        mock_binary_agent.prompt_batch = AsyncMock(side_effect=lambda agents, _: ["True"] * len(agents))
+        mock_summary_agent.return_value.prompt = AsyncMock(return_value="Test page summary: its a test")
+
+        mock_tool_belt = AsyncMock()
+        mock_tool_belt.inspect = AsyncMock(
+            return_value=[
+                ToolResult(
+                    url="test",
+                    body="test",
+                    title="test",
+                    site_name="test",
+                )
+            ]
+        )
+        survey = Survey(
+            client=AsyncMock(),
+            tool_belt=mock_tool_belt,
+            n_agents=7,
+            max_polling_concurrency=3,
+            batch_stages=True,
+            stage_batch_size=3,
+        )
+
+        response = await survey.conduct("test prompt")
+
+        assert mock_reasoning_agent.prompt_batch.call_count == 3
+        assert [len(call[0][0]) for call in mock_reasoning_agent.prompt_batch.call_args_list] == [3, 3, 1]
+        assert mock_binary_agent.prompt_batch.call_count == 3
+        assert mock_reasoning_agent.return_value.prompt.call_count == 0
+        assert [call[1]["name"] for call in mock_binary_agent.call_args_list] == [
+            f"BinaryAgent #{index + 1}" for index in range(7)
+        ]
+
+        assert response.in_favor == 7
+        assert response.percent_in_favor == 1.0
+
+
+async def test_batched_failures_only_count_against_failing_agents():
+    with patch("surv_ai.core.survey.ReasoningAgent") as mock_reasoning_agent, patch(
+        "surv_ai.core.survey.BinaryAgent"
+    ) as mock_binary_agent:
+        mock_reasoning_agent.return_value.color = "red"
+        mock_reasoning_agent.prompt_batch = AsyncMock(
+            side_effect=lambda agents, _: [Exception("Transient failure")] + ["I think it's true"] * (len(agents) - 1)
+        )
+        mock_binary_agent.prompt_batch = AsyncMock(side_effect=lambda agents, _: ["True"] * len(agents))
+
+        survey = Survey(
+            client=AsyncMock(),
+            tool_belt=AsyncMock(),
+            n_agents=8,
+            max_polling_concurrency=8,
+            batch_stages=True,
+            stage_batch_size=8,
+        )
+
+        response = await survey.conduct("test prompt", research=AsyncMock(return_value=[])())
+
+        assert response.error == 1
+        assert response.in_favor == 7
+        assert len(mock_binary_agent.prompt_batch.call_args[0][0]) == 7
+
+
+async def test_batched_cohorts_do_not_wait_for_slow_cohorts():
+    with patch("surv_ai.core.survey.ReasoningAgent") as mock_reasoning_agent, patch(
+        "surv_ai.core.survey.BinaryAgent"
+    ) as mock_binary_agent:
+        events = []
+
+        async def prompt_batch(agents, _):
+            cohort = len([event for event in events if event[0] == "start"])
+            events.append(("start", cohort))
+            await asyncio.sleep(0.05 if cohort == 0 else 0.001)
+            events.append(("end", cohort))
+            return ["I think it's true"] * len(agents)
+
+        mock_reasoning_agent.return_value.color = "red"
+        mock_reasoning_agent.prompt_batch = prompt_batch
+        mock_binary_agent.prompt_batch = AsyncMock(side_effect=lambda agents, _: ["True"] * len(agents))
+
+        survey = Survey(
+            client=AsyncMock(),
+            tool_belt=AsyncMock(),
+            n_agents=8,
+            max_polling_concurrency=4,
+            batch_stages=True,
+            stage_batch_size=2,
+        )
+
+        response = await survey.conduct("test prompt", research=AsyncMock(return_value=[])())
+
+        assert response.in_favor == 8
+        assert events.index(("start", 3)) < events.index(("end", 0))
+
+
+async def test_stream():
+    with patch("surv_ai.core.survey.ReasoningAgent") as mock_reasoning_agent, patch(
+        "surv_ai.core.survey.BinaryAgent"
+    ) as mock_binary_agent:
+        mock_reasoning_agent.return_value.color = "red"
+        mock_reasoning_agent.return_value.prompt = AsyncMock(return_value="I think it's true")
+        mock_binary_agent.return_value.prompt = AsyncMock(return_value="True")
+
+        survey = Survey(client=AsyncMock(), tool_belt=AsyncMock(), n_agents=5, max_concurrency=2)
+
+        responses = [response async for response in survey.stream("test prompt", research=AsyncMock(return_value=[])())]
+
+        assert [response.in_favor for response in responses] == [1, 2, 3, 4, 5]
+        assert responses[-1].percent_in_favor == 1.0
+
+
+async def test_stream_cancels_agents_when_closed():
+    with patch("surv_ai.core.survey.ReasoningAgent") as mock_reasoning_agent, patch(
+        "surv_ai.core.survey.BinaryAgent"
+    ) as mock_binary_agent:
+        started = []
+        cancelled = []
+
+        async def prompt(_):
+            started.append(True)
+            try:
+                if len(started) > 1:
+                    await asyncio.Event().wait()
+                return "I think it's true"
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        mock_reasoning_agent.return_value.color = "red"
+        mock_reasoning_agent.return_value.prompt = prompt
+        mock_binary_agent.return_value.prompt = AsyncMock(return_value="True")
+
+        survey = Survey(client=AsyncMock(), tool_belt=AsyncMock(), n_agents=10, max_concurrency=3)
+
+        responses = survey.stream("test prompt", research=AsyncMock(return_value=[])())
+        response = await responses.__anext__()
+        await responses.aclose()
+
+        assert response.in_favor == 1
+        assert len(cancelled) == 2
+        assert len(started) == 3
+
+
+async def test_conduct_stops_early_when_conclusive():
+    with patch("surv_ai.core.survey.ReasoningAgent") as mock_reasoning_agent, patch(
+        "surv_ai.core.survey.BinaryAgent"
+    ) as mock_binary_agent:
+        mock_reasoning_agent.return_value.color = "red"
+        mock_reasoning_agent.return_value.prompt = AsyncMock(return_value="I think it's true")
+        mock_binary_agent.return_value.prompt = AsyncMock(return_value="True")
+
+        survey = Survey(
+            client=AsyncMock(),
+            tool_belt=AsyncMock(),
+            n_agents=100,
+            max_concurrency=1,
+            target_interval_width=0.3,
+        )
+
+        response = await survey.conduct("test prompt", research=AsyncMock(return_value=[])())
+
+        assert response.in_favor == 9
+        assert mock_reasoning_agent.return_value.prompt.call_count == 9
+        assert response.percent_in_favor == 1.0
+
+
+async def test_agents_share_base_knowledge():
+    with patch("surv_ai.core.survey.ReasoningAgent") as mock_reasoning_agent, patch(
+        "surv_ai.core.survey.BinaryAgent"
+    ) as mock_binary_agent:
+        mock_reasoning_agent.return_value.color = "red"
+        mock_reasoning_agent.return_value.prompt = AsyncMock(return_value="I think it's true")
+        mock_binary_agent.return_value.prompt = AsyncMock(return_value="True")
+
+        survey = Survey(
+            client=AsyncMock(),
+            tool_belt=AsyncMock(),
+            n_agents=3,
+            base_knowledge=[Knowledge(text="Base knowledge", source="Base")],
+        )
+
+        await survey.conduct("test prompt", research=AsyncMock(return_value=[])())
+
+        knowledge_stores = [call[1]["knowledge_store"] for call in mock_reasoning_agent.call_args_list]
+        assert len(knowledge_stores) == 3
+        assert all(knowledge_store.base is survey.base_knowledge_store for knowledge_store in knowledge_stores)
+        assert len({id(knowledge_store.overlay) for knowledge_store in knowledge_stores}) == 3
+        assert survey.base_knowledge_store.knowledge == [Knowledge(text="Base knowledge", source="Base")]
+
+
+async def test_conduct_stops_polling_when_budget_is_exhausted():
+    with patch("surv_ai.core.survey.ReasoningAgent") as mock_reasoning_agent, patch(
+        "surv_ai.core.survey.BinaryAgent"
+    ) as mock_binary_agent:
+
+        async def prompt(*_):
+            record_usage(100, 10)
+            return "True"
+
+        mock_reasoning_agent.return_value.color = "red"
+        mock_reasoning_agent.return_value.prompt = prompt
+        mock_binary_agent.return_value.prompt = prompt
+
+        survey = Survey(
+            client=AsyncMock(),
+            tool_belt=AsyncMock(),
+            n_agents=10,
+            max_concurrency=1,
+            call_budget=6,
+        )
+
+        response = await survey.conduct("test prompt", research=AsyncMock(return_value=[])())
+
+        assert response.in_favor == 3
+        assert response.usage.n_calls == 6
+        assert response.usage.total_tokens == 660
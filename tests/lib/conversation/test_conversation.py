@@ -28,3 +28,42 @@ Bob said, "Hello"
 Alice said, "Hi"
 ```"""
     )
+
+
+def test_keeps_most_recent_messages():
+    convo = Conversation(max_messages=2)
+    convo.add("Hello", "Bob")
+    convo.add("Hi", "Alice")
+    convo.add("Bye", "Bob")
+
+    assert [message.text for message in convo] == ["Hi", "Bye"]
+    assert convo[-1].text == "Bye"
+    assert convo.n_messages == 3
+    assert convo.speaker_counts == {"Bob": 2, "Alice": 1}
+    assert (
+        convo.as_string(exclude_speakers=["Alice"])
+        == """```
+Bob said, "Bye"
+```"""
+    )
+
+
+def test_updates_rendered_string_when_messages_are_added():
+    convo = Conversation()
+    convo.add("Hello", "Bob")
+
+    assert convo.as_string() == convo.as_string()
+
+    convo.add("Hi", "Alice")
+
+    assert convo.as_string(n_most_recent=1) == """```\nAlice said, "Hi"\n```"""
+
+
+def test_can_keep_only_counts():
+    convo = Conversation(keep_text=False)
+    convo.add("Hello", "Bob")
+    convo.add("Hi", "Alice")
+
+    assert len(convo) == 0
+    assert convo.n_messages == 2
+    assert convo.speaker_counts == {"Bob": 1, "Alice": 1}
@@ -0,0 +1,51 @@
+from surv_ai import Knowledge, LayeredKnowledgeStore, LocalKnowledgeStore
+
+
+def get_base():
+    base = LocalKnowledgeStore()
+    base.add_text("Base knowledge about the budget", "Base")
+    base.add_text("More base knowledge", "Base")
+
+    return base
+
+
+def test_adds_to_overlay_only():
+    base = get_base()
+    knowledge_store = LayeredKnowledgeStore(base)
+    knowledge_store.add_knowledge(Knowledge(text="Overlay knowledge", source="Article"))
+
+    assert len(base) == 2
+    assert len(knowledge_store) == 3
+    assert knowledge_store.knowledge[-1] == Knowledge(text="Overlay knowledge", source="Article")
+
+
+def test_recalls_recent_across_layers():
+    base = get_base()
+    base_first = LayeredKnowledgeStore(base)
+    base_last = LayeredKnowledgeStore(base, base_first=False)
+    for knowledge_store in [base_first, base_last]:
+        knowledge_store.add_text("Overlay knowledge", "Article")
+
+    assert [knowledge.text for knowledge in base_first.recall_recent(2)] == [
+        "More base knowledge",
+        "Overlay knowledge",
+    ]
+    assert [knowledge.text for knowledge in base_last.recall_recent(3)] == [
+        "Overlay knowledge",
+        "Base knowledge about the budget",
+        "More base knowledge",
+    ]
+    assert base_last.recall_recent(1, include_sources=["Article"]) == [
+        Knowledge(text="Overlay knowledge", source="Article")
+    ]
+
+
+def test_recalls_relevant_across_layers():
+    knowledge_store = LayeredKnowledgeStore(get_base())
+    knowledge_store.add_text("The budget bill passed", "Article")
+    knowledge_store.add_text("Rain is expected this weekend", "Article")
+
+    assert [knowledge.text for knowledge in knowledge_store.recall_relevant("budget bill", 2)] == [
+        "The budget bill passed",
+        "Base knowledge about the budget",
+    ]
@@ -52,3 +52,40 @@ def test_can_serialize_knowledge():
 2. Hello World 2
 3. Hello World 3"""
     )
+
+
+def test_recall_recent_merges_sources_in_insertion_order():
+    knowledge_store = LocalKnowledgeStore()
+    for i in range(10):
+        knowledge_store.add_text(f"Hello World {i}", ["User", "System", "Assertion"][i % 3])
+
+    assert [knowledge.text for knowledge in knowledge_store.recall_recent(3, include_sources=["User", "System"])] == [
+        "Hello World 6",
+        "Hello World 7",
+        "Hello World 9",
+    ]
+    assert [knowledge.text for knowledge in knowledge_store.recall_recent(2, exclude_sources=["User"])] == [
+        "Hello World 7",
+        "Hello World 8",
+    ]
+    assert knowledge_store.recall_recent(1, include_sources=["Unknown"]) == []
+    assert knowledge_store.recall_recent(0) == []
+    assert len(knowledge_store) == 10
+
+
+def test_can_recall_relevant():
+    knowledge_store = LocalKnowledgeStore()
+    knowledge_store.add_text("The senate passed the budget bill", "News")
+    knowledge_store.add_text("Rain is expected this weekend", "Weather")
+    knowledge_store.add_text("The budget bill now goes to the house", "User")
+    assert [knowledge.text for knowledge in knowledge_store.recall_relevant("budget bill", n_knowledge_items=5)] == [
+        "The senate passed the budget bill",
+        "The budget bill now goes to the house",
+    ]
+
+    knowledge_store.add_text("A second budget was proposed", "News")
+    assert knowledge_store.recall_relevant("budget", n_knowledge_items=1, include_sources=["User"]) == [
+        Knowledge(text="The budget bill now goes to the house", source="User")
+    ]
+    assert len(knowledge_store.recall_relevant("budget", exclude_sources=["News"])) == 1
+    assert knowledge_store.recall_relevant("volcano") == []
@@ -0,0 +1,69 @@
+import sqlite3
+
+import pytest
+
+from surv_ai import Knowledge, SQLiteKnowledgeStore
+
+
+@pytest.fixture
+def knowledge_store(tmp_path):
+    knowledge_store = SQLiteKnowledgeStore(str(tmp_path / "knowledge.sqlite3"))
+    knowledge_store.add_many(
+        [
+            Knowledge(text="The senate passed the budget bill", source="News"),
+            Knowledge(text="Rain is expected this weekend", source="Weather"),
+            Knowledge(text="The budget bill now goes to the house", source="User"),
+        ]
+    )
+
+    yield knowledge_store
+
+    knowledge_store.close()
+
+
+def test_can_add_text(knowledge_store):
+    knowledge_store.add_text("Hello World", "User")
+
+    assert len(knowledge_store) == 4
+    assert knowledge_store.recall_recent(n_knowledge_items=1) == [Knowledge(text="Hello World", source="User")]
+
+
+def test_can_filter_knowledge(knowledge_store):
+    assert (
+        knowledge_store.filter_knowledge(include_sources=["User", "Weather"])
+        == [
+            Knowledge(text="Rain is expected this weekend", source="Weather"),
+            Knowledge(text="The budget bill now goes to the house", source="User"),
+        ]
+        == knowledge_store.filter_knowledge(exclude_sources=["News"])
+    )
+
+
+def test_can_recall_recent(knowledge_store):
+    assert knowledge_store.recall_recent(n_knowledge_items=2, exclude_sources=["Weather"]) == [
+        Knowledge(text="The senate passed the budget bill", source="News"),
+        Knowledge(text="The budget bill now goes to the house", source="User"),
+    ]
+
+
+def test_can_recall_relevant(knowledge_store):
+    assert [knowledge.source for knowledge in knowledge_store.recall_relevant("budget bills")] == ["News", "User"]
+    assert knowledge_store.recall_relevant("budget", include_sources=["User"]) == [
+        Knowledge(text="The budget bill now goes to the house", source="User")
+    ]
+    assert knowledge_store.recall_relevant('volcano" OR "rain') == [
+        Knowledge(text="Rain is expected this weekend", source="Weather")
+    ]
+    assert knowledge_store.recall_relevant("the") == []
+
+
+def test_can_open_read_only(knowledge_store):
+    reader = SQLiteKnowledgeStore(knowledge_store.path, read_only=True)
+    knowledge_store.add_text("Hello World", "User")
+
+    assert len(reader) == 4
+
+    with pytest.raises(sqlite3.OperationalError):
+        reader.add_text("Hello World", "User")
+
+    reader.close()
@@ -1,10 +1,14 @@
+import math
+
 from mock import Mock, patch
 
-from surv_ai import AnthropicClient, Prompt, PromptMessage
+from surv_ai import AnthropicClient, Prompt, PromptMessage, UsageTracker
+from tests.utils import AsyncMock
 
 
 async def test_can_get_completion_happy_path():
-    with patch("requests.post") as mock_post:
+    with patch("surv_ai.lib.transport.HTTPTransport.post", new_callable=AsyncMock) as mock_post:
+        mock_post.return_value.status_code = 200
         mock_post.return_value.raise_for_status = Mock()
         mock_post.return_value.json = Mock(return_value={"completion": "Hello World"})
         gpt_client = AnthropicClient(api_key="123")
@@ -15,7 +19,8 @@ async def test_can_get_completion_happy_path():
 
 
 async def test_can_get_completion_with_multiple_messages():
-    with patch("requests.post") as mock_post:
+    with patch("surv_ai.lib.transport.HTTPTransport.post", new_callable=AsyncMock) as mock_post:
+        mock_post.return_value.status_code = 200
         mock_post.return_value.raise_for_status = Mock()
         mock_post.return_value.json = Mock(return_value={"completion": "Hello World"})
         gpt_client = AnthropicClient(api_key="123")
@@ -33,7 +38,8 @@ async def test_can_get_completion_with_multiple_messages():
 
 
 async def test_can_set_hyper_parameters():
-    with patch("requests.post") as mock_post:
+    with patch("surv_ai.lib.transport.HTTPTransport.post", new_callable=AsyncMock) as mock_post:
+        mock_post.return_value.status_code = 200
         mock_post.return_value.raise_for_status = Mock()
         mock_post.return_value.json = Mock(return_value={"completion": "Hello World"})
         gpt_client = AnthropicClient(api_key="123")
@@ -56,3 +62,24 @@ async def test_can_set_hyper_parameters():
         assert mock_post.call_args[1]["json"]["top_p"] == 0.5
         assert mock_post.call_args[1]["json"]["max_tokens_to_sample"] == 100
         assert mock_post.call_args[1]["json"]["model"] == "claude-v1"
+
+
+async def test_estimates_usage_without_tokenizing():
+    with patch("surv_ai.lib.transport.HTTPTransport.post", new_callable=AsyncMock) as mock_post, patch(
+        "surv_ai.lib.llm.tokens.get_encoding"
+    ) as mock_get_encoding:
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.raise_for_status = Mock()
+        mock_post.return_value.json = Mock(return_value={"completion": "Hello World"})
+        anthropic_client = AnthropicClient(api_key="123")
+        usage_tracker = UsageTracker()
+
+        await usage_tracker.track(
+            anthropic_client.get_completions(
+                [Prompt(messages=[PromptMessage(content="Hello World", role="user", name="User")])]
+            )
+        )
+
+        assert usage_tracker.usage.prompt_tokens == math.ceil(len("User: Hello World\n\nAssistant: ") / 4)
+        assert usage_tracker.usage.completion_tokens == 3
+        mock_get_encoding.assert_not_called()
@@ -0,0 +1,159 @@
+import asyncio
+import sqlite3
+
+import pytest
+from mock import patch
+
+from surv_ai import CachedClient, Prompt, PromptMessage
+from tests.utils import AsyncMock
+
+
+def build_prompt(content: str) -> Prompt:
+    return Prompt(messages=[PromptMessage(content=content, role="user", name="User")])
+
+
+async def test_caches_completions(tmp_path):
+    mock_client = AsyncMock()
+    mock_client.get_completions = AsyncMock(return_value=["Hello World"])
+    client = CachedClient(mock_client, path=str(tmp_path / "cache.sqlite3"))
+
+    assert await client.get_completions([build_prompt("Hello")], temperature=0.2) == ["Hello World"]
+    assert await client.get_completions([build_prompt("  Hello ")], temperature=0.2) == ["Hello World"]
+
+    assert mock_client.get_completions.call_count == 1
+    assert len(client) == 1
+
+
+async def test_cache_persists_between_clients(tmp_path):
+    mock_client = AsyncMock()
+    mock_client.get_completions = AsyncMock(return_value=["Hello World"])
+
+    await CachedClient(mock_client, path=str(tmp_path / "cache.sqlite3")).get_completions(
+        [build_prompt("Hello")], temperature=0
+    )
+    completions = await CachedClient(mock_client, path=str(tmp_path / "cache.sqlite3")).get_completions(
+        [build_prompt("Hello")], temperature=0
+    )
+
+    assert completions == ["Hello World"]
+    assert mock_client.get_completions.call_count == 1
+
+
+async def test_keys_on_hyperparameters(tmp_path):
+    mock_client = AsyncMock()
+    mock_client.get_completions = AsyncMock(return_value=["Hello World"])
+    client = CachedClient(mock_client, path=str(tmp_path / "cache.sqlite3"))
+
+    await client.get_completions([build_prompt("Hello")], model="gpt-3.5-turbo", temperature=0)
+    await client.get_completions([build_prompt("Hello")], model="gpt-4", temperature=0)
+
+    assert mock_client.get_completions.call_count == 2
+
+
+async def test_coalesces_in_flight_requests(tmp_path):
+    upstream_calls = []
+
+    async def get_completions(prompts, **_):
+        upstream_calls.append(prompts)
+        await asyncio.sleep(0.01)
+        return ["Hello World" for _ in prompts]
+
+    mock_client = AsyncMock()
+    mock_client.get_completions = get_completions
+    client = CachedClient(mock_client, path=str(tmp_path / "cache.sqlite3"))
+
+    results = await asyncio.gather(
+        client.get_completions([build_prompt("Hello"), build_prompt("Hello")], temperature=0),
+        client.get_completions([build_prompt("Hello")], temperature=0),
+    )
+
+    assert results == [["Hello World", "Hello World"], ["Hello World"]]
+    assert len(upstream_calls) == 1
+    assert len(upstream_calls[0]) == 1
+
+
+async def test_skips_cache_above_max_temperature(tmp_path):
+    mock_client = AsyncMock()
+    mock_client.get_completions = AsyncMock(return_value=["Hello World"])
+    client = CachedClient(mock_client, path=str(tmp_path / "cache.sqlite3"), max_temperature=0.5)
+
+    await client.get_completions([build_prompt("Hello")], temperature=0.6)
+    await client.get_completions([build_prompt("Hello")], temperature=0.6)
+
+    assert mock_client.get_completions.call_count == 2
+    assert len(client) == 0
+
+
+async def test_only_caches_low_temperature_calls_by_default(tmp_path):
+    mock_client = AsyncMock()
+    mock_client.get_completions = AsyncMock(return_value=["Hello World"])
+    client = CachedClient(mock_client, path=str(tmp_path / "cache.sqlite3"))
+
+    for _ in range(2):
+        await client.get_completions([build_prompt("Hello")], temperature=0.7)
+        await client.get_completions([build_prompt("Hello")])
+        await client.get_completions([build_prompt("Hello")], temperature=0.3)
+
+    assert mock_client.get_completions.call_count == 5
+    assert len(client) == 1
+
+
+async def test_caches_every_call_without_max_temperature(tmp_path):
+    mock_client = AsyncMock()
+    mock_client.get_completions = AsyncMock(return_value=["Hello World"])
+    client = CachedClient(mock_client, path=str(tmp_path / "cache.sqlite3"), max_temperature=None)
+
+    await client.get_completions([build_prompt("Hello")], temperature=0.7)
+    await client.get_completions([build_prompt("Hello")], temperature=0.7)
+
+    assert mock_client.get_completions.call_count == 1
+
+
+async def test_evicts_least_recently_used_above_max_size(tmp_path):
+    mock_client = AsyncMock()
+    mock_client.get_completions = AsyncMock(return_value=["0123456789"])
+    client = CachedClient(mock_client, path=str(tmp_path / "cache.sqlite3"), max_size_bytes=25)
+
+    for content in ["first", "second", "third"]:
+        await client.get_completions([build_prompt(content)], temperature=0)
+        await asyncio.sleep(0.001)
+
+    assert len(client) == 2
+
+    await client.get_completions([build_prompt("first")], temperature=0)
+
+    assert mock_client.get_completions.call_count == 4
+
+
+async def test_expires_entries_older_than_max_age(tmp_path):
+    mock_client = AsyncMock()
+    mock_client.get_completions = AsyncMock(return_value=["Hello World"])
+    client = CachedClient(mock_client, path=str(tmp_path / "cache.sqlite3"), max_age_seconds=0)
+
+    await client.get_completions([build_prompt("Hello")], temperature=0)
+    await asyncio.sleep(0.001)
+    await client.get_completions([build_prompt("Hello")], temperature=0)
+
+    assert mock_client.get_completions.call_count == 2
+
+
+async def test_does_not_block_event_loop_on_disk(tmp_path):
+    mock_client = AsyncMock()
+    mock_client.get_completions = AsyncMock(return_value=["Hello World"])
+    client = CachedClient(mock_client, path=str(tmp_path / "cache.sqlite3"))
+
+    with patch("surv_ai.lib.llm.cache.asyncio.to_thread", wraps=asyncio.to_thread) as mock_to_thread:
+        await client.get_completions([build_prompt("Hello")], temperature=0)
+        await client.get_completions([build_prompt("Hello")], temperature=0)
+
+    assert [call[0][0].__name__ for call in mock_to_thread.call_args_list] == ["_read", "_write", "_read"]
+    assert mock_client.get_completions.call_count == 1
+
+
+def test_close(tmp_path):
+    client = CachedClient(AsyncMock(), path=str(tmp_path / "cache.sqlite3"))
+
+    client.close()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        len(client)
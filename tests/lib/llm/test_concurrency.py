@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+from surv_ai import ConcurrencyGovernor
+from surv_ai.lib.llm.concurrency import get_governor
+
+
+async def test_queues_requests_above_limit():
+    governor = ConcurrencyGovernor(initial_limit=2)
+    release = asyncio.Event()
+
+    async def request():
+        async with governor.request() as governed_request:
+            await release.wait()
+            governed_request.status_code = 200
+
+    tasks = [asyncio.create_task(request()) for _ in range(5)]
+    await asyncio.sleep(0)
+
+    assert governor.in_flight == 2
+    assert governor.queue_depth == 3
+
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert governor.in_flight == 0
+    assert governor.queue_depth == 0
+
+
+async def test_increases_limit_additively_on_success():
+    governor = ConcurrencyGovernor(initial_limit=2, max_limit=3)
+
+    for _ in range(10):
+        async with governor.request() as governed_request:
+            governed_request.status_code = 200
+
+    assert governor.limit == 3
+
+
+async def test_decreases_limit_multiplicatively_when_throttled():
+    governor = ConcurrencyGovernor(initial_limit=8)
+
+    async with governor.request() as governed_request:
+        governed_request.status_code = 429
+
+    assert governor.limit == 4
+
+    async with governor.request() as governed_request:
+        governed_request.status_code = 502
+
+    assert governor.limit == 2
+
+
+async def test_decreases_limit_when_anthropic_is_overloaded():
+    governor = ConcurrencyGovernor(initial_limit=8)
+
+    async with governor.request() as governed_request:
+        governed_request.status_code = 529
+
+    assert governor.limit == 4
+
+
+async def test_decreases_limit_once_per_congestion_event():
+    governor = ConcurrencyGovernor(initial_limit=8)
+    started_at = [await governor.acquire() for _ in range(3)]
+
+    for request_started_at in started_at:
+        governor.release(request_started_at, 429)
+
+    assert governor.limit == 4
+
+
+async def test_compares_latency_with_requests_of_the_same_size():
+    governor = ConcurrencyGovernor(initial_limit=8, additive_increase=0)
+
+    for _ in range(5):
+        await governor.acquire()
+        governor.release(time.monotonic() - 0.5, 200, max_tokens=5)
+
+    await governor.acquire()
+    governor.release(time.monotonic() - 10, 200, max_tokens=800)
+
+    assert governor.limit == 8
+
+    await governor.acquire()
+    governor.release(time.monotonic() - 10, 200, max_tokens=5)
+
+    assert governor.limit == 4
+
+
+async def test_ignores_cancelled_requests():
+    governor = ConcurrencyGovernor(initial_limit=8)
+
+    try:
+        async with governor.request():
+            raise asyncio.CancelledError()
+    except asyncio.CancelledError:
+        pass
+
+    assert governor.limit == 8
+    assert governor.in_flight == 0
+
+
+def test_shares_governor_per_api_key():
+    assert get_governor("openai", "123") is get_governor("openai", "123")
+    assert get_governor("openai", "123") is not get_governor("openai", "456")
+    assert get_governor("openai", "123") is not get_governor("anthropic", "123")
@@ -1,10 +1,22 @@
+import pytest
 from mock import Mock, patch
 
-from surv_ai import GPTClient, Prompt, PromptMessage
+from surv_ai import (
+    GPTClient,
+    Prompt,
+    PromptMessage,
+    UsageTracker,
+    trace_context,
+    tracer,
+)
+from surv_ai.lib.llm.batching import bind_prompt_contexts
+from surv_ai.lib.tracing import StatusCode
+from tests.utils import AsyncMock
 
 
 async def test_can_get_completion_happy_path():
-    with patch("requests.post") as mock_post:
+    with patch("surv_ai.lib.transport.HTTPTransport.post", new_callable=AsyncMock) as mock_post:
+        mock_post.return_value.status_code = 200
         mock_post.return_value.raise_for_status = Mock()
         mock_post.return_value.json = Mock(return_value={"choices": [{"message": {"content": "Hello World"}}]})
         gpt_client = GPTClient(api_key="123")
@@ -15,7 +27,8 @@ async def test_can_get_completion_happy_path():
 
 
 async def test_can_get_completion_with_multiple_messages():
-    with patch("requests.post") as mock_post:
+    with patch("surv_ai.lib.transport.HTTPTransport.post", new_callable=AsyncMock) as mock_post:
+        mock_post.return_value.status_code = 200
         mock_post.return_value.raise_for_status = Mock()
         mock_post.return_value.json = Mock(
             return_value={
@@ -45,7 +58,8 @@ async def test_can_get_completion_with_multiple_messages():
 
 
 async def test_can_set_hyper_parameters():
-    with patch("requests.post") as mock_post:
+    with patch("surv_ai.lib.transport.HTTPTransport.post", new_callable=AsyncMock) as mock_post:
+        mock_post.return_value.status_code = 200
         mock_post.return_value.raise_for_status = Mock()
         mock_post.return_value.json = Mock(return_value={"choices": [{"message": {"content": "Hello World"}}]})
         gpt_client = GPTClient(api_key="123")
@@ -65,3 +79,122 @@ async def test_can_set_hyper_parameters():
         assert mock_post.call_args[1]["json"]["top_p"] == 0.5
         assert mock_post.call_args[1]["json"]["max_tokens"] == 100
         assert mock_post.call_args[1]["json"]["model"] == "gpt-4"
+
+
+async def test_retries_with_original_hyper_parameters():
+    with patch("surv_ai.lib.transport.HTTPTransport.post", new_callable=AsyncMock) as mock_post, patch(
+        "asyncio.sleep", new_callable=AsyncMock
+    ) as mock_sleep:
+        rate_limited_response = Mock(status_code=429, headers={"retry-after": "2"})
+        rate_limited_response.raise_for_status = Mock(side_effect=Exception("Too Many Requests"))
+        successful_response = Mock(status_code=200)
+        successful_response.json = Mock(return_value={"choices": [{"message": {"content": "Hello World"}}]})
+        mock_post.side_effect = [rate_limited_response, successful_response]
+
+        gpt_client = GPTClient(api_key="123")
+        completions = await gpt_client.get_completions(
+            [Prompt(messages=[PromptMessage(content="Hello World", role="user", name="User")])],
+            temperature=0.5,
+            max_tokens=100,
+            model="gpt-4",
+        )
+
+        assert completions == ["Hello World"]
+        assert mock_post.call_count == 2
+        assert mock_sleep.call_args[0] == (2,)
+        assert mock_post.call_args[1]["json"]["temperature"] == 0.5
+        assert mock_post.call_args[1]["json"]["max_tokens"] == 100
+        assert mock_post.call_args[1]["json"]["model"] == "gpt-4"
+
+
+async def test_records_span_for_completion():
+    exporter = Mock()
+
+    with patch("surv_ai.lib.transport.HTTPTransport.post", new_callable=AsyncMock) as mock_post, patch(
+        "asyncio.sleep", new_callable=AsyncMock
+    ), patch.object(tracer, "exporter", exporter):
+        rate_limited_response = Mock(status_code=429, headers={})
+        rate_limited_response.raise_for_status = Mock(side_effect=Exception("Too Many Requests"))
+        successful_response = Mock(status_code=200)
+        successful_response.json = Mock(
+            return_value={
+                "choices": [{"message": {"content": "Hello World"}}],
+                "usage": {"prompt_tokens": 12, "completion_tokens": 3},
+            }
+        )
+        mock_post.side_effect = [rate_limited_response, successful_response]
+
+        gpt_client = GPTClient(api_key="123")
+        with trace_context(agent="Agent 1", stage="judge"):
+            await gpt_client.get_completions(
+                [Prompt(messages=[PromptMessage(content="Hello World", role="user", name="User")])]
+            )
+
+    span = exporter.export.call_args[0][0]
+
+    assert span.name == "llm.completion"
+    assert span.status_code == StatusCode.OK
+    assert span.attributes["surv_ai.agent"] == "Agent 1"
+    assert span.attributes["surv_ai.stage"] == "judge"
+    assert span.attributes["surv_ai.retries"] == 1
+    assert span.attributes["surv_ai.queue_seconds"] >= 0
+    assert span.attributes["surv_ai.latency_seconds"] >= 0
+    assert span.attributes["gen_ai.usage.input_tokens"] == 12
+    assert span.attributes["gen_ai.usage.output_tokens"] == 3
+    assert span.attributes["http.response.status_code"] == 200
+
+
+async def test_records_usage():
+    with patch("surv_ai.lib.transport.HTTPTransport.post", new_callable=AsyncMock) as mock_post:
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.raise_for_status = Mock()
+        mock_post.return_value.json = Mock(
+            return_value={
+                "choices": [{"message": {"content": "Hello World"}}],
+                "usage": {"prompt_tokens": 12, "completion_tokens": 3},
+            }
+        )
+        gpt_client = GPTClient(api_key="123")
+        usage_tracker = UsageTracker()
+
+        await usage_tracker.track(
+            gpt_client.get_completions(
+                [Prompt(messages=[PromptMessage(content="Hello World", role="user", name="User")])] * 2
+            )
+        )
+
+        assert usage_tracker.usage.prompt_tokens == 24
+        assert usage_tracker.usage.completion_tokens == 6
+        assert usage_tracker.usage.n_calls == 2
+
+
+async def test_records_usage_of_each_prompt_with_its_bound_tracker():
+    with patch("surv_ai.lib.transport.HTTPTransport.post", new_callable=AsyncMock) as mock_post:
+        mock_post.return_value.status_code = 200
+        mock_post.return_value.raise_for_status = Mock()
+        mock_post.return_value.json = Mock(
+            return_value={
+                "choices": [{"message": {"content": "Hello World"}}],
+                "usage": {"prompt_tokens": 12, "completion_tokens": 3},
+            }
+        )
+        gpt_client = GPTClient(api_key="123")
+        prompts = [Prompt(messages=[PromptMessage(content="Hello World", role="user", name="User")]) for _ in range(2)]
+        usage_trackers = [UsageTracker(), UsageTracker()]
+
+        with bind_prompt_contexts(zip(prompts, [usage_tracker.activate for usage_tracker in usage_trackers])):
+            await gpt_client.get_completions(prompts)
+
+        assert [usage_tracker.usage.n_calls for usage_tracker in usage_trackers] == [1, 1]
+
+
+async def test_raises_if_initial_prompt_is_too_long():
+    with patch("surv_ai.lib.transport.HTTPTransport.post", new_callable=AsyncMock) as mock_post:
+        gpt_client = GPTClient(api_key="123")
+
+        with pytest.raises(Exception, match="Initial prompt is too long."):
+            await gpt_client.get_completions(
+                [Prompt(messages=[PromptMessage(content="Hello World " * 5000, role="system")])]
+            )
+
+        assert mock_post.call_count == 0
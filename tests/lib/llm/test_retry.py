@@ -0,0 +1,57 @@
+from surv_ai import RetryAction, RetryBudget, RetryPolicy
+
+
+def test_backs_off_on_rate_limit():
+    policy = RetryPolicy()
+
+    assert policy.get_action(1, 429) == RetryAction.BACKOFF
+    assert policy.get_action(1, None) == RetryAction.BACKOFF
+    assert policy.get_action(1, 400) == RetryAction.SHRINK_PROMPT
+    assert policy.get_action(1, 401) == RetryAction.FAIL
+
+
+def test_can_override_status_actions():
+    policy = RetryPolicy(status_actions={400: RetryAction.FAIL, 418: RetryAction.BACKOFF})
+
+    assert policy.get_action(1, 400) == RetryAction.FAIL
+    assert policy.get_action(1, 418) == RetryAction.BACKOFF
+
+
+def test_stops_after_max_attempts():
+    policy = RetryPolicy(max_attempts=3)
+
+    assert policy.get_action(2, 429) == RetryAction.BACKOFF
+    assert policy.get_action(3, 429) == RetryAction.FAIL
+
+
+def test_stops_when_budget_is_exhausted():
+    policy = RetryPolicy(budget=RetryBudget(ratio=0.5, capacity=1))
+
+    assert policy.get_action(1, 429) == RetryAction.BACKOFF
+    assert policy.get_action(1, 429) == RetryAction.FAIL
+
+    policy.record_request()
+    policy.record_request()
+
+    assert policy.get_action(1, 429) == RetryAction.BACKOFF
+
+
+def test_backs_off_exponentially():
+    policy = RetryPolicy(base_delay=0.5, max_delay=3, jitter=False)
+
+    assert [policy.get_delay(attempt) for attempt in range(1, 5)] == [0.5, 1, 2, 3]
+
+
+def test_jitters_backoff():
+    policy = RetryPolicy(base_delay=0.5)
+
+    assert all(0 <= policy.get_delay(3) <= 2 for _ in range(100))
+
+
+def test_respects_retry_after():
+    policy = RetryPolicy(max_delay=10)
+
+    assert policy.get_delay(1, {"retry-after": "4"}) == 4
+    assert policy.get_delay(1, {"retry-after-ms": "1500"}) == 1.5
+    assert policy.get_delay(1, {"retry-after": "120"}) == 10
+    assert policy.get_delay(1, {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}) == 0
@@ -0,0 +1,74 @@
+import pytest
+from mock import Mock, patch
+
+from surv_ai.lib.llm.tokens import (
+    _token_counts,
+    clear_token_counts,
+    count_message_tokens,
+    count_tokens,
+    fit_messages,
+)
+
+
+def build_message(content: str, role: str = "user") -> dict:
+    return {"role": role, "content": content}
+
+
+def test_counts_tokens_with_tokenizer():
+    clear_token_counts()
+    with patch("surv_ai.lib.llm.tokens.get_encoding") as mock_get_encoding:
+        mock_get_encoding.return_value = Mock(encode=Mock(side_effect=lambda text, **_: text.split()))
+
+        assert count_tokens("one two three", "gpt-4") == 3
+        assert count_tokens("one two three", "gpt-4") == 3
+        assert mock_get_encoding.return_value.encode.call_count == 1
+
+    clear_token_counts()
+
+
+def test_caches_counts_by_digest_up_to_max_size():
+    clear_token_counts()
+    with patch("surv_ai.lib.llm.tokens.get_encoding") as mock_get_encoding, patch(
+        "surv_ai.lib.llm.tokens.MAX_CACHED_TOKEN_COUNTS", 2
+    ):
+        mock_get_encoding.return_value = Mock(encode=Mock(side_effect=lambda text, **_: text.split()))
+
+        for text in ["one", "two", "three " * 1000, "one"]:
+            count_tokens(text, "gpt-4")
+
+        assert mock_get_encoding.return_value.encode.call_count == 4
+        assert len(_token_counts) == 2
+        assert all(len(digest) == 16 for digest, _ in _token_counts)
+
+    clear_token_counts()
+
+
+def test_approximates_tokens_without_tokenizer():
+    clear_token_counts()
+    with patch("surv_ai.lib.llm.tokens.get_encoding", return_value=None):
+        assert count_tokens("a" * 10, "gpt-4") == 3
+        assert count_message_tokens(build_message("a" * 8), "gpt-4") == 3 + 1 + 2
+
+    clear_token_counts()
+
+
+def test_keeps_messages_that_fit():
+    messages = [build_message("system", "system"), build_message("hello"), build_message("world")]
+
+    assert fit_messages(messages, "gpt-4", 1000) == messages
+    assert fit_messages(messages, "gpt-4", None) == messages
+
+
+def test_drops_oldest_messages_after_system_message():
+    messages = [build_message("system", "system"), *[build_message(f"message {i} " * 10) for i in range(5)]]
+    system_tokens = count_message_tokens(messages[0], "gpt-4")
+    message_tokens = count_message_tokens(messages[1], "gpt-4")
+
+    fitted = fit_messages(messages, "gpt-4", system_tokens + 2 * message_tokens + 3)
+
+    assert fitted == [messages[0], messages[4], messages[5]]
+
+
+def test_raises_if_initial_prompt_is_too_long():
+    with pytest.raises(Exception):
+        fit_messages([build_message("system " * 100, "system"), build_message("hello")], "gpt-4", 10)
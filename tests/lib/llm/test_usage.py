@@ -0,0 +1,52 @@
+import asyncio
+
+from surv_ai import UsageTracker
+from surv_ai.lib.llm.usage import get_usage_tracker, record_usage
+
+
+def test_records_usage_with_parents():
+    parent = UsageTracker()
+    child = UsageTracker(parent=parent)
+
+    child.record(10, 2)
+    parent.record(5, 1)
+
+    assert child.usage.total_tokens == 12
+    assert child.usage.n_calls == 1
+    assert parent.usage.prompt_tokens == 15
+    assert parent.usage.completion_tokens == 3
+    assert parent.usage.n_calls == 2
+
+
+def test_exhausted_when_any_parent_is_out_of_budget():
+    parent = UsageTracker(call_budget=2)
+    child = UsageTracker(token_budget=100, parent=parent)
+
+    child.record(10, 2)
+    assert not child.exhausted
+
+    parent.record(1, 1)
+    assert child.exhausted
+    assert parent.exhausted
+
+    other_child = UsageTracker(token_budget=10)
+    other_child.record(8, 2)
+    assert other_child.exhausted
+
+
+async def test_tracks_usage_of_tasks_created_while_active():
+    tracker = UsageTracker()
+
+    async def complete():
+        await asyncio.sleep(0)
+        record_usage(3, 1)
+
+    async def complete_many():
+        await asyncio.gather(*[complete() for _ in range(3)])
+
+    await tracker.track(complete_many())
+    record_usage(100, 100)
+
+    assert get_usage_tracker() is None
+    assert tracker.usage.n_calls == 3
+    assert tracker.usage.total_tokens == 12
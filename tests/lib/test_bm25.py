@@ -0,0 +1,40 @@
+from surv_ai.lib.bm25 import BM25Index, tokenize
+
+
+def test_tokenize():
+    assert tokenize("The Senate passed the bill, 52-48.") == ["senate", "passed", "bill", "52", "48"]
+
+
+def test_ranks_documents_by_relevance():
+    index = BM25Index()
+    index.add(
+        [
+            "the cat sat on the mat",
+            "dogs and cats living together",
+            "a cat chased another cat up a tree",
+            "nothing relevant here",
+        ]
+    )
+
+    results = index.search("cat", top_k=10)
+
+    assert [document_id for document_id, _ in results] == [2, 0]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_limits_results_to_top_k():
+    index = BM25Index()
+    index.add([f"document {i} about apples" for i in range(100)])
+
+    assert len(index.search("apples", top_k=5)) == 5
+    assert index.search("oranges") == []
+
+
+def test_adds_documents_incrementally():
+    index = BM25Index()
+    index.add(["first document"])
+    assert index.search("second") == []
+
+    index.add(["second document"])
+    assert [document_id for document_id, _ in index.search("second")] == [1]
+    assert len(index) == 2
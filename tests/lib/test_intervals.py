@@ -0,0 +1,20 @@
+from surv_ai.lib.intervals import wilson_interval
+
+
+def test_wilson_interval():
+    lower, upper = wilson_interval(10, 20)
+
+    assert round(lower, 3) == 0.299
+    assert round(upper, 3) == 0.701
+
+
+def test_wilson_interval_narrows_with_more_trials():
+    small_lower, small_upper = wilson_interval(10, 10)
+    large_lower, large_upper = wilson_interval(100, 100)
+
+    assert small_upper == large_upper == 1.0
+    assert large_upper - large_lower < small_upper - small_lower
+
+
+def test_wilson_interval_without_trials():
+    assert wilson_interval(0, 0) == (0.0, 1.0)
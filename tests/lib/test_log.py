@@ -1,6 +1,33 @@
-from mock import Mock
+import logging
+import threading
+
+import pytest
+from mock import MagicMock, Mock
 
 from surv_ai import AgentLogLevel, logger
+from surv_ai.lib.log import ColorFormatter, Logger
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        self.threads.append(threading.current_thread())
+
+
+def get_logger(name: str, log_level: AgentLogLevel) -> tuple[Logger, ListHandler]:
+    test_logger = Logger(name=name, log_level=log_level)
+    handler = ListHandler()
+    handler.setFormatter(ColorFormatter())
+
+    test_logger._logger.handlers = [handler]
+    test_logger._logger.propagate = False
+
+    return test_logger, handler
 
 
 def test_log_exception():
@@ -8,15 +35,15 @@ def test_log_exception():
     logger.set_log_level(AgentLogLevel.EXCEPTION)
     logger.log_exception("test")
 
-    logger._logger.exception.assert_called_once_with("test")
+    logger._logger.exception.assert_called_once_with("test", extra={"agent_log_level": "exception"})
 
 
 def test_log_error():
     logger._logger = Mock()
     logger.set_log_level(AgentLogLevel.ERROR)
-    logger.log_error("test")
+    logger.log_error("test %s", 1)
 
-    logger._logger.error.assert_called_once_with("test")
+    logger._logger.error.assert_called_once_with("test %s", 1, extra={"agent_log_level": "error"})
 
 
 def test_log_warning():
@@ -24,28 +51,57 @@ def test_log_warning():
     logger.set_log_level(AgentLogLevel.WARNING)
     logger.log_warning("test")
 
-    logger._logger.warning.assert_called_once_with("test")
+    logger._logger.warning.assert_called_once_with("test", extra={"agent_log_level": "warning"})
 
 
 def test_log_context():
-    logger._logger = Mock()
-    logger.set_log_level(AgentLogLevel.CONTEXT)
-    logger.log_context("test")
+    test_logger, handler = get_logger("surv_ai.test.context", AgentLogLevel.CONTEXT)
+    test_logger.log_context("test %s", "message")
 
-    logger._logger.info.assert_called_once_with("\x1b[1m\x1b[37mtest\x1b[0m")
+    assert handler.messages == ["\x1b[1m\x1b[37mtest message\x1b[0m"]
 
 
 def test_log_output():
-    logger._logger = Mock()
-    logger.set_log_level(AgentLogLevel.OUTPUT)
-    logger.log_output("test")
+    test_logger, handler = get_logger("surv_ai.test.output", AgentLogLevel.OUTPUT)
+    test_logger.log_output("test", color="\x1b[34m")
+
+    assert handler.messages == ["\x1b[1m\x1b[34mtest\x1b[0m"]
+
 
-    logger._logger.info.assert_called_once_with("\x1b[1m\x1b[37mtest\x1b[0m")
+def test_accepts_color_as_positional_argument():
+    test_logger, handler = get_logger("surv_ai.test.positional_color", AgentLogLevel.OUTPUT)
+
+    with pytest.warns(DeprecationWarning):
+        test_logger.log_output("test", "\x1b[31m")
+
+    assert handler.messages == ["\x1b[1m\x1b[31mtest\x1b[0m"]
 
 
 def test_log_internal():
-    logger._logger = Mock()
-    logger.set_log_level(AgentLogLevel.INTERNAL)
-    logger.log_internal("test")
+    test_logger, handler = get_logger("surv_ai.test.internal", AgentLogLevel.INTERNAL)
+    test_logger.log_internal("test")
+
+    assert handler.messages == ["\x1b[2m\x1b[90mtest\x1b[0m"]
+
+
+def test_does_not_format_discarded_messages():
+    test_logger, handler = get_logger("surv_ai.test.discarded", AgentLogLevel.CONTEXT)
+    argument = MagicMock()
+
+    test_logger.log_internal("test %s", argument)
+
+    assert handler.messages == []
+    argument.__str__.assert_not_called()
+
+
+def test_background_logging_formats_records_on_listener_thread():
+    test_logger, handler = get_logger("surv_ai.test.background", AgentLogLevel.OUTPUT)
+    test_logger._logger.handlers = []
+
+    test_logger.start_background_logging([handler])
+    test_logger.log_output("test %s", "message")
+    test_logger.stop_background_logging()
 
-    logger._logger.info.assert_called_once_with("\x1b[90m\x1b[2mtest\x1b[0m")
+    assert handler.messages == ["\x1b[1m\x1b[37mtest message\x1b[0m"]
+    assert handler.threads[0] is not threading.current_thread()
+    assert not test_logger._logger.propagate
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from surv_ai.lib.scheduling import gather_sliding_window, sliding_window
+
+
+async def test_keeps_window_full():
+    in_flight = 0
+    max_in_flight = 0
+    started = []
+
+    async def work(index: int, delay: float):
+        nonlocal in_flight, max_in_flight
+        started.append(index)
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(delay)
+        in_flight -= 1
+        return index
+
+    delays = [0.05, 0.001, 0.001, 0.001, 0.001]
+    completed = [index async for index, _ in sliding_window([lambda i=i: work(i, delays[i]) for i in range(5)], 2)]
+
+    assert max_in_flight == 2
+    assert completed[-1] == 0
+    assert started == [0, 1, 2, 3, 4]
+
+
+async def test_gathers_results_in_order():
+    async def work(index: int):
+        await asyncio.sleep(0.001 * (5 - index))
+        return index
+
+    assert await gather_sliding_window([lambda i=i: work(i) for i in range(5)], 3) == [0, 1, 2, 3, 4]
+
+
+async def test_cancels_in_flight_work_when_closed():
+    cancelled = []
+
+    async def work(index: int):
+        try:
+            await asyncio.sleep(0 if index == 0 else 10)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+        return index
+
+    results = sliding_window([lambda i=i: work(i) for i in range(5)], 3)
+    assert await results.__anext__() == (0, 0)
+    await results.aclose()
+
+    assert sorted(cancelled) == [1, 2]
+
+
+async def test_propagates_exceptions():
+    async def work(index: int):
+        if index == 1:
+            raise ValueError("failed")
+        return index
+
+    with pytest.raises(ValueError):
+        await gather_sliding_window([lambda i=i: work(i) for i in range(3)], 2)
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from surv_ai import JSONLSpanExporter, Tracer, trace_context
+from surv_ai.lib.llm.gpt import GPTModel
+from surv_ai.lib.tracing import StatusCode
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+    def flush(self):
+        pass
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+
+    with tracer.span("test") as span:
+        span.set_attribute("key", "value")
+
+    assert not tracer.enabled
+    assert not span.recording
+
+
+def test_spans_nest_and_carry_context_labels():
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+
+    with trace_context(agent="Agent #1"):
+        with tracer.span("parent"):
+            with trace_context(stage="plan"), tracer.span("child", attributes={"key": 1}):
+                pass
+
+    child, parent = exporter.spans
+
+    assert child.parent_span_id == parent.span_id
+    assert child.trace_id == parent.trace_id
+    assert child.attributes == {"surv_ai.agent": "Agent #1", "surv_ai.stage": "plan", "key": 1}
+    assert parent.attributes["surv_ai.stage"] is None
+    assert child.status_code == StatusCode.OK
+    assert child.duration_seconds >= 0
+
+
+def test_marks_failed_spans():
+    exporter = ListExporter()
+    tracer = Tracer(exporter)
+
+    with pytest.raises(ValueError):
+        with tracer.span("test"):
+            raise ValueError("failed")
+
+    assert exporter.spans[0].status_code == StatusCode.ERROR
+    assert "failed" in exporter.spans[0].status_message
+
+
+def test_jsonl_exporter_writes_otlp_requests(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer(JSONLSpanExporter(str(path), max_batch_size=2))
+
+    for index in range(3):
+        with tracer.span(
+            "test",
+            attributes={"index": index, "ratio": 0.5, "flag": True, "empty": None, "model": GPTModel.TURBO},
+        ):
+            pass
+
+    assert len(path.read_text().splitlines()) == 1
+
+    tracer.configure(None)
+
+    requests = [json.loads(line) for line in path.read_text().splitlines()]
+    spans = [
+        span
+        for request in requests
+        for resource_spans in request["resourceSpans"]
+        for scope_spans in resource_spans["scopeSpans"]
+        for span in scope_spans["spans"]
+    ]
+
+    assert len(requests) == 2
+    assert len(spans) == 3
+    assert spans[0]["name"] == "test"
+    assert spans[0]["status"] == {"code": 1}
+    assert {"key": "index", "value": {"intValue": "0"}} in spans[0]["attributes"]
+    assert {"key": "ratio", "value": {"doubleValue": 0.5}} in spans[0]["attributes"]
+    assert {"key": "flag", "value": {"boolValue": True}} in spans[0]["attributes"]
+    assert {"key": "model", "value": {"stringValue": "gpt-3.5-turbo"}} in spans[0]["attributes"]
+    assert "empty" not in [attribute["key"] for attribute in spans[0]["attributes"]]
@@ -0,0 +1,47 @@
+import asyncio
+
+from mock import patch
+
+from surv_ai import HTTPTransport
+from tests.utils import AsyncMock
+
+
+async def test_reuses_client_within_event_loop():
+    transport = HTTPTransport(max_connections=5, max_keepalive_connections=2)
+
+    assert transport._get_client() is transport._get_client()
+
+    await transport.aclose()
+
+
+async def test_can_post():
+    transport = HTTPTransport()
+
+    with patch("httpx.AsyncClient.post", new_callable=AsyncMock) as mock_post:
+        await transport.post("https://example.com", json={"hello": "world"}, headers={"x-api-key": "123"})
+
+        assert mock_post.call_args[0] == ("https://example.com",)
+        assert mock_post.call_args[1]["json"] == {"hello": "world"}
+        assert mock_post.call_args[1]["headers"] == {"x-api-key": "123"}
+
+    await transport.aclose()
+
+
+async def test_caps_concurrent_requests_per_host():
+    transport = HTTPTransport(max_connections_per_host=2)
+    in_flight = {"example.com": 0, "example.org": 0}
+    max_in_flight = {"example.com": 0, "example.org": 0}
+
+    async def get(_, url, **__):
+        host = url.split("/")[2]
+        in_flight[host] += 1
+        max_in_flight[host] = max(max_in_flight[host], in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight[host] -= 1
+
+    with patch("httpx.AsyncClient.get", new=get):
+        await asyncio.gather(*[transport.get(f"https://{host}/{index}") for host in in_flight for index in range(5)])
+
+    assert max_in_flight == {"example.com": 2, "example.org": 2}
+
+    await transport.aclose()
@@ -30,3 +30,20 @@ async def test_can_use_tool():
             url="abcd",
         )
     ]
+
+
+async def test_returns_most_relevant_rows():
+    df = DataFrame(
+        [
+            {"id": "1", "title": "Weather", "content": "Rain is expected over the weekend."},
+            {"id": "2", "title": "Election", "content": "The election results were announced."},
+            {"id": "3", "title": "Recount", "content": "A recount of the election results was requested."},
+            {"id": "4", "title": "Sports", "content": None},
+        ]
+    )
+    tool = DataframeTool(df, "parsed CSV", "id", "title", "content", top_k=2)
+
+    return_val = await tool.use("election recount")
+
+    assert [result.url for result in return_val] == ["3", "2"]
+    assert await tool.use("volcano") == []
@@ -0,0 +1,122 @@
+import sqlite3
+
+import pyarrow
+import pyarrow.feather
+import pyarrow.parquet
+import pytest
+from mock import patch
+
+from surv_ai import DatasetTool, ToolResult
+
+RECORDS = {
+    "id": ["1", "2", "3", "4", "5"],
+    "title": ["Weather", "Election", "Recount", "Sports", "Markets"],
+    "content": [
+        "Rain is expected over the weekend.",
+        "The election results were announced.",
+        "A recount of the election results was requested.",
+        None,
+        "Stocks rallied after the election.",
+    ],
+}
+
+
+@pytest.fixture(params=["parquet", "feather"])
+def dataset_path(request, tmp_path):
+    table = pyarrow.table(RECORDS)
+
+    if request.param == "parquet":
+        path = tmp_path / "records.parquet"
+        pyarrow.parquet.write_table(table, path, row_group_size=2)
+    else:
+        path = tmp_path / "records.feather"
+        pyarrow.feather.write_feather(table, path, compression="uncompressed", chunksize=2)
+
+    return path
+
+
+async def test_returns_most_relevant_rows(dataset_path):
+    tool = DatasetTool(dataset_path, "news archive", "id", "title", "content", top_k=2)
+
+    return_val = await tool.use("election recount")
+
+    assert return_val == [
+        ToolResult(
+            url="3",
+            site_name="news archive",
+            title="Recount",
+            body="A recount of the election results was requested.",
+        ),
+        ToolResult(
+            url="2",
+            site_name="news archive",
+            title="Election",
+            body="The election results were announced.",
+        ),
+    ]
+
+
+async def test_returns_first_rows_for_empty_query(dataset_path):
+    tool = DatasetTool(dataset_path, "news archive", "id", "title", "content", top_k=3)
+
+    return_val = await tool.use("")
+
+    assert [result.url for result in return_val] == ["1", "2", "3"]
+    assert tool.n_rows == 5
+
+
+def test_requires_known_format(tmp_path):
+    with pytest.raises(ValueError):
+        DatasetTool(tmp_path / "records.csv", "news archive", "id", "title", "content")
+
+
+async def test_workers_reuse_persisted_index(dataset_path):
+    DatasetTool(dataset_path, "news archive", "id", "title", "content", top_k=1).close()
+
+    with patch.object(DatasetTool, "_build_index") as mock_build_index:
+        worker = DatasetTool(dataset_path, "news archive", "id", "title", "content", top_k=1, read_only=True)
+        reopened = DatasetTool(dataset_path, "news archive", "id", "title", "content", top_k=1)
+
+        assert [result.url for result in await worker.use("recount")] == ["3"]
+        assert [result.url for result in await reopened.use("recount")] == ["3"]
+        mock_build_index.assert_not_called()
+
+    with pytest.raises(sqlite3.OperationalError):
+        worker._connection.execute("INSERT INTO dataset_fts (rowid, content) VALUES (5, 'recount')")
+
+
+def test_read_only_requires_built_index(dataset_path):
+    with pytest.raises(sqlite3.OperationalError):
+        DatasetTool(dataset_path, "news archive", "id", "title", "content", read_only=True)
+
+
+async def test_rebuilds_index_when_dataset_changes(tmp_path):
+    path = tmp_path / "records.parquet"
+    pyarrow.parquet.write_table(pyarrow.table(RECORDS), path)
+    DatasetTool(path, "news archive", "id", "title", "content", top_k=1).close()
+
+    pyarrow.parquet.write_table(pyarrow.table({**RECORDS, "content": RECORDS["content"][::-1]}), path)
+    tool = DatasetTool(path, "news archive", "id", "title", "content", top_k=1)
+
+    assert [result.url for result in await tool.use("rain")] == ["5"]
+
+
+async def test_reads_content_only_for_row_groups_of_returned_rows(dataset_path):
+    tool = DatasetTool(dataset_path, "news archive", "id", "title", "content", top_k=1)
+
+    with patch.object(tool, "_read_chunk", wraps=tool._read_chunk) as mock_read_chunk:
+        await tool.use("recount")
+
+    assert [call[0] for call in mock_read_chunk.call_args_list] == [(1, ["id", "title"]), (1, ["content"])]
+
+
+def test_warns_about_large_parquet_row_groups(tmp_path):
+    path = tmp_path / "records.parquet"
+    pyarrow.parquet.write_table(pyarrow.table(RECORDS), path)
+
+    with patch("surv_ai.lib.tools.query.dataset.MAX_PARQUET_ROW_GROUP_SIZE", 2), patch(
+        "surv_ai.lib.tools.query.dataset.logger"
+    ) as mock_logger:
+        DatasetTool(path, "news archive", "id", "title", "content").close()
+
+    mock_logger.log_warning.assert_called_once()
@@ -5,7 +5,7 @@ from tests.utils import AsyncMock
 
 
 async def test_can_use_tool():
-    with patch("requests.get", new_callable=Mock) as mock_get:
+    with patch("surv_ai.lib.transport.HTTPTransport.get", new_callable=AsyncMock) as mock_get:
         mock_get.return_value.text = "<p>test</p>"
         mock_tool = GoogleCustomSearchTool(
             google_api_key="123",
@@ -39,3 +39,19 @@ async def test_can_use_tool():
                 url="https://www.google.com",
             )
         ]
+
+
+async def test_fetches_result_pages_concurrently():
+    with patch("surv_ai.lib.transport.HTTPTransport.get", new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = Mock()
+        mock_get.return_value.json.return_value = {"items": [{"link": "https://www.google.com"}] * 10}
+        tool = GoogleCustomSearchTool(
+            google_api_key="123",
+            google_search_engine_id="456",
+            n_pages=25,
+        )
+
+        results = await tool._search("query val")
+
+        assert len(results) == 30
+        assert sorted(call[1]["params"]["start"] for call in mock_get.call_args_list) == [1, 11, 21]
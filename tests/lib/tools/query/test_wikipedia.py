@@ -1,26 +1,113 @@
-from mock import patch
+import asyncio
+
+from mock import Mock, patch
 
 from surv_ai import ToolResult, WikipediaTool
+from surv_ai.lib.tools.query.wikipedia import PageCache
 from tests.utils import AsyncMock
 
 
 async def test_can_use_tool():
-    with patch("requests.post"):
-        mock_tool = WikipediaTool()
-        mock_tool._search = AsyncMock(
-            return_value=[
-                "Hello World",
-            ]
+    mock_tool = WikipediaTool(cache=PageCache())
+    mock_tool._search = AsyncMock(
+        return_value=[
+            "Hello World",
+        ]
+    )
+    mock_tool._get_page_text = AsyncMock(return_value={"Hello World": ["test"]})
+
+    return_val = await mock_tool.use("query")
+
+    assert return_val == [
+        ToolResult(
+            site_name="Wikipedia",
+            body="test",
+            title='Wikipedia page titled "Hello World"',
+            url="https://en.wikipedia.org/wiki/Hello_World",
         )
-        mock_tool._get_page_text = AsyncMock(return_value=["test"])
+    ]
 
-        return_val = await mock_tool.use("query")
 
-        assert return_val == [
-            ToolResult(
-                site_name="Wikipedia",
-                body="test",
-                title='Wikipedia page titled "Hello World"',
-                url="https://en.wikipedia.org/wiki/Hello_World",
-            )
-        ]
+async def test_searches_and_fetches_best_match_in_one_request():
+    with patch("surv_ai.lib.transport.HTTPTransport.get", new_callable=AsyncMock) as mock_get:
+        mock_get.return_value = Mock()
+        mock_get.return_value.json.return_value = {
+            "query": {
+                "pages": [
+                    {"title": "Hello World", "index": 1, "extract": "Hello.\n\n\n== History ==\nWorld."},
+                ]
+            }
+        }
+        tool = WikipediaTool(cache=PageCache())
+
+        return_val = await tool.use("query")
+
+        assert mock_get.call_count == 1
+        assert return_val[0].body == "Hello.\n\nWorld."
+
+
+async def test_fetches_remaining_pages_concurrently():
+    started, release = [], asyncio.Event()
+
+    async def get(url, params):
+        response = Mock()
+
+        if "generator" in params:
+            response.json.return_value = {
+                "query": {
+                    "pages": [
+                        {"title": "Second", "index": 2},
+                        {"title": "First", "index": 1, "extract": "First page."},
+                        {"title": "Third", "index": 3},
+                    ]
+                },
+            }
+            return response
+
+        started.append(params["titles"])
+        if len(started) == 2:
+            release.set()
+        await release.wait()
+
+        response.json.return_value = {
+            "query": {
+                "normalized": [{"from": params["titles"], "to": params["titles"].upper()}],
+                "pages": [{"title": params["titles"].upper(), "extract": f"{params['titles']} page."}],
+            },
+        }
+        return response
+
+    tool = WikipediaTool(n_articles=3, transport=Mock(get=get), cache=PageCache())
+
+    return_val = await asyncio.wait_for(tool.use("query"), timeout=1)
+
+    assert [result.body for result in return_val] == ["First page.", "Second page.", "Third page."]
+    assert sorted(started) == ["Second", "Third"]
+
+
+async def test_cache_deduplicates_concurrent_fetches():
+    cache = PageCache()
+    fetched = []
+
+    async def fetch(titles):
+        fetched.append(titles)
+        await asyncio.sleep(0)
+        return {title: [title.lower()] for title in titles}
+
+    first, second = await asyncio.gather(cache.get_many(["A", "B"], fetch), cache.get_many(["B", "C"], fetch))
+
+    assert fetched == [["A", "B"], ["C"]]
+    assert first == {"A": ["a"], "B": ["b"]}
+    assert second == {"B": ["b"], "C": ["c"]}
+
+
+def test_cache_evicts_least_recently_used_pages():
+    cache = PageCache(max_pages=2)
+    cache.put("A", ["a"])
+    cache.put("B", ["b"])
+    cache.get("A")
+    cache.put("C", ["c"])
+
+    assert cache.get("B") is None
+    assert cache.get("A") == ["a"]
+    assert len(cache) == 2
@@ -0,0 +1,52 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from mock import patch
+
+from surv_ai.lib.tools.extraction import (
+    _extract_with_html_parser,
+    extract_paragraphs,
+    extract_paragraphs_async,
+)
+
+PAGE = """
+<html>
+    <head><style>p { color: red; }</style></head>
+    <body>
+        <div><p>First <b>paragraph</b> &amp; more.</p></div>
+        <p>   </p>
+        <p>Second paragraph<script>var x = "<p>not text</p>";</script>
+        <p>Third paragraph, left open
+        <ul><li>Not a paragraph</li></ul>
+    </body>
+</html>
+"""
+
+
+def test_extract_paragraphs():
+    assert extract_paragraphs(PAGE) == [
+        "First paragraph & more.",
+        "Second paragraph",
+        "Third paragraph, left open",
+    ]
+
+
+def test_extract_paragraphs_without_lxml():
+    with patch("surv_ai.lib.tools.extraction.lxml", None):
+        assert extract_paragraphs(PAGE) == [
+            "First paragraph & more.",
+            "Second paragraph",
+            "Third paragraph, left open",
+        ]
+
+
+def test_html_parser_closes_paragraph_at_end_of_block():
+    assert _extract_with_html_parser("<div><p>one</div>two<p>three") == ["one", "three"]
+
+
+def test_extract_paragraphs_from_empty_page():
+    assert extract_paragraphs("") == []
+
+
+async def test_extract_paragraphs_async():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert await extract_paragraphs_async("<p>test</p>", executor) == ["test"]